@@ -18,6 +18,7 @@ build_exe_options = {
         "httpx[http2]",
         "biopython",
         "XlsxWriter",
+        "openpyxl",
         "dateparser",
         "dateparser.data",
         "dateparser.data.date_translation_data",
@@ -29,6 +30,8 @@ build_exe_options = {
         "dateparser.date",
     ],
     "packages": [
+        # Commands are imported by name when run, so are not found by tracing imports
+        "trakka.components",
         "dateparser",
         "dateparser.data",
         "dateparser.data.date_translation_data",
@@ -138,6 +138,7 @@ setup(
         "httpx[http2]",
         "biopython",
         "XlsxWriter",
+        "openpyxl",
         "dateparser",
     ],  # Optional
     # List additional groups of dependencies here (e.g. development
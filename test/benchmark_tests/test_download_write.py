@@ -0,0 +1,47 @@
+import hashlib
+import time
+
+import httpx
+
+from trakka.utils.download import write_response
+
+PAYLOAD_SIZE = 64 * 1024 * 1024
+NETWORK_CHUNK_SIZE = 64 * 1024
+
+
+def _response() -> httpx.Response:
+    """A response whose body arrives in network-sized chunks, without a server"""
+    chunk = b'ACGT' * (NETWORK_CHUNK_SIZE // 4)
+    chunks = (chunk for _ in range(PAYLOAD_SIZE // NETWORK_CHUNK_SIZE))
+    return httpx.Response(200, content=chunks)
+
+
+def _write_128_byte_chunks(resp: httpx.Response, file_path: str):
+    """The previous download path"""
+    with open(file_path, 'wb') as file:
+        for chunk in resp.iter_raw(chunk_size=128):
+            file.write(chunk)
+
+
+def _throughput(func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return PAYLOAD_SIZE / elapsed / 1024 / 1024
+
+
+class TestDownloadWrite:
+
+    def test_write_response_expect_higher_throughput_than_128_byte_chunks(self, tmp_path):
+        old_path = str(tmp_path / 'old.fastq')
+        new_path = str(tmp_path / 'new.fastq')
+
+        old_mib_s = _throughput(lambda: _write_128_byte_chunks(_response(), old_path))
+        new_mib_s = _throughput(
+            lambda: write_response(_response(), new_path, file_hash=hashlib.sha256()))
+
+        print(f'\n128 byte chunks: {old_mib_s:.0f} MiB/s, '
+              f'buffered writes (hashing included): {new_mib_s:.0f} MiB/s')
+        with open(old_path, 'rb') as old, open(new_path, 'rb') as new:
+            assert old.read() == new.read()
+        assert new_mib_s > old_mib_s
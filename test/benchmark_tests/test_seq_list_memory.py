@@ -0,0 +1,101 @@
+import json
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import click
+import pandas as pd
+
+from trakka.components.sequence import funcs
+from trakka.utils.api import api_get
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+from trakka.utils.enums.seq import SeqType
+
+RECORDS = 500_000
+GROUP = 'Big-Group'
+
+
+def _body() -> bytes:
+    records = ({
+        'sampleName': f'S{i}',
+        'type': SeqType.FASTQ_ILL_PE.value,
+        'read': i % 2 + 1,
+        'fileNameOnDisk': f'S{i}_20240101T000000Z_{i:08x}_R{i % 2 + 1}.fastq.gz',
+        'originalFileName': f'S{i}_R{i % 2 + 1}.fastq.gz',
+        'serverSha256': f'{i:064x}',
+        'created': '2024-01-01T00:00:00.000000+00:00',
+        'isActive': True,
+    } for i in range(RECORDS))
+    data = ','.join(json.dumps(record) for record in records)
+    return f'{{"data":[{data}],"messages":[]}}'.encode()
+
+
+def _serve(body: bytes) -> ThreadingHTTPServer:
+    """A local stub of the sequence list endpoint"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _get_seq_data_whole_body(group_name: str, seq_type: SeqType) -> pd.DataFrame:
+    """The previous _get_seq_data for a group"""
+    data = api_get(path=funcs._get_seq_api_by_group(group_name))['data']
+    result = funcs._filter_sequences(data, seq_type)
+    df = pd.DataFrame(result, dtype=str)
+    df['read'] = pd.Series([row['read'] for row in result], dtype=str)
+    return df
+
+
+def _overhead_mib(func) -> float:
+    """Peak memory beyond what the returned DataFrame itself holds"""
+    with click.Context(click.Command('seq')):
+        tracemalloc.start()
+        try:
+            result = func()
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert len(result.index) == RECORDS
+    return (peak - retained) / 1024 / 1024
+
+
+class TestSeqListMemory:
+
+    def test_get_seq_data_given_500k_sequences_expect_less_memory_than_whole_body(
+            self, monkeypatch):
+        # Arrange
+        server = _serve(_body())
+        context = {
+            CxtKey.URI: f'http://127.0.0.1:{server.server_address[1]}',
+            CxtKey.HTTP_POOL_SIZE: 1,
+            CxtKey.HTTP_KEEPALIVE_EXPIRY: 5.0,
+            CxtKey.TOKEN: 'token',
+            CxtKey.SESSION_ID: 'benchmark',
+        }
+        monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(context.get))
+
+        try:
+            # Act
+            old = _overhead_mib(
+                lambda: _get_seq_data_whole_body(GROUP, SeqType.FASTQ_ILL_PE))
+            new = _overhead_mib(lambda: funcs._get_seq_data(GROUP, SeqType.FASTQ_ILL_PE))
+        finally:
+            server.shutdown()
+
+        # Assert
+        print(f'\nPeak memory beyond the DataFrame for {RECORDS} sequences: '
+              f'{old:.0f} MiB decoding the whole body, {new:.0f} MiB streamed')
+        assert new * 5 < old
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+# Cumulative import time of trakka.main, in microseconds. Importing every
+# command eagerly took about 1.5 seconds.
+MAX_IMPORT_TIME_US = 400_000
+HEAVY_MODULES = [
+    'pandas', 'Bio', 'xlsxwriter', 'azure.identity', 'dateparser', 'tabulate', 'httpx', 'requests']
+
+
+def _import_times(module: str) -> dict:
+    """Cumulative import time of each module imported, from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+
+    def test_import_main_expect_no_heavy_dependencies_and_under_threshold(self):
+        # Act
+        times = _import_times('trakka.main')
+
+        # Assert
+        print(f"\nimport trakka.main: {times['trakka.main'] / 1000:.0f} ms")
+        assert not [module for module in HEAVY_MODULES if module in times]
+        assert times['trakka.main'] < MAX_IMPORT_TIME_US
@@ -0,0 +1,214 @@
+import os
+import time
+
+import pandas as pd
+from loguru import logger
+
+from trakka.components.sequence.sync import sync_workflow
+from trakka.components.sequence.sync.constant import BLOB_FILE_PATH_KEY
+from trakka.components.sequence.sync.constant import DETECTION_DATE_KEY
+from trakka.components.sequence.sync.constant import DONE
+from trakka.components.sequence.sync.constant import DOWNLOADED
+from trakka.components.sequence.sync.constant import DRIFTED
+from trakka.components.sequence.sync.constant import FILE_NAME_KEY
+from trakka.components.sequence.sync.constant import FILE_NAME_ON_DISK_KEY
+from trakka.components.sequence.sync.constant import FILE_PATH_KEY
+from trakka.components.sequence.sync.constant import INTERMEDIATE_MANIFEST_FILE_KEY
+from trakka.components.sequence.sync.constant import INT_FILE_NAME_KEY
+from trakka.components.sequence.sync.constant import MATCH
+from trakka.components.sequence.sync.constant import MISSING
+from trakka.components.sequence.sync.constant import OBSOLETE_OBJECTS_FILE_KEY
+from trakka.components.sequence.sync.constant import OUTPUT_DIR_KEY
+from trakka.components.sequence.sync.constant import READ_KEY
+from trakka.components.sequence.sync.constant import SAMPLE_NAME_KEY
+from trakka.components.sequence.sync.constant import SEQ_ID_KEY
+from trakka.components.sequence.sync.constant import SEQ_TYPE_KEY
+from trakka.components.sequence.sync.constant import SERVER_SHA_256_KEY
+from trakka.components.sequence.sync.constant import STATUS_KEY
+from trakka.components.sequence.sync.constant import TYPE_KEY
+from trakka.utils.enums.seq import SeqType
+
+MANIFEST_ROWS = 100_000
+FILES_ON_DISK = 500
+SEQ_TYPE = SeqType.FASTQ_ILL_PE.value
+
+
+def _file_name(sample: int, read: int) -> str:
+    return f'S{sample}_20240101T000000Z_{sample:08x}_R{read}.fastq.gz'
+
+
+def _int_manifest() -> pd.DataFrame:
+    samples = [i // 2 for i in range(MANIFEST_ROWS)]
+    reads = [i % 2 + 1 for i in range(MANIFEST_ROWS)]
+    return pd.DataFrame({
+        SAMPLE_NAME_KEY: [f'S{s}' for s in samples],
+        TYPE_KEY: SEQ_TYPE,
+        READ_KEY: reads,
+        FILE_NAME_ON_DISK_KEY: [_file_name(s, r) for s, r in zip(samples, reads)],
+        SERVER_SHA_256_KEY: [f'{i:064x}' for i in range(MANIFEST_ROWS)],
+        STATUS_KEY: [DOWNLOADED if i % 3 else MATCH for i in range(MANIFEST_ROWS)],
+    })
+
+
+def _published_manifest(int_man: pd.DataFrame) -> pd.DataFrame:
+    r1 = int_man[int_man[READ_KEY] == 1].reset_index(drop=True)
+    r2 = int_man[int_man[READ_KEY] == 2].reset_index(drop=True)
+    return pd.DataFrame({
+        SEQ_ID_KEY: r1[SAMPLE_NAME_KEY],
+        'FASTQ-ILL-PE_R1': r1[FILE_NAME_ON_DISK_KEY],
+        'FASTQ-ILL-PE_R2': r2[FILE_NAME_ON_DISK_KEY],
+        'HASH_FASTQ-ILL-PE_R1': r1[SERVER_SHA_256_KEY],
+        'HASH_FASTQ-ILL-PE_R2': r2[SERVER_SHA_256_KEY],
+    })
+
+
+def _build_hash_dict_iterrows(published_manifest):
+    """The previous build_hash_dict"""
+    hash_dict = {}
+    hash_keys = [c for c in published_manifest.columns if c.startswith('HASH_')]
+    for _, row in published_manifest.iterrows():
+        for hash_key in hash_keys:
+            hash_dict[row[hash_key[len('HASH_'):]]] = row[hash_key]
+    return hash_dict
+
+
+def _finalise_iterrows(int_med, output_dir):
+    """The previous finalise_each_file, for entries that need no hot swap"""
+    for index, row in int_med.iterrows():
+        dest = os.path.join(
+            output_dir, str(row[SAMPLE_NAME_KEY]), row[TYPE_KEY], row[FILE_NAME_ON_DISK_KEY])
+        if row[STATUS_KEY] in (MATCH, DOWNLOADED):
+            int_med.at[index, STATUS_KEY] = DONE
+            logger.info(f'Done: {dest}')
+
+
+def _obsoletes_per_file_filter(int_med, files_on_disk):
+    """The previous detect_and_record_obsolete_files matching loop"""
+    obsoletes = pd.DataFrame({FILE_PATH_KEY: [], FILE_NAME_KEY: [], DETECTION_DATE_KEY: []})
+    for triplet in files_on_disk:
+        result = int_med.loc[(int_med[FILE_NAME_ON_DISK_KEY] == triplet[-2])]
+        if len(result.index) == 0:
+            obsoletes.loc[len(obsoletes.index)] = triplet
+    return obsoletes
+
+
+def _analyse_iterrows(int_man, output_dir, hash_cache):
+    """The previous per-row analyse_status, for entries whose hashes are cached"""
+    for index, row in int_man.iterrows():
+        seq_path = os.path.join(
+            output_dir,
+            str(row[SAMPLE_NAME_KEY]),
+            str(row[TYPE_KEY]),
+            str(row[FILE_NAME_ON_DISK_KEY]))
+        if not os.path.exists(seq_path):
+            logger.warning(f'Missing: {seq_path}')
+            int_man.at[index, STATUS_KEY] = MISSING
+            continue
+        if row[STATUS_KEY] != MATCH:
+            logger.info("Hash cache hit.")
+            seq_hash = hash_cache[row[FILE_NAME_ON_DISK_KEY]]
+            if seq_hash.casefold() != row[SERVER_SHA_256_KEY].casefold():
+                logger.warning(f'Drifted: {seq_path}')
+                int_man.at[index, STATUS_KEY] = DRIFTED
+                continue
+        azure_path = os.path.join(row[BLOB_FILE_PATH_KEY], row[INT_FILE_NAME_KEY])
+        logger.info(f'Matched: {seq_path} ==> Azure: {azure_path}')
+        int_man.at[index, STATUS_KEY] = MATCH
+
+
+def _seconds(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+class TestSyncAnalysis:
+
+    def test_sync_phases_given_100k_row_manifest_expect_faster_than_iterrows(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        int_man = _int_manifest()
+        published = _published_manifest(int_man)
+        output_dir = str(tmp_path)
+        sync_state = {
+            OUTPUT_DIR_KEY: output_dir,
+            SEQ_TYPE_KEY: SEQ_TYPE,
+            OBSOLETE_OBJECTS_FILE_KEY: 'delete-targets.csv',
+            INTERMEDIATE_MANIFEST_FILE_KEY: 'intermediate-manifest.csv',
+        }
+        # Half the files on disk are in the manifest, half are obsolete
+        files_on_disk = []
+        for i in range(FILES_ON_DISK):
+            sample = i // 2 if i % 2 else MANIFEST_ROWS + i
+            sample_dir = os.path.join(output_dir, f'S{sample}', SEQ_TYPE)
+            os.makedirs(sample_dir, exist_ok=True)
+            name = _file_name(sample, 1)
+            open(os.path.join(sample_dir, name), 'wb').close()
+            files_on_disk.append((os.path.join(sample_dir, name), name, 'now'))
+        # Only the in-memory work is being compared
+        monkeypatch.setattr(sync_workflow, 'save_int_manifest', lambda *args: None)
+        logger.disable('trakka')
+        logger.disable(__name__)
+
+        try:
+            # Act
+            old = {
+                'build_hash_dict': _seconds(lambda: _build_hash_dict_iterrows(published)),
+                'finalise_each_file': _seconds(
+                    lambda: _finalise_iterrows(int_man.copy(), output_dir)),
+                'obsolete detection': _seconds(
+                    lambda: _obsoletes_per_file_filter(int_man, files_on_disk)),
+            }
+            new = {
+                'build_hash_dict': _seconds(lambda: sync_workflow.build_hash_dict(published)),
+                'finalise_each_file': _seconds(
+                    lambda: sync_workflow.finalise_each_file(int_man.copy(), sync_state)),
+                'obsolete detection': _seconds(
+                    lambda: sync_workflow.detect_and_record_obsolete_files(int_man, sync_state)),
+            }
+        finally:
+            logger.enable('trakka')
+            logger.enable(__name__)
+
+        # Assert
+        for phase, seconds in old.items():
+            print(f'\n{phase}: {seconds:.2f}s with iterrows, {new[phase]:.2f}s vectorised')
+        saved = pd.read_csv(os.path.join(output_dir, 'delete-targets.csv'))
+        assert len(saved.index) == FILES_ON_DISK // 2
+        assert sync_workflow.build_hash_dict(published) == _build_hash_dict_iterrows(published)
+        assert all(new[phase] < old[phase] for phase in old)
+
+    def test_analyse_status_given_100k_stub_files_and_cached_hashes_expect_faster_than_iterrows(
+            self, tmp_path):
+        # Arrange
+        int_man = _int_manifest()
+        int_man[BLOB_FILE_PATH_KEY] = 'blob'
+        int_man[INT_FILE_NAME_KEY] = int_man[FILE_NAME_ON_DISK_KEY]
+        output_dir = str(tmp_path)
+        # Every file is on disk, and every hash is in the published manifest
+        for sample, seq_type, name in zip(
+                int_man[SAMPLE_NAME_KEY], int_man[TYPE_KEY], int_man[FILE_NAME_ON_DISK_KEY]):
+            sample_dir = os.path.join(output_dir, sample, seq_type)
+            os.makedirs(sample_dir, exist_ok=True)
+            open(os.path.join(sample_dir, name), 'wb').close()
+        hash_cache = sync_workflow.build_hash_dict(_published_manifest(int_man))
+        logger.disable('trakka')
+        logger.disable(__name__)
+
+        try:
+            # Act
+            old_int_man = int_man.copy()
+            old = _seconds(lambda: _analyse_iterrows(old_int_man, output_dir, hash_cache))
+            result = {}
+            new = _seconds(lambda: result.update(status=sync_workflow.analyse_status(
+                int_man, output_dir, True, hash_cache, 4)))
+        finally:
+            logger.enable('trakka')
+            logger.enable(__name__)
+
+        # Assert
+        print(f'\nanalyse_status: {old:.2f}s with iterrows, {new:.2f}s vectorised')
+        status = result['status']
+        assert (status == MATCH).all()
+        assert list(status) == list(old_int_man[STATUS_KEY])
+        assert new < old
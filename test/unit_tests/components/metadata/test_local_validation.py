@@ -0,0 +1,205 @@
+# pylint: disable=unused-argument
+import pytest
+
+from trakka.components.metadata import local_validation
+from trakka.utils.helpers import proforma
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+from trakka.utils.exceptions import TrakkaCliException
+
+COLUMN_MAPPINGS = [
+    {'metaDataColumnName': 'Seq_ID', 'metaDataColumnPrimitiveType': 'string',
+     'isRequired': True, 'metaDataColumnValidValues': None},
+    {'metaDataColumnName': 'State', 'metaDataColumnPrimitiveType': None,
+     'isRequired': 'True', 'metaDataColumnValidValues': ['NSW', 'VIC']},
+    {'metaDataColumnName': 'Date_coll', 'metaDataColumnPrimitiveType': 'date',
+     'isRequired': False, 'metaDataColumnValidValues': None},
+    {'metaDataColumnName': 'Count', 'metaDataColumnPrimitiveType': 'number',
+     'isRequired': False, 'metaDataColumnValidValues': None},
+    {'metaDataColumnName': 'Ratio', 'metaDataColumnPrimitiveType': 'double',
+     'isRequired': False, 'metaDataColumnValidValues': None},
+    {'metaDataColumnName': 'Owner_group', 'metaDataColumnPrimitiveType': None,
+     'isRequired': True, 'metaDataColumnValidValues': ['Org-Owner']},
+    {'metaDataColumnName': 'Shared_groups', 'metaDataColumnPrimitiveType': None,
+     'isRequired': True, 'metaDataColumnValidValues': ['Project-Group']},
+]
+
+
+class _FakeProformaApi:
+    def __init__(self):
+        self.calls = 0
+        self.column_mappings = COLUMN_MAPPINGS
+
+    def get(self, path):
+        self.calls += 1
+        return {'data': {'columnMappings': self.column_mappings}, 'messages': []}
+
+
+@pytest.fixture(name='api')
+def fixture_api(monkeypatch):
+    api = _FakeProformaApi()
+    monkeypatch.setattr(proforma, 'api_get', api.get)
+    context = {CxtKey.URI: 'https://trakka.example', CxtKey.TOKEN: 'token'}
+    monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(context.get))
+    return api
+
+
+def _csv_file(tmp_path, text: str):
+    path = tmp_path / 'metadata.csv'
+    path.write_text(text)
+    return open(path, 'rb')
+
+
+def _errors(monkeypatch) -> list:
+    errors = []
+    monkeypatch.setattr(local_validation.logger, 'error', errors.append)
+    return errors
+
+
+class TestLocalValidation:
+
+    def test_check_submission_given_valid_file_expect_no_error_and_file_rewound(
+            self, tmp_path, api):
+        # Arrange
+        text = ('Seq_ID,State,Date_coll,Count,Ratio,Extra\n'
+                'S1,NSW,2024-01-31,3,0.5,x\n'
+                'S2,vic,2024-02,,1e3,\n'
+                'S3, VIC ,,-4,,\n')
+
+        # Act
+        with _csv_file(tmp_path, text) as file:
+            local_validation.check_submission(file, 'PF', is_append=False)
+            rest = file.read()
+
+        # Assert
+        assert rest.decode() == text
+
+    def test_check_submission_given_invalid_cells_expect_each_reported(
+            self, tmp_path, api, monkeypatch):
+        # Arrange
+        errors = _errors(monkeypatch)
+        text = ('Seq_ID,State,Date_coll,Count,Ratio\n'
+                'S1,QLD,2024-13-01,3.5,abc\n'
+                ',NSW,31/01/2024,3,0.5\n'
+                'S3,,,,\n')
+
+        # Act
+        with _csv_file(tmp_path, text) as file, pytest.raises(TrakkaCliException) as ex:
+            local_validation.check_submission(file, 'PF', is_append=False)
+
+        # Assert
+        assert 'Found 7 error(s)' in str(ex.value)
+        assert errors == [
+            "Row 1, Seq_ID: required value is blank",
+            "Row 2, State: required value is blank",
+            "Row 0, State: 'QLD' is not one of NSW, VIC",
+            "Row 0, Date_coll: '2024-13-01' is not an ISO 8601 date, eg. 2024-01-31",
+            "Row 1, Date_coll: '31/01/2024' is not an ISO 8601 date, eg. 2024-01-31",
+            "Row 0, Count: '3.5' is not a whole number",
+            "Row 0, Ratio: 'abc' is not a number",
+        ]
+
+    def test_check_submission_given_missing_required_column_expect_error(
+            self, tmp_path, api, monkeypatch):
+        # Arrange
+        errors = _errors(monkeypatch)
+
+        # Act
+        with _csv_file(tmp_path, 'Seq_ID,Count\nS1,1\n') as file, \
+                pytest.raises(TrakkaCliException):
+            local_validation.check_submission(file, 'PF', is_append=False)
+
+        # Assert
+        assert errors == ['Column State: required column is missing']
+
+    def test_check_submission_given_append_expect_only_seq_id_required(
+            self, tmp_path, api):
+        # Arrange
+        text = 'Seq_ID,Count\nS1,\nS2,4\n'
+
+        # Act
+        with _csv_file(tmp_path, text) as file:
+            local_validation.check_submission(file, 'PF', is_append=True)
+
+        # Assert
+        assert api.calls == 1
+
+    def test_check_submission_given_ignored_system_columns_expect_not_checked(
+            self, tmp_path, api, monkeypatch):
+        # Arrange
+        errors = _errors(monkeypatch)
+        warnings = []
+        monkeypatch.setattr(local_validation.logger, 'warning', warnings.append)
+        text = 'Seq_ID,State,Owner_group\nS1,NSW,Other-Owner\nS2,VIC,\n'
+
+        # Act
+        with _csv_file(tmp_path, text) as file:
+            local_validation.check_submission(file, 'PF', is_append=False)
+
+        # Assert
+        assert not errors
+        assert not warnings
+
+    def test_check_submission_given_many_errors_expect_report_capped(
+            self, tmp_path, api, monkeypatch):
+        # Arrange
+        errors = _errors(monkeypatch)
+        monkeypatch.setattr(local_validation, 'CHUNK_ROWS', 7)
+        rows = ''.join(f'S{i},TAS\n' for i in range(150))
+
+        # Act
+        with _csv_file(tmp_path, 'Seq_ID,State\n' + rows) as file, \
+                pytest.raises(TrakkaCliException) as ex:
+            local_validation.check_submission(file, 'PF', is_append=False)
+
+        # Assert
+        assert 'Found 150 error(s)' in str(ex.value)
+        assert len(errors) == local_validation.MAX_REPORTED_ERRORS + 1
+        assert errors[99] == "Row 99, State: 'TAS' is not one of NSW, VIC"
+        assert errors[-1] == '... and 50 more'
+
+    def test_get_proforma_fields_given_cached_spec_expect_no_request(self, api):
+        # Act
+        first = local_validation.get_proforma_fields('PF')
+        second = local_validation.get_proforma_fields('PF')
+
+        # Assert
+        assert api.calls == 1
+        assert second == first
+        assert first[1] == local_validation.FieldSpec('State', 'categorical', True, ['NSW', 'VIC'])
+
+    def test_check_submission_given_cached_spec_out_of_date_expect_checked_against_server(
+            self, tmp_path, api, monkeypatch):
+        # Arrange
+        errors = _errors(monkeypatch)
+        local_validation.get_proforma_fields('PF')
+        api.column_mappings = [
+            mapping | {'metaDataColumnValidValues': ['NSW', 'VIC', 'QLD']}
+            if mapping['metaDataColumnName'] == 'State' else mapping
+            for mapping in COLUMN_MAPPINGS
+        ]
+
+        # Act
+        with _csv_file(tmp_path, 'Seq_ID,State\nS1,QLD\n') as file:
+            local_validation.check_submission(file, 'PF', is_append=False)
+
+        # Assert
+        assert api.calls == 2
+        assert not errors
+
+    def test_check_submission_given_errors_with_server_spec_expect_each_reported_once(
+            self, tmp_path, api, monkeypatch):
+        # Arrange
+        errors = _errors(monkeypatch)
+        warnings = []
+        monkeypatch.setattr(local_validation.logger, 'warning', warnings.append)
+
+        # Act
+        with _csv_file(tmp_path, 'Seq_ID,State,Extra\nS1,QLD,x\n') as file, \
+                pytest.raises(TrakkaCliException):
+            local_validation.check_submission(file, 'PF', is_append=False)
+
+        # Assert
+        assert api.calls == 2
+        assert errors == ["Row 0, State: 'QLD' is not one of NSW, VIC"]
+        assert warnings == ['Columns not in the pro forma: Extra']
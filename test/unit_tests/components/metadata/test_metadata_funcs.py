@@ -0,0 +1,254 @@
+import io
+import threading
+
+import httpx
+import pandas as pd
+import pytest
+import xlsxwriter
+
+from trakka.components.metadata import funcs
+from trakka.utils.exceptions import TrakkaCliException
+
+PATH = 'Submission/ValidateSubmissions'
+
+
+def _csv_file(tmp_path, rows: int) -> io.BufferedReader:
+    path = tmp_path / 'metadata.csv'
+    pd.DataFrame({
+        'Seq_ID': [f'S{i}' for i in range(rows)],
+        'Date_coll': ['' if i % 4 else '2024-01-01' for i in range(rows)],
+        'Note': ['has, a comma' if i % 3 == 0 else 'plain' for i in range(rows)],
+    }).to_csv(path, index=False)
+    return open(path, 'rb')
+
+
+def _xlsx_file(tmp_path, rows: int) -> io.BufferedReader:
+    path = tmp_path / 'metadata.xlsx'
+    workbook = xlsxwriter.Workbook(str(path))
+    sheet = workbook.add_worksheet('Metadata submission')
+    sheet.write_row(0, 0, ['Seq_ID', 'Count'])
+    for i in range(rows):
+        sheet.write_row(i + 1, 0, [f'S{i}', i])
+    workbook.close()
+    return open(path, 'rb')
+
+
+class _FakeSubmissionApi:
+    """
+    Records each posted batch; batches whose first Seq_ID is in failing are
+    rejected, and those in unavailable get a 503 on their first attempt
+    """
+    def __init__(self, failing=(), unavailable=()):
+        self.failing = set(failing)
+        self.unavailable = set(unavailable)
+        self.batches = {}
+        self.attempts = {}
+        self.whole_files = []
+        self._lock = threading.Lock()
+
+    def post_raw(self, path, data, files, custom_headers):
+        name, body = files['file']
+        batch = pd.read_csv(body, dtype=str, keep_default_na=False)
+        with self._lock:
+            self.batches[name] = batch
+            self.attempts[name] = self.attempts.get(name, 0) + 1
+            if self.attempts[name] == 1 and batch['Seq_ID'][0] in self.unavailable:
+                status = 503
+            else:
+                status = 400 if batch['Seq_ID'][0] in self.failing else 200
+        messages = [{'ResponseType': 'Success' if status == 200 else 'Error',
+                     'ResponseMessage': name}]
+        return httpx.Response(status, json={'data': None, 'messages': messages},
+                              request=httpx.Request('POST', 'https://trakka.example'))
+
+    def post(self, path, data, files, custom_headers):
+        self.whole_files.append(files['file'][0])
+
+
+def _use_api(monkeypatch, api: _FakeSubmissionApi):
+    monkeypatch.setattr(funcs, 'api_post_multipart_raw', api.post_raw)
+    monkeypatch.setattr(funcs, 'api_post_multipart', api.post)
+
+
+class TestFuncs:
+
+    def test_call_batched_submission_given_parallel_batches_expect_all_rows_sent_once(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 25) as file:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10, parallel=3)
+
+        # Assert
+        assert sorted(api.batches) == [
+            'metadata_batch_rows0-9.csv',
+            'metadata_batch_rows10-19.csv',
+            'metadata_batch_rows20-24.csv',
+        ]
+        sent = pd.concat([api.batches[name] for name in sorted(api.batches)], ignore_index=True)
+        with _csv_file(tmp_path, 25) as file:
+            expected = pd.read_csv(file, dtype=str, keep_default_na=False)
+        pd.testing.assert_frame_equal(sent, expected)
+
+    def test_call_batched_submission_given_failed_batch_expect_rest_sent_then_error(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSubmissionApi(failing=['S10'])
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 30) as file, pytest.raises(TrakkaCliException) as ex:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10, parallel=2)
+
+        # Assert
+        assert len(api.batches) == 3
+        assert 'rows: 10-19' in str(ex.value)
+
+    def test_call_batched_submission_given_one_batch_expect_original_file_sent(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 10) as file:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10, parallel=4)
+
+        # Assert
+        assert not api.batches
+        assert [name.rsplit('/', 1)[-1] for name in api.whole_files] == ['metadata.csv']
+
+    def test_call_batched_submission_given_xlsx_expect_csv_batches(self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _xlsx_file(tmp_path, 25) as file:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10, parallel=2)
+
+        # Assert
+        assert sorted(api.batches) == [
+            'metadata_batch_rows0-9.csv',
+            'metadata_batch_rows10-19.csv',
+            'metadata_batch_rows20-24.csv',
+        ]
+        last = api.batches['metadata_batch_rows20-24.csv']
+        assert list(last.columns) == ['Seq_ID', 'Count']
+        assert list(last['Seq_ID']) == [f'S{i}' for i in range(20, 25)]
+        assert list(last['Count']) == [str(i) for i in range(20, 25)]
+        assert not api.whole_files
+
+    def test_call_batched_submission_given_server_error_expect_batch_retried(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSubmissionApi(unavailable=['S10'])
+        _use_api(monkeypatch, api)
+        delays = []
+        monkeypatch.setattr(funcs, 'sleep', delays.append)
+
+        # Act
+        with _csv_file(tmp_path, 30) as file:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10, parallel=2)
+
+        # Assert
+        assert delays == [funcs.BATCH_RETRY_DELAY]
+        assert api.attempts['metadata_batch_rows10-19.csv'] == 2
+        assert api.attempts['metadata_batch_rows0-9.csv'] == 1
+        assert list(api.batches['metadata_batch_rows10-19.csv']['Seq_ID']) == \
+            [f'S{i}' for i in range(10, 20)]
+
+    def test_call_batched_submission_given_resume_expect_only_failed_batches_sent(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        _use_api(monkeypatch, _FakeSubmissionApi(failing=['S10', 'S30']))
+        with _csv_file(tmp_path, 45) as file, pytest.raises(TrakkaCliException):
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10, parallel=2)
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 45) as file:
+            funcs._call_batched_submission(
+                PATH, file, 'Org', [], 'Proforma', 10, parallel=2, resume=True)
+
+        # Assert
+        assert sorted(api.batches) == [
+            'metadata_batch_rows10-19.csv',
+            'metadata_batch_rows30-39.csv',
+        ]
+        assert not (tmp_path / 'metadata.csv.checkpoint.json').exists()
+
+    def test_call_batched_submission_given_resume_of_edited_file_expect_changed_batches_sent(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        _use_api(monkeypatch, _FakeSubmissionApi(failing=['S10']))
+        with _csv_file(tmp_path, 30) as file, pytest.raises(TrakkaCliException) as ex:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10)
+        assert '--resume' in str(ex.value)
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 31) as file:
+            funcs._call_batched_submission(
+                PATH, file, 'Org', [], 'Proforma', 10, resume=True)
+
+        # Assert
+        assert sorted(api.batches) == [
+            'metadata_batch_rows10-19.csv',
+            'metadata_batch_rows30-30.csv',
+        ]
+
+    def test_call_batched_submission_given_resume_with_other_options_expect_error(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        _use_api(monkeypatch, _FakeSubmissionApi(failing=['S10']))
+        with _csv_file(tmp_path, 30) as file, pytest.raises(TrakkaCliException):
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10)
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 30) as file, pytest.raises(TrakkaCliException) as ex:
+            funcs._call_batched_submission(
+                PATH, file, 'Other-Org', [], 'Proforma', 10, resume=True)
+
+        # Assert
+        assert 'without --resume' in str(ex.value)
+        assert not api.batches
+
+    def test_call_batched_submission_given_no_resume_expect_checkpoint_ignored(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        _use_api(monkeypatch, _FakeSubmissionApi(failing=['S10']))
+        with _csv_file(tmp_path, 30) as file, pytest.raises(TrakkaCliException):
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10)
+        checkpoint = tmp_path / 'metadata.csv.checkpoint.json'
+        assert checkpoint.exists()
+        api = _FakeSubmissionApi()
+        _use_api(monkeypatch, api)
+
+        # Act
+        with _csv_file(tmp_path, 30) as file:
+            funcs._call_batched_submission(PATH, file, 'Org', [], 'Proforma', 10)
+
+        # Assert
+        assert len(api.batches) == 3
+        assert not checkpoint.exists()
+
+    def test_validate_metadata_given_failed_batch_expect_no_checkpoint(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        _use_api(monkeypatch, _FakeSubmissionApi(failing=['S10']))
+
+        # Act
+        with _csv_file(tmp_path, 30) as file, pytest.raises(TrakkaCliException):
+            funcs.validate_metadata(
+                file, 'Org', 'Proforma', False, 10, local_validation=False)
+
+        # Assert
+        assert not (tmp_path / 'metadata.csv.checkpoint.json').exists()
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import xlsxwriter
+
+from trakka.components.metadata.xlsx import iter_xlsx_rows
+
+
+def _write_workbook(path, sheets: dict):
+    workbook = xlsxwriter.Workbook(str(path))
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    for name, rows in sheets.items():
+        sheet = workbook.add_worksheet(name)
+        for row_index, row in enumerate(rows):
+            for col_index, value in enumerate(row):
+                if isinstance(value, datetime):
+                    sheet.write_datetime(row_index, col_index, value, date_format)
+                elif value is not None:
+                    sheet.write(row_index, col_index, value)
+    workbook.close()
+
+
+class TestXlsx:
+
+    def test_iter_xlsx_rows_given_typed_cells_expect_csv_text(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'metadata.xlsx'
+        _write_workbook(path, {'Metadata submission': [
+            ['Seq_ID', 'Date_coll', 'Count', 'Ratio', 'Note', None],
+            ['S1', datetime(2024, 1, 2), 5, 0.25, 'a, "quoted" note'],
+            [None, None, None, None, None],
+            ['S2', datetime(2024, 3, 4, 5, 6, 7), None, 1.0, None, 'ignored'],
+        ]})
+
+        # Act
+        with open(path, 'rb') as file:
+            rows = list(iter_xlsx_rows(file))
+
+        # Assert
+        assert rows == [
+            ['Seq_ID', 'Date_coll', 'Count', 'Ratio', 'Note'],
+            ['S1', '2024-01-02', '5', '0.25', 'a, "quoted" note'],
+            ['S2', '2024-03-04T05:06:07', '', '1', ''],
+        ]
+
+    def test_iter_xlsx_rows_given_generated_proforma_expect_submission_sheet_read(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'metadata.xlsx'
+        _write_workbook(path, {
+            'Instructions': [['Read me']],
+            'Metadata submission': [['Seq_ID'], ['S1']],
+        })
+
+        # Act
+        with open(path, 'rb') as file:
+            rows = list(iter_xlsx_rows(file))
+
+        # Assert
+        assert rows == [['Seq_ID'], ['S1']]
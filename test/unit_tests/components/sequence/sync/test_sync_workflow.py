@@ -1,6 +1,8 @@
 import os.path
+import hashlib
 import json
 import pandas as pd
+import pytest
 import shutil
 
 from datetime import datetime
@@ -8,6 +10,9 @@ from datetime import datetime
 from trakka.components.sequence.sync.sync_workflow import analyse
 from trakka.components.sequence.sync.sync_workflow import finalise
 from trakka.components.sequence.sync.sync_workflow import purge
+from trakka.components.sequence.sync.sync_workflow import download
+from trakka.components.sequence.sync import sync_workflow
+from trakka.components.sequence.sync.sync_io import get_journal_path
 from trakka.components.sequence.sync.state_machine import SName
 from trakka.components.sequence.sync.state_machine import Action
 from trakka.components.sequence.sync.constant import *
@@ -392,6 +397,37 @@ class TestSyncWorkflow:
         status = df2.loc[0, STATUS_KEY]
         assert status == DRIFTED
 
+    def test_analyse12_given_hash_workers_expect_each_entry_hashed_and_statuses_applied(self):
+        # Arrange
+        temp_dir = _mk_temp_dir()
+        sync_state = {
+            INTERMEDIATE_MANIFEST_FILE_KEY: "test-analyse12-int-manifest.csv",
+            MANIFEST_KEY: "test-analyse12-manifest.csv",
+            RECALCULATE_HASH_KEY: True,
+            OUTPUT_DIR_KEY: temp_dir,
+            SEQ_TYPE_KEY: SeqType.FASTQ_ILL_SE.value,
+            HASH_WORKERS_KEY: 4,
+        }
+        samples = [f"S{i}" for i in range(8)]
+        write_download_int_manifest(sync_state, samples, "")
+        for sample in samples[:6]:
+            seq_dir = os.path.join(temp_dir, sample, SeqType.FASTQ_ILL_SE.value)
+            os.makedirs(seq_dir)
+            content = f"{sample}.fastq" if sample != "S5" else "drifted"
+            with open(os.path.join(seq_dir, f"{sample}.fastq"), "w") as f:
+                f.write(content)
+
+        # Act
+        analyse(sync_state)
+
+        # Assert
+        df = pd.read_csv(os.path.join(temp_dir, sync_state[INTERMEDIATE_MANIFEST_FILE_KEY]))
+        statuses = dict(zip(df[SAMPLE_NAME_KEY], df[STATUS_KEY]))
+        assert statuses == {
+            "S0": MATCH, "S1": MATCH, "S2": MATCH, "S3": MATCH, "S4": MATCH,
+            "S5": DRIFTED, "S6": MISSING, "S7": MISSING,
+        }
+
     def test_finalise1_int_manifest_has_failures_expect_finalisation_failed_state(self):
         # Arrange
         temp_dir = _mk_temp_dir()
@@ -1232,6 +1268,241 @@ class TestSyncWorkflow:
         assert not os.path.exists(int_man)
 
 
+    def test_download1_given_parallel_downloads_expect_every_entry_downloaded_and_saved(
+            self, monkeypatch):
+        # Arrange
+        temp_dir = _mk_temp_dir()
+        sync_state = {
+            INTERMEDIATE_MANIFEST_FILE_KEY: "test-download1-int-manifest.csv",
+            OUTPUT_DIR_KEY: temp_dir,
+            DOWNLOAD_BATCH_SIZE_KEY: 3,
+            PARALLEL_DOWNLOADS_KEY: 4,
+            SEQ_TYPE_KEY: SeqType.FASTQ_ILL_SE.value
+        }
+        sample_names = [f"Sample{i}" for i in range(10)]
+        write_download_int_manifest(sync_state, sample_names, MISSING)
+
+        def fake_download(file_path, _filename, _query_path, _params, sample_dir):
+            os.makedirs(sample_dir, exist_ok=True)
+            content = os.path.basename(file_path)
+            with open(file_path, 'w') as file:
+                file.write(content)
+            return hashlib.sha256(content.encode()).hexdigest()
+
+        monkeypatch.setattr(sync_workflow, "_download_seq_file", fake_download)
+
+        # Act
+        download(sync_state)
+
+        # Assert
+        df = read_from_csv(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
+        assert list(df[SAMPLE_NAME_KEY]) == sample_names
+        assert (df[STATUS_KEY] == DOWNLOADED).all()
+        assert sync_state[CURRENT_STATE_KEY] == SName.DONE_DOWNLOADING
+
+    def test_download2_given_bad_hash_from_one_worker_expect_only_that_entry_failed(
+            self, monkeypatch):
+        # Arrange
+        temp_dir = _mk_temp_dir()
+        sync_state = {
+            INTERMEDIATE_MANIFEST_FILE_KEY: "test-download2-int-manifest.csv",
+            OUTPUT_DIR_KEY: temp_dir,
+            DOWNLOAD_BATCH_SIZE_KEY: 1,
+            PARALLEL_DOWNLOADS_KEY: 3,
+            SEQ_TYPE_KEY: SeqType.FASTQ_ILL_SE.value
+        }
+        sample_names = [f"Sample{i}" for i in range(6)]
+        write_download_int_manifest(sync_state, sample_names, MISSING)
+        corrupt_downloads = []
+
+        def fake_download(file_path, _filename, _query_path, _params, sample_dir):
+            os.makedirs(sample_dir, exist_ok=True)
+            corrupt = file_path.endswith("Sample3.fastq")
+            content = "corrupt" if corrupt else os.path.basename(file_path)
+            if corrupt:
+                corrupt_downloads.append(file_path)
+            with open(file_path, 'w') as file:
+                file.write(content)
+            return hashlib.sha256(content.encode()).hexdigest()
+
+        monkeypatch.setattr(sync_workflow, "_download_seq_file", fake_download)
+        monkeypatch.setattr(sync_workflow, "DOWNLOAD_RETRY_DELAY", 0)
+
+        # Act
+        download(sync_state)
+
+        # Assert
+        df = read_from_csv(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
+        statuses = dict(zip(df[SAMPLE_NAME_KEY], df[STATUS_KEY]))
+        assert statuses.pop("Sample3") == FAILED
+        assert set(statuses.values()) == {DOWNLOADED}
+        assert len(corrupt_downloads) == 1 + sync_workflow.DOWNLOAD_RETRIES
+        assert not os.path.exists(corrupt_downloads[0])
+
+    @pytest.mark.parametrize("first_attempt", ["bad_hash", "failed"])
+    def test_download_given_first_attempt_fails_expect_file_downloaded_again(
+            self, monkeypatch, first_attempt):
+        # Arrange
+        temp_dir = _mk_temp_dir()
+        sync_state = {
+            INTERMEDIATE_MANIFEST_FILE_KEY: f"test-download-retry-{first_attempt}-int-manifest.csv",
+            OUTPUT_DIR_KEY: temp_dir,
+            DOWNLOAD_BATCH_SIZE_KEY: 1,
+            PARALLEL_DOWNLOADS_KEY: 1,
+            SEQ_TYPE_KEY: SeqType.FASTQ_ILL_SE.value
+        }
+        write_download_int_manifest(sync_state, ["Sample0"], MISSING)
+        attempts = []
+
+        def fake_download(file_path, _filename, _query_path, _params, sample_dir):
+            os.makedirs(sample_dir, exist_ok=True)
+            attempts.append(file_path)
+            if len(attempts) == 1 and first_attempt == "failed":
+                return None
+            content = "corrupt" if len(attempts) == 1 else os.path.basename(file_path)
+            with open(file_path, 'w') as file:
+                file.write(content)
+            return hashlib.sha256(content.encode()).hexdigest()
+
+        monkeypatch.setattr(sync_workflow, "_download_seq_file", fake_download)
+        monkeypatch.setattr(sync_workflow, "DOWNLOAD_RETRY_DELAY", 0)
+
+        # Act
+        download(sync_state)
+
+        # Assert
+        df = read_from_csv(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
+        assert list(df[STATUS_KEY]) == [DOWNLOADED]
+        assert len(attempts) == 2
+
+    def test_download3_given_journal_from_interrupted_run_expect_only_unrecorded_files_downloaded(
+            self, monkeypatch):
+        # Arrange
+        temp_dir = _mk_temp_dir()
+        sync_state = {
+            INTERMEDIATE_MANIFEST_FILE_KEY: "test-download3-int-manifest.csv",
+            OUTPUT_DIR_KEY: temp_dir,
+            DOWNLOAD_BATCH_SIZE_KEY: 1,
+            PARALLEL_DOWNLOADS_KEY: 2,
+            SEQ_TYPE_KEY: SeqType.FASTQ_ILL_SE.value
+        }
+        sample_names = [f"Sample{i}" for i in range(5)]
+        write_download_int_manifest(sync_state, sample_names, MISSING)
+        journal_path = get_journal_path(sync_state)
+        with open(journal_path, 'w') as journal:
+            journal.write(json.dumps({FILE_NAME_ON_DISK_KEY: "Sample0.fastq",
+                                      STATUS_KEY: DOWNLOADED}) + "\n")
+            journal.write(json.dumps({FILE_NAME_ON_DISK_KEY: "Sample1.fastq",
+                                      STATUS_KEY: DOWNLOADED}) + "\n")
+            # Torn line left by kill -9
+            journal.write('{"fileNameOnDisk": "Sample2.fas')
+        downloaded = []
+
+        def fake_download(file_path, _filename, _query_path, _params, sample_dir):
+            os.makedirs(sample_dir, exist_ok=True)
+            content = os.path.basename(file_path)
+            downloaded.append(content)
+            with open(file_path, 'w') as file:
+                file.write(content)
+            return hashlib.sha256(content.encode()).hexdigest()
+
+        monkeypatch.setattr(sync_workflow, "_download_seq_file", fake_download)
+
+        # Act
+        download(sync_state)
+
+        # Assert
+        df = read_from_csv(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
+        assert sorted(downloaded) == ["Sample2.fastq", "Sample3.fastq", "Sample4.fastq"]
+        assert (df[STATUS_KEY] == DOWNLOADED).all()
+        assert not os.path.exists(journal_path)
+
+    def test_pull1_given_recent_watermark_and_filtering_server_expect_added_rows_merged(
+            self, monkeypatch):
+        # Arrange
+        sync_state = make_pull_sync_state("test-pull1")
+        cached = seq_list([("Sample1", "2024-01-01T00:00:00Z"),
+                           ("Sample2", "2024-01-02T00:00:00Z")])
+        save_server_manifest(sync_state, cached)
+        requested_params = []
+
+        def fake_get_seq_data(_group_name, _seq_type, seq_ids=None, group_params=None):
+            requested_params.append(group_params)
+            return seq_list([("Sample2", "2024-02-01T00:00:00Z"),
+                             ("Sample3", "2024-02-02T00:00:00Z")])
+
+        monkeypatch.setattr(sync_workflow, "_get_seq_data", fake_get_seq_data)
+
+        # Act
+        data, unchanged = sync_workflow.pull_sequence_list(
+            sync_state, "Group", SeqType.FASTQ_ILL_SE)
+
+        # Assert
+        assert requested_params == [{"createdAfter": "2024-01-02T00:00:00Z"}]
+        assert list(data[SAMPLE_NAME_KEY]) == ["Sample1", "Sample2", "Sample3"]
+        assert list(data[CREATED_KEY])[1] == "2024-02-01T00:00:00Z"
+        assert list(unchanged) == [True, False, False]
+
+    def test_pull2_given_server_ignores_created_after_expect_full_list_used(
+            self, monkeypatch):
+        # Arrange
+        sync_state = make_pull_sync_state("test-pull2")
+        save_server_manifest(sync_state, seq_list([("Sample1", "2024-01-01T00:00:00Z")]))
+        full_list = seq_list([("Sample2", "2023-12-01T00:00:00Z"),
+                              ("Sample3", "2024-02-02T00:00:00Z")])
+        monkeypatch.setattr(sync_workflow, "_get_seq_data",
+                            lambda *args, **kwargs: full_list)
+
+        # Act
+        data, unchanged = sync_workflow.pull_sequence_list(
+            sync_state, "Group", SeqType.FASTQ_ILL_SE)
+
+        # Assert
+        assert list(data[SAMPLE_NAME_KEY]) == ["Sample2", "Sample3"]
+        assert not unchanged.any()
+
+    def test_pull3_given_last_full_pull_too_old_expect_full_pull(self, monkeypatch):
+        # Arrange
+        sync_state = make_pull_sync_state("test-pull3")
+        sync_state[LAST_FULL_MANIFEST_PULL_KEY] = "2000-01-01T00:00:00"
+        save_server_manifest(sync_state, seq_list([("Sample1", "2024-01-01T00:00:00Z")]))
+        requested_params = []
+
+        def fake_get_seq_data(_group_name, _seq_type, seq_ids=None, group_params=None):
+            requested_params.append(group_params)
+            return seq_list([("Sample2", "2024-02-01T00:00:00Z")])
+
+        monkeypatch.setattr(sync_workflow, "_get_seq_data", fake_get_seq_data)
+
+        # Act
+        data, _ = sync_workflow.pull_sequence_list(sync_state, "Group", SeqType.FASTQ_ILL_SE)
+
+        # Assert
+        assert requested_params == [None]
+        assert list(data[SAMPLE_NAME_KEY]) == ["Sample2"]
+        assert sync_state[LAST_FULL_MANIFEST_PULL_KEY] > "2000-01-01T00:00:00"
+
+    def test_pull4_given_null_read_expect_cached_entry_replaced(self, monkeypatch):
+        # Arrange
+        sync_state = make_pull_sync_state("test-pull4")
+        cached = seq_list([("Sample1", "2024-01-01T00:00:00Z")])
+        cached[READ_KEY] = None
+        save_server_manifest(sync_state, cached)
+        added = seq_list([("Sample1", "2024-02-01T00:00:00Z")])
+        added[READ_KEY] = None
+        monkeypatch.setattr(sync_workflow, "_get_seq_data",
+                            lambda *args, **kwargs: added)
+
+        # Act
+        data, unchanged = sync_workflow.pull_sequence_list(
+            sync_state, "Group", SeqType.FASTQ_ILL_SE)
+
+        # Assert
+        assert list(data[SAMPLE_NAME_KEY]) == ["Sample1"]
+        assert list(data[CREATED_KEY]) == ["2024-02-01T00:00:00Z"]
+        assert not unchanged.any()
+
+
 def make_output_dir(sync_state):
     if not os.path.exists(sync_state[OUTPUT_DIR_KEY]):
         os.mkdir(sync_state[OUTPUT_DIR_KEY])
@@ -1262,6 +1533,56 @@ def read_from_csv(sync_state: dict, state_key: str):
     return df
 
 
+def write_download_int_manifest(sync_state, sample_names, status):
+    """
+    Write an intermediate manifest whose server hash for each entry is the
+    hash of the entry's file name, as written by the fake downloaders.
+    """
+    file_names = [f"{name}.fastq" for name in sample_names]
+    df = pd.DataFrame({
+        SAMPLE_NAME_KEY: sample_names,
+        FILE_NAME_ON_DISK_KEY: file_names,
+        INT_FILE_NAME_KEY: file_names,
+        BLOB_FILE_PATH_KEY: 'blob',
+        SERVER_SHA_256_KEY: [hashlib.sha256(f.encode()).hexdigest().upper() for f in file_names],
+        TYPE_KEY: sync_state[SEQ_TYPE_KEY],
+        READ_KEY: 1,
+        STATUS_KEY: status,
+    })
+    df.to_csv(os.path.join(
+        sync_state[OUTPUT_DIR_KEY],
+        sync_state[INTERMEDIATE_MANIFEST_FILE_KEY]), index=False)
+
+
+def make_pull_sync_state(name):
+    return {
+        OUTPUT_DIR_KEY: _mk_temp_dir(),
+        SEQ_TYPE_KEY: SeqType.FASTQ_ILL_SE.value,
+        SERVER_MANIFEST_FILE_KEY: f"{name}-server-manifest.csv",
+        RECALCULATE_HASH_KEY: False,
+        MANIFEST_WATERMARK_KEY: "2024-01-02T00:00:00Z",
+        LAST_FULL_MANIFEST_PULL_KEY: datetime.now().isoformat(),
+    }
+
+
+def seq_list(samples_created):
+    """A sequence list as returned by _get_seq_data, one read per sample"""
+    return pd.DataFrame({
+        SAMPLE_NAME_KEY: [sample for sample, _ in samples_created],
+        FILE_NAME_ON_DISK_KEY: [f"{sample}_{created[:10]}.fastq"
+                                for sample, created in samples_created],
+        TYPE_KEY: SeqType.FASTQ_ILL_SE.value,
+        READ_KEY: "1",
+        CREATED_KEY: [created for _, created in samples_created],
+        IS_ACTIVE_KEY: "True",
+    }, dtype=str)
+
+
+def save_server_manifest(sync_state, data):
+    data.to_csv(os.path.join(
+        sync_state[OUTPUT_DIR_KEY], sync_state[SERVER_MANIFEST_FILE_KEY]), index=False)
+
+
 def read_json(path: str) -> dict:
     if os.path.exists(path):
         with open(path) as f:
@@ -0,0 +1,103 @@
+import hashlib
+import io
+
+import httpx
+import pytest
+from Bio import SeqIO
+
+from trakka.components.sequence.fasta import FastaRecordReader
+from trakka.components.sequence.fasta import iter_fasta_records
+from trakka.components.sequence.fasta import map_fasta
+
+FASTA = (
+    b'>S1 first sample\n'
+    b'ACGTACGTAC\n'
+    b'GTAC\n'
+    b'>S2|2024-01-01\r\n'
+    b'NNNNACGT\r\n'
+    b'>S3\n'
+    b'>S4 last record has no trailing newline\n'
+    b'ACGT'
+)
+
+
+def _write_fasta(tmp_path, content: bytes) -> str:
+    path = tmp_path / 'consensus.fasta'
+    path.write_bytes(content)
+    return str(path)
+
+
+class TestFasta:
+
+    def test_iter_fasta_records_given_fasta_expect_same_ids_as_biopython(self, tmp_path):
+        # Arrange
+        path = _write_fasta(tmp_path, FASTA)
+        expected = [record.id for record in SeqIO.parse(io.StringIO(FASTA.decode()), 'fasta')]
+
+        # Act
+        with open(path, 'rb') as fasta_file, map_fasta(fasta_file) as mapped:
+            ids = [record.id for record in iter_fasta_records(mapped)]
+
+        # Assert
+        assert ids == expected == ['S1', 'S2|2024-01-01', 'S3', 'S4']
+
+    def test_iter_fasta_records_given_fasta_expect_each_record_read_as_its_file_bytes(
+            self, tmp_path):
+        # Arrange
+        path = _write_fasta(tmp_path, FASTA)
+
+        # Act
+        with open(path, 'rb') as fasta_file, map_fasta(fasta_file) as mapped:
+            readers = [FastaRecordReader(record, f'{record.id}.fasta')
+                       for record in iter_fasta_records(mapped)]
+            contents = [b''.join(iter(lambda r=reader: r.read(5), b'')) for reader in readers]
+            hashes = [reader.sha256() for reader in readers]
+
+        # Assert
+        assert contents == [
+            b'>S1 first sample\nACGTACGTAC\nGTAC\n',
+            b'>S2|2024-01-01\r\nNNNNACGT\r\n',
+            b'>S3\n',
+            b'>S4 last record has no trailing newline\nACGT',
+        ]
+        assert hashes == [hashlib.sha256(content).hexdigest() for content in contents]
+
+    def test_iter_fasta_records_given_text_before_first_record_expect_value_error(
+            self, tmp_path):
+        # Arrange
+        path = _write_fasta(tmp_path, b';comment\n' + FASTA)
+
+        # Act / Assert
+        with open(path, 'rb') as fasta_file, map_fasta(fasta_file) as mapped:
+            with pytest.raises(ValueError):
+                list(iter_fasta_records(mapped))
+
+    def test_iter_fasta_records_given_empty_file_expect_no_records(self, tmp_path):
+        # Arrange
+        path = _write_fasta(tmp_path, b'')
+
+        # Act
+        with open(path, 'rb') as fasta_file, map_fasta(fasta_file) as mapped:
+            records = list(iter_fasta_records(mapped))
+
+        # Assert
+        assert not records
+
+    def test_multipart_request_given_reader_expect_content_length_and_whole_record(
+            self, tmp_path):
+        # Arrange
+        sequence = b'ACGT' * 100_000
+        path = _write_fasta(tmp_path, b'>S1\n' + sequence + b'\n>S2\nACGT\n')
+
+        # Act
+        with open(path, 'rb') as fasta_file, map_fasta(fasta_file) as mapped:
+            record = next(iter_fasta_records(mapped))
+            request = httpx.Request(
+                'POST', 'http://localhost/api/Sequence',
+                files=[('files[]', ('S1_split.fasta', FastaRecordReader(record, 'S1.fasta')))])
+            body = b''.join(request.stream)
+
+        # Assert
+        assert int(request.headers['Content-Length']) == len(body)
+        assert b'>S1\n' + sequence + b'\n' in body
+        assert b'>S2' not in body
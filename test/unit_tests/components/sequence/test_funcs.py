@@ -0,0 +1,252 @@
+import io
+import json
+import threading
+
+import pytest
+
+from trakka.components.sequence import funcs
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+from trakka.utils.exceptions import FailedResponseException
+from trakka.utils.exceptions import TrakkaCliException
+from trakka.utils.json_stream import JsonRecordStream
+
+
+def _seq_info(sample_name: str, read: str) -> dict:
+    return {
+        'sampleName': sample_name,
+        'read': read,
+        'type': 'fastq-ill-pe',
+        'fileNameOnDisk': f'{sample_name}_R{read}.fastq',
+        'isActive': True,
+    }
+
+
+def _context_value(key: CxtKey):
+    return {CxtKey.HTTP_POOL_SIZE: 8, CxtKey.URI: 'https://trakka.example'}.get(key)
+
+
+def _seq_csv(tmp_path, seq_ids) -> io.BufferedReader:
+    rows = ['Seq_ID,filepath']
+    for seq_id in seq_ids:
+        path = tmp_path / f'{seq_id}.fastq'
+        path.write_text(f'@{seq_id}\nACGT\n+\nIIII\n')
+        rows.append(f'{seq_id},{path}')
+    csv_path = tmp_path / 'samples.csv'
+    csv_path.write_text('\n'.join(rows) + '\n')
+    return open(csv_path, 'rb')
+
+
+def _failed_response(message: str) -> FailedResponseException:
+    return FailedResponseException(
+        {'data': None, 'messages': [{'ResponseType': 'Error', 'ResponseMessage': message}]}, 400)
+
+
+class _FakeSampleApi:
+    """Records sample creates and shares; some samples exist, some fail"""
+    def __init__(self, existing=(), failing=()):
+        self.existing = set(existing)
+        self.failing = set(failing)
+        self.created = []
+        self.shared = []
+        self._lock = threading.Lock()
+
+    def post(self, path, data):
+        name = data['name']
+        if name in self.failing:
+            raise _failed_response(f'Owner for {name} not found')
+        with self._lock:
+            if name in self.existing:
+                raise _failed_response(f'Sample {name} already exists')
+            self.existing.add(name)
+            self.created.append(name)
+
+    def patch(self, path, data):
+        self.shared.append(data)
+
+
+class _FakeSequenceApi:
+    """Records each sequence upload; uploads of samples in failing are rejected"""
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.uploaded = []
+        self.attempts = []
+        self._lock = threading.Lock()
+
+    def post(self, sample_files, custom_headers):
+        _, (_, file) = sample_files[0].multipart
+        seq_id = custom_headers['seq-id']
+        with self._lock:
+            self.attempts.append(seq_id)
+        file.read()
+        if seq_id in self.failing:
+            raise _failed_response(f'Sample {seq_id} not found')
+        with self._lock:
+            self.uploaded.append(seq_id)
+
+
+class TestFuncs:
+
+    def test_get_seq_data_given_many_seq_ids_expect_rows_in_seq_id_order(self, monkeypatch):
+        # Arrange
+        seq_ids = [f'S{i}' for i in range(50)] + ['S3', 'MISSING']
+        requested = []
+        lock = threading.Lock()
+
+        def fake_api_get(path):
+            sample_name = path.rsplit('/', 1)[-1]
+            with lock:
+                requested.append(sample_name)
+            if sample_name == 'MISSING':
+                return {'data': []}
+            return {'data': [_seq_info(sample_name, '1'), _seq_info(sample_name, '2')]}
+
+        monkeypatch.setattr(funcs, 'api_get', fake_api_get)
+        monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(_context_value))
+
+        # Act
+        df = funcs._get_seq_data(None, seq_ids=seq_ids)
+
+        # Assert
+        expected_names = [name for name in seq_ids if name != 'MISSING' for _ in (1, 2)]
+        assert list(df['sampleName']) == expected_names
+        assert list(df['read']) == ['1', '2'] * (len(seq_ids) - 1)
+        assert sorted(requested) == sorted(set(seq_ids))
+
+    def test_get_seq_data_given_group_expect_streamed_records_filtered(self, monkeypatch):
+        # Arrange
+        sequences = [_seq_info(f'S{i}', '1') for i in range(5)]
+        sequences[1]['isActive'] = False
+        sequences[2]['type'] = 'fasta-cns'
+        sequences[3]['read'] = None
+        body = json.dumps({'data': sequences, 'messages': []}).encode()
+        requested = []
+
+        def fake_api_get_records(path, consume, params=None):
+            requested.append((path, params))
+            chunks = (body[i:i + 16] for i in range(0, len(body), 16))
+            return consume(iter(JsonRecordStream(chunks)))
+
+        monkeypatch.setattr(funcs, 'api_get_records', fake_api_get_records)
+
+        # Act
+        df = funcs._get_seq_data('Proj-Group', funcs.SeqType.FASTQ_ILL_PE, group_params={'x': 'y'})
+
+        # Assert
+        assert list(df['sampleName']) == ['S0', 'S3', 'S4']
+        assert df['read'].isna().tolist() == [False, True, False]
+        assert df['read'][0] == '1'
+        assert requested == [('Sequence/by-group/Proj-Group', {'x': 'y'})]
+
+    def test_create_samples_given_rerun_expect_known_samples_not_created_again(
+            self, monkeypatch):
+        # Arrange
+        api = _FakeSampleApi(existing=['S0'])
+        monkeypatch.setattr(funcs, 'api_post', api.post)
+        monkeypatch.setattr(funcs, 'api_patch', api.patch)
+        monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(_context_value))
+        monkeypatch.setattr(funcs, 'SHARE_BATCH_SIZE', 2)
+        seq_ids = ['S0', 'S1', 'S2', 'S1']
+
+        # Act
+        funcs._create_samples(seq_ids, 'Org', ['Proj'])
+        api.created.clear()
+        funcs._create_samples(seq_ids + ['S3'], 'Org', [])
+
+        # Assert
+        assert api.created == ['S3']
+        assert [share['seqIds'] for share in api.shared] == [['S0', 'S1'], ['S2']]
+        assert all(share['groupName'] == 'Proj-Group' for share in api.shared)
+
+    def test_create_samples_given_failed_creates_expect_error_after_all_attempted(
+            self, monkeypatch):
+        # Arrange
+        api = _FakeSampleApi(failing=['S1'])
+        monkeypatch.setattr(funcs, 'api_post', api.post)
+        monkeypatch.setattr(funcs, 'api_patch', api.patch)
+        monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(_context_value))
+
+        # Act
+        with pytest.raises(TrakkaCliException) as ex:
+            funcs._create_samples(['S0', 'S1', 'S2'], 'Org', ['Proj'])
+
+        # Assert
+        assert 'S1' in str(ex.value)
+        assert sorted(api.created) == ['S0', 'S2']
+        assert not api.shared
+
+    def test_add_sequence_submission_given_parallel_and_failed_uploads_expect_rest_uploaded(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSequenceApi(failing=['S2', 'S5'])
+        monkeypatch.setattr(funcs, '_post_sequence', api.post)
+        errors = []
+        monkeypatch.setattr(funcs.logger, 'error', errors.append)
+        seq_ids = [f'S{i}' for i in range(8)]
+
+        # Act
+        with _seq_csv(tmp_path, seq_ids) as csv_file:
+            funcs.add_sequence_submission(
+                funcs.SeqType.FASTQ_ILL_SE, csv_file, 'Org', [], False, parallel=3)
+
+        # Assert
+        assert sorted(api.uploaded) == ['S0', 'S1', 'S3', 'S4', 'S6', 'S7']
+        assert sorted(api.attempts) == sorted(seq_ids + ['S2', 'S5'])
+        assert 'Sample S2 failed upload' in errors
+        assert 'Sample S5 failed upload' in errors
+        assert errors[-1] in ('Failed to upload 2 samples: S2, S5',
+                              'Failed to upload 2 samples: S5, S2')
+
+    def test_add_sequence_submission_given_read_in_wrong_column_expect_sample_failed_and_files_closed(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSequenceApi()
+        monkeypatch.setattr(funcs, '_post_sequence', api.post)
+        errors = []
+        monkeypatch.setattr(funcs.logger, 'error', errors.append)
+        opened = []
+        get_file = funcs._get_file
+
+        def recording_get_file(filepath, read_hint=None):
+            file = get_file(filepath, read_hint)
+            opened.append(file)
+            return file
+
+        monkeypatch.setattr(funcs, '_get_file', recording_get_file)
+        rows = ['Seq_ID,filepath1,filepath2']
+        # S1's second file is named as read one
+        for seq_id, reads in [('S0', ('R1', 'R2')), ('S1', ('R1', 'b_R1')), ('S2', ('R1', 'R2'))]:
+            paths = []
+            for read in reads:
+                path = tmp_path / f'{seq_id}_{read}.fastq'
+                path.write_text(f'@{seq_id}\nACGT\n+\nIIII\n')
+                paths.append(str(path))
+            rows.append(','.join([seq_id, *paths]))
+        csv_path = tmp_path / 'samples.csv'
+        csv_path.write_text('\n'.join(rows) + '\n')
+
+        # Act
+        with open(csv_path, 'rb') as csv_file:
+            funcs.add_sequence_submission(
+                funcs.SeqType.FASTQ_ILL_PE, csv_file, 'Org', [], False, parallel=2)
+
+        # Assert
+        assert sorted(api.uploaded) == ['S0', 'S2']
+        assert 'Sample S1 failed upload' in errors
+        assert len(opened) == 6
+        assert all(file.multipart[1][1].closed for file in opened)
+
+    def test_add_sequence_submission_given_parallel_and_all_uploaded_expect_no_error(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        api = _FakeSequenceApi()
+        monkeypatch.setattr(funcs, '_post_sequence', api.post)
+        seq_ids = [f'S{i}' for i in range(8)]
+
+        # Act
+        with _seq_csv(tmp_path, seq_ids) as csv_file:
+            funcs.add_sequence_submission(
+                funcs.SeqType.FASTQ_ILL_SE, csv_file, 'Org', [], False, parallel=3)
+
+        # Assert
+        assert sorted(api.uploaded) == seq_ids
@@ -0,0 +1,18 @@
+import pytest
+
+from trakka.utils.hash_cache import HASH_CACHE_FILE_ENV
+from trakka.utils.known_samples import KNOWN_SAMPLES_FILE_ENV
+from trakka.utils.lookup_cache import LOOKUP_CACHE_FILE_ENV
+from trakka.utils.version import VERSION_CHECK_FILE_ENV
+
+
+@pytest.fixture(autouse=True)
+def isolated_hash_cache(tmp_path, monkeypatch):
+    """
+    Keep unit tests from reading or writing the user's hash cache, known
+    samples record, version check cache and lookup cache.
+    """
+    monkeypatch.setenv(HASH_CACHE_FILE_ENV, str(tmp_path / 'hash-cache.sqlite'))
+    monkeypatch.setenv(KNOWN_SAMPLES_FILE_ENV, str(tmp_path / 'known-samples.json'))
+    monkeypatch.setenv(VERSION_CHECK_FILE_ENV, str(tmp_path / 'version-check.json'))
+    monkeypatch.setenv(LOOKUP_CACHE_FILE_ENV, str(tmp_path / 'lookup-cache.json'))
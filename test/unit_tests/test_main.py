@@ -0,0 +1,31 @@
+import click
+from click.testing import CliRunner
+
+from trakka import main
+
+
+class TestMain:
+
+    def test_commands_given_each_command_loaded_expect_listed_help_matches(self):
+        # Act
+        loaded = {name: command.load() for name, command in main.COMMANDS.items()}
+
+        # Assert
+        for name, command in loaded.items():
+            assert isinstance(command, click.Group)
+            assert command.get_short_help_str(100) == main.COMMANDS[name].short_help
+
+    def test_cli_given_help_expect_commands_listed_without_importing_them(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv('AT_CMD_SET', 'admin')
+        cli = main.get_cli()
+        cli.commands.clear()
+
+        # Act
+        result = CliRunner().invoke(cli, ['--help'])
+
+        # Assert
+        assert result.exit_code == 0
+        for name, command in main.COMMANDS.items():
+            assert f'{name.ljust(10)} {command.short_help}' in result.output
+        assert not cli.commands
@@ -0,0 +1,130 @@
+import click
+import httpx
+import pytest
+
+from trakka.utils import api
+from trakka.utils.context import CxtKey
+
+ROOT_CONTEXT = {
+    CxtKey.URI.value: 'https://trakka.example',
+    CxtKey.TOKEN.value: 'token',
+    CxtKey.SESSION_ID.value: 'session',
+    CxtKey.SKIP_CERT_VERIFY.value: False,
+    CxtKey.USE_HTTP2.value: False,
+    CxtKey.HTTP_POOL_SIZE.value: 3,
+    CxtKey.HTTP_KEEPALIVE_EXPIRY.value: 7.5,
+}
+
+
+class _MockServer:
+    """
+    Answers every request with an empty API response. Each response reports
+    the connection it came on as its network stream, a new one every
+    requests_per_connection requests, as a pooled connection would.
+    """
+    def __init__(self, requests_per_connection: int):
+        self.requests_per_connection = requests_per_connection
+        self.requests = []
+        self._connection = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if len(self.requests) % self.requests_per_connection == 0:
+            self._connection = object()
+        self.requests.append(request)
+        return httpx.Response(
+            200,
+            json={'data': [], 'messages': []},
+            extensions={'network_stream': self._connection})
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    server = _MockServer(requests_per_connection=2)
+    created = []
+    client_class = httpx.Client
+
+    def mock_client(**kwargs):
+        client = client_class(transport=httpx.MockTransport(server), **kwargs)
+        created.append((client, kwargs))
+        return client
+
+    monkeypatch.setattr(httpx, 'Client', mock_client)
+    server.created = created
+    return server
+
+
+@pytest.fixture
+def debug_log(monkeypatch):
+    messages = []
+    monkeypatch.setattr(api.logger, 'debug', messages.append)
+    return messages
+
+
+def _cli_context() -> click.Context:
+    root = click.Context(click.Command('trakka'))
+    root.context = ROOT_CONTEXT
+    return root
+
+
+class TestApi:
+
+    def test_get_client_given_several_calls_in_one_context_expect_one_client_reused(
+            self, mock_server):
+        # Arrange
+        with _cli_context() as root:
+            with click.Context(click.Command('project'), parent=root):
+
+                # Act
+                api.api_get('Project')
+                api.api_get('Group')
+                client = api._get_client()
+
+        # Assert
+        assert len(mock_server.created) == 1
+        assert client is mock_server.created[0][0]
+        assert [request.url.path for request in mock_server.requests] == \
+            ['/api/Project', '/api/Group']
+
+    def test_get_client_given_pool_options_expect_passed_to_limits(self, mock_server):
+        # Arrange
+        with _cli_context() as root:
+            with click.Context(click.Command('project'), parent=root):
+
+                # Act
+                api.api_get('Project')
+
+        # Assert
+        limits = mock_server.created[0][1]['limits']
+        assert limits.max_connections == 3
+        assert limits.max_keepalive_connections == 3
+        assert limits.keepalive_expiry == 7.5
+
+    def test_get_client_given_root_context_closed_expect_client_closed(self, mock_server):
+        # Arrange
+        with _cli_context() as root:
+            with click.Context(click.Command('project'), parent=root):
+                api.api_get('Project')
+            client = mock_server.created[0][0]
+
+            # Act
+            closed_before_root = client.is_closed
+
+        # Assert
+        assert not closed_before_root
+        assert client.is_closed
+
+    def test_connection_tracker_given_requests_on_pooled_connections_expect_opened_and_reused_logged(
+            self, mock_server, debug_log):
+        # Arrange
+        with _cli_context() as root:
+            with click.Context(click.Command('project'), parent=root):
+
+                # Act
+                for _ in range(3):
+                    api.api_get('Project')
+
+        # Assert
+        connections = [message.split()[0] for message in debug_log if 'connection' in message]
+        assert connections == ['Opened', 'Reused', 'Opened', 'Closed']
+        assert debug_log[-1] == \
+            'Closed HTTP session: 2 connection(s) opened, 1 request(s) served by a reused connection'
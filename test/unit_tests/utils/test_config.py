@@ -0,0 +1,104 @@
+import json
+from datetime import datetime
+from datetime import timedelta
+
+import httpx
+
+from trakka.utils import config
+from trakka.utils.config import get_config_file
+from trakka.utils.config import get_server_info_or_create
+from trakka.utils.config import read_config
+
+URL = 'https://trakka.example'
+
+
+def _fake_get(monkeypatch, response: httpx.Response = None):
+    """Replace the server info request; with no response the server is unreachable"""
+    requests = []
+
+    def fake_get(url, verify, timeout):
+        requests.append((url, timeout))
+        if response is None:
+            raise httpx.ConnectError('unreachable')
+        return response
+
+    monkeypatch.setattr(config.httpx, 'get', fake_get)
+    return requests
+
+
+def _version_response() -> httpx.Response:
+    return httpx.Response(200, json={
+        'data': {'clientId': 'client', 'tenantId': 'tenant', 'apiScope': 'scope'}})
+
+
+class TestConfig:
+
+    def test_get_server_info_or_create_given_unreachable_server_expect_not_retried_until_due(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.setenv('HOME', str(tmp_path))
+        requests = _fake_get(monkeypatch)
+
+        # Act
+        first = get_server_info_or_create(URL, False)
+        second = get_server_info_or_create(URL, False)
+
+        # Assert
+        assert first is None and second is None
+        assert requests == [(f'{URL}/api/Version', config.SERVER_INFO_TIMEOUT)]
+        retry_after = read_config(get_config_file())['ServerInfoRetryAfter'][URL]
+        assert datetime.fromisoformat(retry_after) > datetime.now()
+
+    def test_get_server_info_or_create_given_retry_due_expect_fetched_and_saved(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.setenv('HOME', str(tmp_path))
+        config.create_config_file_if_not_exists()
+        with open(get_config_file(), 'w', encoding='utf-8') as file:
+            json.dump({
+                'Environments': [],
+                'ServerInfoRetryAfter': {URL: (datetime.now() - timedelta(minutes=1)).isoformat()},
+            }, file)
+        requests = _fake_get(monkeypatch, _version_response())
+
+        # Act
+        first = get_server_info_or_create(URL, False)
+        second = get_server_info_or_create(URL, False)
+
+        # Assert
+        assert first == second == ('client', 'tenant', 'scope')
+        assert len(requests) == 1
+        with open(get_config_file(), encoding='utf-8') as file:
+            saved = json.load(file)
+        assert 'ServerInfoRetryAfter' not in saved
+        assert [env['Url'] for env in saved['Environments']] == [URL]
+
+    def test_read_config_given_unchanged_file_expect_parsed_once(self, tmp_path, monkeypatch):
+        # Arrange
+        conf_file = tmp_path / 'config.json'
+        conf_file.write_text('{"Environments": []}', encoding='utf-8')
+        parsed = []
+        json_load = json.load
+        monkeypatch.setattr(config.json, 'load', lambda f: parsed.append(f) or json_load(f))
+
+        # Act
+        read_config(str(conf_file))
+        read_config(str(conf_file))
+        conf_file.write_text('{"Environments": [], "Other": 1}', encoding='utf-8')
+        changed = read_config(str(conf_file))
+
+        # Assert
+        assert len(parsed) == 2
+        assert changed['Other'] == 1
+
+    def test_read_config_given_returned_config_changed_expect_cache_unchanged(self, tmp_path):
+        # Arrange
+        conf_file = tmp_path / 'config.json'
+        conf_file.write_text('{"Environments": []}', encoding='utf-8')
+        read_config(str(conf_file))['Environments'].append({'Url': URL})
+
+        # Act
+        data = read_config(str(conf_file))
+
+        # Assert
+        assert data == {'Environments': []}
@@ -0,0 +1,239 @@
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import click
+import httpx
+import pytest
+
+from trakka.utils import download
+from trakka.utils.context import CxtKey
+from trakka.utils.download import download_file
+from trakka.utils.download import get_part_path
+from trakka.utils.download import get_validator_path
+from trakka.utils.download import write_response
+
+CONTENT = os.urandom(256 * 1024 + 7)
+
+
+class StubSequenceServer(ThreadingHTTPServer):
+    """
+    Serves CONTENT for any GET, with ETag etag. Range support and a dropped
+    connection part way through the first response can be switched on per
+    test. A Range request whose If-Range is not etag gets the whole content.
+    """
+    def __init__(self, supports_range: bool, drop_first_after: int = None, etag: str = '"v1"'):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.supports_range = supports_range
+        self.drop_first_after = drop_first_after
+        self.etag = etag
+        self.range_headers = []
+        self.if_range_headers = []
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server: StubSequenceServer = self.server
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        server.range_headers.append(range_header)
+        server.if_range_headers.append(if_range)
+        start = 0
+        if range_header and server.supports_range and if_range in (None, server.etag):
+            start = int(re.match(r'bytes=(\d+)-', range_header).group(1))
+            if start >= len(CONTENT):
+                self._send_headers(416, 0)
+                return
+            self._send_headers(206, len(CONTENT) - start, start)
+        else:
+            self._send_headers(200, len(CONTENT))
+
+        body = CONTENT[start:]
+        if server.drop_first_after is not None:
+            body = body[:server.drop_first_after]
+            server.drop_first_after = None
+            self.wfile.write(body)
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def _send_headers(self, status, length, start=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(length))
+        if self.server.etag:
+            self.send_header('ETag', self.server.etag)
+        if start is not None:
+            self.send_header('Content-Range', f'bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(request):
+    server = StubSequenceServer(**request.param)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cli_context(stub_server):
+    root = click.Context(click.Command('trakka'))
+    root.context = {
+        CxtKey.URI.value: f'http://127.0.0.1:{stub_server.server_address[1]}',
+        CxtKey.TOKEN.value: 'token',
+        CxtKey.SESSION_ID.value: 'session',
+        CxtKey.SKIP_CERT_VERIFY.value: False,
+        CxtKey.USE_HTTP2.value: False,
+        CxtKey.HTTP_POOL_SIZE.value: 2,
+        CxtKey.HTTP_KEEPALIVE_EXPIRY.value: 5.0,
+    }
+    with root:
+        with click.Context(click.Command('download'), parent=root):
+            yield
+
+
+@pytest.mark.usefixtures('cli_context')
+class TestDownload:
+
+    @pytest.mark.parametrize(
+        'stub_server', [{'supports_range': True, 'drop_first_after': 100_000}], indirect=True)
+    def test_download_file_given_dropped_connection_expect_resumed_with_range(
+            self, stub_server, tmp_path, monkeypatch):
+        # Arrange
+        file_path = str(tmp_path / 'sample.fastq')
+        delays = []
+        monkeypatch.setattr(download, 'sleep', delays.append)
+
+        # Act
+        sha256 = download_file('Sequence/download/S1', {}, file_path)
+
+        # Assert
+        assert stub_server.range_headers == [None, 'bytes=100000-']
+        assert stub_server.if_range_headers == [None, '"v1"']
+        assert delays == [download.DOWNLOAD_RETRY_DELAY]
+        assert _read(file_path) == CONTENT
+        assert sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert not os.path.exists(get_part_path(file_path))
+        assert not os.path.exists(get_validator_path(file_path))
+
+    @pytest.mark.parametrize(
+        'stub_server', [{'supports_range': False}], indirect=True)
+    def test_download_file_given_partial_file_and_no_range_support_expect_full_restart(
+            self, stub_server, tmp_path):
+        # Arrange
+        file_path = str(tmp_path / 'sample.fastq')
+        _write_partial(file_path, b'stale bytes from an earlier attempt', '"v1"')
+
+        # Act
+        sha256 = download_file('Sequence/download/S1', {}, file_path)
+
+        # Assert
+        assert stub_server.range_headers == ['bytes=35-']
+        assert _read(file_path) == CONTENT
+        assert sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.parametrize(
+        'stub_server', [{'supports_range': True}], indirect=True)
+    def test_download_file_given_unsatisfiable_range_expect_full_restart(
+            self, stub_server, tmp_path):
+        # Arrange
+        file_path = str(tmp_path / 'sample.fastq')
+        _write_partial(file_path, CONTENT + b'extra', '"v1"')
+
+        # Act
+        sha256 = download_file('Sequence/download/S1', {}, file_path)
+
+        # Assert
+        assert stub_server.range_headers == [f'bytes={len(CONTENT) + 5}-', None]
+        assert _read(file_path) == CONTENT
+        assert sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.parametrize(
+        'stub_server', [{'supports_range': True, 'etag': '"v2"'}], indirect=True)
+    def test_download_file_given_partial_file_of_changed_content_expect_full_restart(
+            self, stub_server, tmp_path):
+        # Arrange
+        file_path = str(tmp_path / 'sample.fastq')
+        _write_partial(file_path, b'bytes of the first version', '"v1"')
+
+        # Act
+        sha256 = download_file('Sequence/download/S1', {}, file_path)
+
+        # Assert
+        assert stub_server.if_range_headers == ['"v1"']
+        assert _read(file_path) == CONTENT
+        assert sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.parametrize(
+        'stub_server', [{'supports_range': True}], indirect=True)
+    def test_download_file_given_partial_file_without_validator_expect_no_range_request(
+            self, stub_server, tmp_path):
+        # Arrange
+        file_path = str(tmp_path / 'sample.fastq')
+        with open(get_part_path(file_path), 'wb') as part:
+            part.write(CONTENT[:1000])
+
+        # Act
+        sha256 = download_file('Sequence/download/S1', {}, file_path)
+
+        # Assert
+        assert stub_server.range_headers == [None]
+        assert _read(file_path) == CONTENT
+        assert sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+
+class TestWriteResponse:
+
+    def test_write_response_given_overstated_length_and_preallocate_expect_file_truncated_to_body(
+            self, tmp_path):
+        # Arrange
+        file_path = str(tmp_path / 'document.pdf')
+        resp = httpx.Response(
+            200,
+            headers={'Content-Length': str(len(CONTENT) * 2)},
+            content=iter([CONTENT[:1000], CONTENT[1000:]]))
+        file_hash = hashlib.sha256()
+
+        # Act
+        written = write_response(resp, file_path, file_hash=file_hash, preallocate=True)
+
+        # Assert
+        assert written == len(CONTENT)
+        assert _read(file_path) == CONTENT
+        assert file_hash.hexdigest() == hashlib.sha256(CONTENT).hexdigest()
+
+    def test_write_response_given_append_mode_expect_body_after_existing_bytes(self, tmp_path):
+        # Arrange
+        file_path = str(tmp_path / 'sample.fastq')
+        with open(file_path, 'wb') as file:
+            file.write(CONTENT[:100])
+        resp = httpx.Response(206, content=iter([CONTENT[100:]]))
+
+        # Act
+        write_response(resp, file_path, 'ab', buffer_size=4096)
+
+        # Assert
+        assert _read(file_path) == CONTENT
+
+
+def _read(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _write_partial(file_path, content, validator):
+    with open(get_part_path(file_path), 'wb') as part:
+        part.write(content)
+    with open(get_validator_path(file_path), 'w', encoding='UTF-8') as file:
+        file.write(validator)
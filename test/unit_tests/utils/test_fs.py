@@ -0,0 +1,53 @@
+import hashlib
+import io
+import os
+
+from trakka.utils.fs import HashingReader
+from trakka.utils.fs import sha256_file
+from trakka.utils.progress import TransferProgress
+from test.end_to_end_tests.ete_utils import _mk_temp_dir
+
+
+class TestFs:
+
+    def test_sha256_file_given_buffer_smaller_than_file_expect_same_hash_as_whole_read(self):
+        # Arrange
+        content = os.urandom(100_003)
+        path = os.path.join(_mk_temp_dir(), 'hash-me.bin')
+        with open(path, 'wb') as file:
+            file.write(content)
+
+        # Act
+        result = sha256_file(path, buffer_size=4096)
+
+        # Assert
+        assert result == hashlib.sha256(content).hexdigest()
+
+    def test_hashing_reader_given_rewind_between_reads_expect_hash_of_last_pass_only(self):
+        # Arrange
+        content = b'>seq1\nACGT\n' * 1000
+        reader = HashingReader(io.BytesIO(content))
+
+        # Act
+        reader.read(500)
+        reader.seek(0)
+        while reader.read(64):
+            pass
+
+        # Assert
+        assert reader.hexdigest() == hashlib.sha256(content).hexdigest()
+
+    def test_hashing_reader_given_progress_and_rewind_expect_progress_of_last_pass_only(self):
+        # Arrange
+        content = os.urandom(10_000)
+        progress = TransferProgress('Uploading hash-me.bin', len(content))
+        reader = HashingReader(io.BytesIO(content), progress)
+
+        # Act
+        reader.read(500)
+        reader.seek(0)
+        while reader.read(64):
+            pass
+
+        # Assert
+        assert progress.done == len(content)
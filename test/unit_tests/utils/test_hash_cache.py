@@ -0,0 +1,63 @@
+import hashlib
+import os
+
+from trakka.utils import hash_cache
+from trakka.utils.hash_cache import cached_sha256
+
+
+class TestHashCache:
+
+    def test_cached_sha256_given_unchanged_file_expect_second_call_not_rehashed(
+            self, tmp_path, monkeypatch):
+        # Arrange
+        path = tmp_path / 'sample.fastq'
+        path.write_bytes(b'@read1\nACGT\n+\nIIII\n')
+        hashed = _count_hashes(monkeypatch)
+
+        # Act
+        first = cached_sha256(str(path))
+        second = cached_sha256(str(path))
+
+        # Assert
+        assert first == second == hashlib.sha256(path.read_bytes()).hexdigest()
+        assert len(hashed) == 1
+
+    def test_cached_sha256_given_file_modified_expect_rehashed(self, tmp_path, monkeypatch):
+        # Arrange
+        path = tmp_path / 'sample.fastq'
+        path.write_bytes(b'@read1\nACGT\n+\nIIII\n')
+        cached_sha256(str(path))
+        path.write_bytes(b'@read1\nACGTACGT\n+\nIIIIIIII\n')
+        hashed = _count_hashes(monkeypatch)
+
+        # Act
+        result = cached_sha256(str(path))
+
+        # Assert
+        assert result == hashlib.sha256(path.read_bytes()).hexdigest()
+        assert len(hashed) == 1
+
+    def test_cached_sha256_given_cache_bypassed_expect_rehashed(self, tmp_path, monkeypatch):
+        # Arrange
+        path = tmp_path / 'sample.fastq'
+        path.write_bytes(b'@read1\nACGT\n+\nIIII\n')
+        cached_sha256(str(path))
+        hashed = _count_hashes(monkeypatch)
+
+        # Act
+        cached_sha256(str(path), use_cache=False)
+
+        # Assert
+        assert hashed == [os.path.realpath(path)]
+
+
+def _count_hashes(monkeypatch) -> list:
+    hashed = []
+    real_sha256_file = hash_cache.sha256_file
+
+    def counting_sha256_file(path):
+        hashed.append(path)
+        return real_sha256_file(path)
+
+    monkeypatch.setattr(hash_cache, 'sha256_file', counting_sha256_file)
+    return hashed
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from trakka.utils.json_stream import JsonRecordStream
+
+
+def _chunks(body: bytes, size: int):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+
+class TestJsonRecordStream:
+
+    def test_iter_given_body_split_at_every_byte_expect_same_records_as_json_loads(self):
+        # Arrange
+        body = json.dumps({
+            'messages': [{'ResponseType': 'Success', 'ResponseMessage': 'ok'}],
+            'data': [
+                {'sampleName': 'S1', 'read': 1, 'size': 12345.5, 'isActive': True},
+                {'sampleName': 'Ŝ2 ✓', 'read': None, 'tags': ['a', {'b': []}]},
+                123456789,
+                'text with "quotes" and ] brackets',
+            ],
+            'total': 4,
+        }, ensure_ascii=False, indent=1).encode()
+
+        # Act
+        stream = JsonRecordStream(_chunks(body, 1))
+        records = list(stream)
+
+        # Assert
+        expected = json.loads(body)
+        assert records == expected['data']
+        assert stream.envelope == {
+            'messages': expected['messages'], 'data': None, 'total': 4}
+
+    def test_iter_given_body_split_in_two_at_every_offset_expect_same_records(self):
+        # Arrange
+        body = b'{"data":[1.5,2,-3e-2,true,null,"x"],"messages":[],"total":10}'
+        expected = json.loads(body)
+
+        for offset in range(len(body) + 1):
+            # Act
+            stream = JsonRecordStream([body[:offset], body[offset:]])
+            records = list(stream)
+
+            # Assert
+            assert records == expected['data'], offset
+            assert stream.envelope['total'] == 10, offset
+
+    def test_iter_given_data_is_not_a_list_expect_single_record(self):
+        # Arrange
+        body = b'{"data": {"globalId": "abc"}, "messages": []}'
+
+        # Act
+        records = list(JsonRecordStream(_chunks(body, 7)))
+
+        # Assert
+        assert records == [{'globalId': 'abc'}]
+
+    def test_iter_given_empty_or_null_data_expect_no_records(self):
+        # Arrange
+        bodies = [b'{"data": [], "messages": []}', b'{"data": null}', b' { } ']
+
+        # Act
+        records = [list(JsonRecordStream(_chunks(body, 3))) for body in bodies]
+
+        # Assert
+        assert records == [[], [], []]
+
+    @pytest.mark.parametrize('body', [
+        b'[{"a": 1}]',
+        b'{"data": [{"a": 1}, ',
+        b'{"data": [{"a": 1} {"a": 2}]}',
+        b'{"data": [1, 2',
+        b'<html>Bad gateway</html>',
+    ])
+    def test_iter_given_invalid_body_expect_decode_error(self, body):
+        # Act / Assert
+        with pytest.raises(json.JSONDecodeError):
+            list(JsonRecordStream(_chunks(body, 4)))
@@ -0,0 +1,89 @@
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from trakka.components.sample import funcs as sample_funcs
+from trakka.utils import known_samples
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+
+
+@pytest.fixture(name='context')
+def fixture_context(monkeypatch):
+    context = {
+        CxtKey.URI: 'https://trakka.example',
+        CxtKey.TOKEN: 'token-1',
+        CxtKey.NO_CACHE: False,
+    }
+    monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(context.get))
+    return context
+
+
+class TestKnownSamples:
+
+    def test_load_given_other_user_expect_their_samples_not_known(self, context):
+        # Arrange
+        known_samples.add(['S1'])
+        context[CxtKey.TOKEN] = 'token-2'
+
+        # Act
+        known = known_samples.load()
+
+        # Assert
+        assert not known
+
+    def test_load_given_expired_sample_expect_not_known(self, context, monkeypatch):
+        # Arrange
+        known_samples.add(['S1'])
+        later = datetime.now() + known_samples.KNOWN_SAMPLE_TTL + timedelta(minutes=1)
+        monkeypatch.setattr(known_samples, 'datetime', type(
+            'FakeDatetime', (datetime,), {'now': staticmethod(lambda: later)}))
+        known_samples.add(['S2'])
+
+        # Act
+        known = known_samples.load()
+
+        # Assert
+        assert known == {'S2'}
+
+    def test_add_given_more_than_max_samples_expect_oldest_dropped(
+            self, context, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(known_samples, 'MAX_KNOWN_SAMPLES', 2)
+        earlier = datetime.now() - timedelta(days=1)
+        with monkeypatch.context() as patch:
+            patch.setattr(known_samples, 'datetime', type(
+                'FakeDatetime', (datetime,), {'now': staticmethod(lambda: earlier)}))
+            known_samples.add(['S1'])
+
+        # Act
+        known_samples.add(['S2', 'S3'])
+
+        # Assert
+        assert known_samples.load() == {'S2', 'S3'}
+
+    def test_load_given_no_cache_expect_nothing_known_or_recorded(self, context):
+        # Arrange
+        context[CxtKey.NO_CACHE] = True
+
+        # Act
+        known_samples.add(['S1'])
+        known = known_samples.load()
+
+        # Assert
+        assert not known
+        context[CxtKey.NO_CACHE] = False
+        assert not known_samples.load()
+
+    def test_purge_and_disable_sample_expect_samples_forgotten(self, context, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(sample_funcs, 'api_patch', lambda path, data=None: None)
+        known_samples.add(['S1', 'S2', 'S3'])
+
+        # Act
+        sample_funcs.purge_sample('S1')
+        sample_funcs.disable_sample(['S2'])
+
+        # Assert
+        assert known_samples.load() == {'S3'}
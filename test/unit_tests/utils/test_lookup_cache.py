@@ -0,0 +1,163 @@
+import base64
+import json
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from trakka.components.fieldtype.value import funcs as fieldtype_value_funcs
+from trakka.utils import lookup_cache
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+from trakka.utils.helpers import proforma
+from trakka.utils.helpers import tree
+from trakka.utils.lookup_cache import TREE
+from trakka.utils.lookup_cache import cached_lookup
+from trakka.utils.lookup_cache import get_lookup_cache_file
+from trakka.utils.lookup_cache import invalidate
+
+
+def _jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip('=')
+    return f'header.{payload}.signature'
+
+
+@pytest.fixture(name='context')
+def fixture_context(monkeypatch):
+    context = {
+        CxtKey.URI: 'https://trakka.example',
+        CxtKey.TOKEN: _jwt({'iss': 'issuer', 'oid': 'user-1', 'exp': 1}),
+        CxtKey.NO_CACHE: False,
+    }
+    monkeypatch.setattr(TrakkaCxt, 'get_value', staticmethod(context.get))
+    return context
+
+
+class _Fetch:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'treeId': self.calls}
+
+
+class TestLookupCache:
+
+    def test_cached_lookup_given_fresh_entry_expect_no_fetch(self, context):
+        # Arrange
+        fetch = _Fetch()
+
+        # Act
+        first = cached_lookup(TREE, 'T1', fetch)
+        second = cached_lookup(TREE, 'T1', fetch)
+
+        # Assert
+        assert fetch.calls == 1
+        assert second == first == {'treeId': 1}
+
+    def test_cached_lookup_given_expired_entry_expect_fetch(self, context, monkeypatch):
+        # Arrange
+        fetch = _Fetch()
+        cached_lookup(TREE, 'T1', fetch)
+        later = datetime.now() + lookup_cache.ENTITY_TTLS[TREE] + timedelta(minutes=1)
+        monkeypatch.setattr(lookup_cache, 'datetime', type(
+            'FakeDatetime', (datetime,), {'now': staticmethod(lambda: later)}))
+
+        # Act
+        result = cached_lookup(TREE, 'T1', fetch)
+
+        # Assert
+        assert fetch.calls == 2
+        assert result == {'treeId': 2}
+
+    def test_cached_lookup_given_refreshed_token_expect_same_entries(self, context):
+        # Arrange
+        fetch = _Fetch()
+        cached_lookup(TREE, 'T1', fetch)
+        context[CxtKey.TOKEN] = _jwt({'iss': 'issuer', 'oid': 'user-1', 'exp': 2})
+
+        # Act
+        cached_lookup(TREE, 'T1', fetch)
+
+        # Assert
+        assert fetch.calls == 1
+
+    @pytest.mark.parametrize('key, value', [
+        (CxtKey.TOKEN, _jwt({'iss': 'issuer', 'oid': 'user-2'})),
+        (CxtKey.URI, 'https://other.example'),
+    ])
+    def test_cached_lookup_given_other_user_or_server_expect_fetch(
+            self, context, key, value):
+        # Arrange
+        fetch = _Fetch()
+        cached_lookup(TREE, 'T1', fetch)
+        context[key] = value
+
+        # Act
+        cached_lookup(TREE, 'T1', fetch)
+
+        # Assert
+        assert fetch.calls == 2
+
+    def test_cached_lookup_given_no_cache_expect_fetch_and_nothing_written(self, context):
+        # Arrange
+        fetch = _Fetch()
+        context[CxtKey.NO_CACHE] = True
+
+        # Act
+        cached_lookup(TREE, 'T1', fetch)
+        cached_lookup(TREE, 'T1', fetch)
+
+        # Assert
+        assert fetch.calls == 2
+        with pytest.raises(FileNotFoundError):
+            open(get_lookup_cache_file(), encoding='UTF-8')
+
+    def test_invalidate_given_cached_entity_expect_fetch(self, context):
+        # Arrange
+        fetch = _Fetch()
+        cached_lookup(TREE, 'T1', fetch)
+
+        # Act
+        invalidate(TREE)
+        cached_lookup(TREE, 'T1', fetch)
+
+        # Assert
+        assert fetch.calls == 2
+
+    def test_get_tree_by_abbrev_given_use_cache_false_expect_request(
+            self, context, monkeypatch):
+        # Arrange
+        paths = []
+
+        def fake_get(path):
+            paths.append(path)
+            return {'data': {'treeId': len(paths)}}
+
+        monkeypatch.setattr(tree, 'api_get', fake_get)
+        tree.get_tree_by_abbrev('T1')
+
+        # Act
+        cached = tree.get_tree_by_abbrev('T1')
+        fresh = tree.get_tree_by_abbrev('T1', use_cache=False)
+
+        # Assert
+        assert cached == {'treeId': 1}
+        assert fresh == {'treeId': 2}
+        assert paths == ['Trees/abbrev/T1', 'Trees/abbrev/T1']
+
+    def test_add_fieldtype_values_given_cached_proforma_expect_refetched(
+            self, context, monkeypatch):
+        # Arrange
+        fetch = _Fetch()
+        monkeypatch.setattr(proforma, 'api_get', lambda path: {'data': fetch()})
+        monkeypatch.setattr(fieldtype_value_funcs, 'api_post', lambda path, data: {})
+        proforma.get_proforma_by_abbrev('PF')
+
+        # Act
+        fieldtype_value_funcs.add_fieldtype_values('State', ['TAS'])
+        proforma.get_proforma_by_abbrev('PF')
+
+        # Assert
+        assert fetch.calls == 2
@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from trakka.utils import output
+from trakka.utils.output import FORMATS
+from trakka.utils.output import convert_format
+from trakka.utils.output import print_dataframe
+from trakka.utils.output import write_format
+
+
+def _table(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'sampleName': [f'S{i}' for i in range(rows)],
+        'read': [str(i % 2 + 1) for i in range(rows)],
+        'size': [i * 1.5 if i % 5 else None for i in range(rows)],
+        'isActive': [i % 3 == 0 for i in range(rows)],
+        'note': ['has "quotes", commas\tand tabs' if i % 7 == 0 else None for i in range(rows)],
+    })
+
+
+def _written(dataframe: pd.DataFrame, output_format: str) -> str:
+    file = io.StringIO()
+    write_format(dataframe, file, output_format)
+    return file.getvalue()
+
+
+class TestOutput:
+
+    @pytest.mark.parametrize('output_format', [
+        FORMATS.CSV, FORMATS.TSV, FORMATS.JSON, FORMATS.PRETTY, FORMATS.HTML])
+    @pytest.mark.parametrize('rows', [0, 1, 7, 25])
+    def test_write_format_given_several_chunks_expect_same_output_as_convert_format(
+            self, monkeypatch, output_format, rows):
+        # Arrange
+        monkeypatch.setattr(output, 'OUTPUT_CHUNK_ROWS', 3)
+        dataframe = _table(rows)
+
+        # Act
+        written = _written(dataframe, output_format)
+
+        # Assert
+        assert written == convert_format(dataframe, output_format)
+
+    def test_write_format_given_pretty_table_longer_than_window_expect_columns_aligned(
+            self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(output, 'OUTPUT_CHUNK_ROWS', 4)
+        monkeypatch.setattr(output, 'PRETTY_WIDTH_WINDOW', 10)
+        dataframe = _table(30).drop(columns='note')
+
+        # Act
+        lines = _written(dataframe, FORMATS.PRETTY).splitlines()
+
+        # Assert
+        assert lines[:12] == convert_format(dataframe.iloc[:10], FORMATS.PRETTY).splitlines()
+        assert len(lines) == 32
+        read_end = lines[1].index('  ', lines[1].index('  ') + 2)
+        assert all(line[read_end - 1] in '12' for line in lines[2:])
+        assert lines[-1].split() == ['S29', '2', '43.5', 'False']
+
+    def test_print_dataframe_given_reader_closed_pipe_expect_quiet_exit(self, monkeypatch):
+        # Arrange
+        read_fd, write_fd = os.pipe()
+        os.close(read_fd)
+        stdout = os.fdopen(write_fd, 'w')
+        monkeypatch.setattr(sys, 'stdout', stdout)
+
+        # Act
+        with pytest.raises(SystemExit) as ex:
+            print_dataframe(_table(25), FORMATS.CSV)
+
+        # Assert
+        assert ex.value.code == 0
+        stdout.write('flushed at exit')
+        stdout.close()
@@ -0,0 +1,94 @@
+import json
+from datetime import datetime
+from datetime import timedelta
+
+from trakka.utils import version
+from trakka.utils.version import check_version
+from trakka.utils.version import get_version_check_file
+
+
+class _SyncThread:
+    """Runs the background refresh in the calling thread"""
+    def __init__(self, target, daemon):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+    def join(self, timeout=None):
+        pass
+
+
+def _write_cache(latest: str, checked: datetime):
+    with open(get_version_check_file(), 'w', encoding='UTF-8') as file:
+        json.dump({'latest': latest, 'checked': checked.isoformat()}, file)
+
+
+def _read_cache() -> dict:
+    with open(get_version_check_file(), encoding='UTF-8') as file:
+        return json.load(file)
+
+
+def _record_calls(monkeypatch, latest: str = '1.0.0'):
+    calls = {'fetched': 0, 'warned': []}
+
+    def fake_fetch_latest():
+        calls['fetched'] += 1
+        return latest
+
+    monkeypatch.setattr(version, '_fetch_latest', fake_fetch_latest)
+    monkeypatch.setattr(version, '_warn_if_newer',
+                        lambda current, latest: calls['warned'].append(latest))
+    monkeypatch.setattr(version.threading, 'Thread', _SyncThread)
+    calls['at_exit'] = []
+    monkeypatch.setattr(version.atexit, 'register',
+                        lambda func, *args: calls['at_exit'].append(args))
+    return calls
+
+
+class TestVersion:
+
+    def test_check_version_given_fresh_cache_expect_no_fetch(self, monkeypatch):
+        # Arrange
+        _write_cache('0.92.0', datetime.now() - timedelta(hours=1))
+        calls = _record_calls(monkeypatch)
+
+        # Act
+        check_version('0.91.0')
+
+        # Assert
+        assert calls == {'fetched': 0, 'warned': ['0.92.0'], 'at_exit': []}
+
+    def test_check_version_given_no_cache_expect_fetched_for_next_run(self, monkeypatch):
+        # Arrange
+        calls = _record_calls(monkeypatch, latest='0.92.0')
+
+        # Act
+        check_version('0.91.0')
+        check_version('0.91.0')
+
+        # Assert
+        assert calls == {'fetched': 1, 'warned': ['0.92.0'],
+                         'at_exit': [(version.VERSION_CHECK_EXIT_TIMEOUT,)]}
+        assert _read_cache()['latest'] == '0.92.0'
+
+    def test_check_version_given_stale_cache_and_fetch_fails_expect_not_retried(
+            self, monkeypatch):
+        # Arrange
+        _write_cache('0.92.0', datetime.now() - timedelta(days=2))
+        calls = _record_calls(monkeypatch)
+
+        def failing_fetch():
+            calls['fetched'] += 1
+            raise ConnectionError('PyPI unreachable')
+
+        monkeypatch.setattr(version, '_fetch_latest', failing_fetch)
+
+        # Act
+        check_version('0.91.0')
+        check_version('0.91.0')
+
+        # Assert
+        assert calls['fetched'] == 1
+        assert calls['warned'] == ['0.92.0', '0.92.0']
+        assert _read_cache()['latest'] == '0.92.0'
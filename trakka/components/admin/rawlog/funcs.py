@@ -3,6 +3,7 @@ from loguru import logger
 
 from trakka.utils.datetimes import dt_parse
 from trakka.utils.helpers.output import call_get_and_print
+from trakka.utils.helpers.output import call_get_list_and_print
 from trakka.utils.api import api_post, api_get
 from trakka.utils.misc import logger_wraps
 from trakka.utils.output import get_viewtype_columns
@@ -41,7 +42,7 @@ def list_raw_logs(spec: str, start: str, end: str, submitter: str, allow_no_filt
         params["submitterGlobalId"] = submitter
     
     columns = get_viewtype_columns(view_type, compact_fields, [])
-    call_get_and_print(
+    call_get_list_and_print(
         f"{TENANT_PATH}/RawLogs",
         out_format,
         params=params,
@@ -6,6 +6,8 @@ from trakka.utils.api import api_get
 from trakka.utils.api import api_post
 from trakka.utils.api import api_patch
 from trakka.utils.helpers.output import call_get_and_print
+from trakka.utils.lookup_cache import PROFORMA
+from trakka.utils.lookup_cache import invalidate
 from trakka.utils.misc import logger_wraps
 from trakka.utils.output import print_dataframe, get_viewtype_columns
 from trakka.utils.paths import METADATA_COLUMN_V2_PATH
@@ -92,6 +94,7 @@ def add_field(
             "NndssFieldLabel": nndss_label,
         }
     )
+    invalidate(PROFORMA)
 
 
 @logger_wraps()
@@ -153,6 +156,8 @@ def update_field(
         path=f"{METADATA_COLUMN_V2_PATH}/{name}",
         data=patch_fields
     )
+    # Cached pro formas include the name, type and valid values of their fields
+    invalidate(PROFORMA)
 
 
 @logger_wraps()
@@ -204,6 +209,7 @@ def disable_field(name: str):
     api_patch(
         path=f"{METADATA_COLUMN_V2_PATH}/{name}/disable"
     )
+    invalidate(PROFORMA)
 
 
 @logger_wraps()
@@ -214,3 +220,4 @@ def enable_field(name: str):
     api_patch(
         path=f"{METADATA_COLUMN_V2_PATH}/{name}/enable"
     )
+    invalidate(PROFORMA)
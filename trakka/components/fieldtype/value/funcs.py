@@ -1,21 +1,29 @@
 from typing import List
 
 from trakka.utils.api import api_post
+from trakka.utils.lookup_cache import PROFORMA
+from trakka.utils.lookup_cache import invalidate
 from trakka.utils.misc import logger_wraps
 from trakka.utils.paths import METADATA_COLUMN_TYPE_V2_PATH
 
 
 @logger_wraps()
 def add_fieldtype_values(name: str, field_values: List[str]):
-    return api_post(
+    response = api_post(
         path=f'{METADATA_COLUMN_TYPE_V2_PATH}/addValues/{name}',
         data=field_values
     )
+    # Cached pro formas list the valid values of their fields
+    invalidate(PROFORMA)
+    return response
 
 
 @logger_wraps()
 def remove_fieldtype_values(name: str, field_values: List[str]):
-    return api_post(
+    response = api_post(
         path=f'{METADATA_COLUMN_TYPE_V2_PATH}/removeValues/{name}',
         data=field_values
     )
+    # Cached pro formas list the valid values of their fields
+    invalidate(PROFORMA)
+    return response
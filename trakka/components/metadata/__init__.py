@@ -7,18 +7,25 @@ import click
 
 from trakka.utils.options import opt_proforma, opt_batch_size, opt_owner_org, opt_shared_projects
 from trakka.utils.options import opt_is_update
+from trakka.utils.options import opt_parallel
 from trakka.utils.options import opt_blanks_delete
+from trakka.utils.options import opt_resume
+from trakka.utils.options import opt_local_validation
 from trakka.components.metadata.funcs import add_metadata
 from trakka.components.metadata.funcs import validate_metadata
 from trakka.components.metadata.funcs import append_metadata
 
+PARALLEL_HELP = 'Number of batches to submit concurrently'
+
 ADD_APPEND_BATCH_SIZE_HELP = (
     'The number of rows to split the metadata upload into before uploading. '
     'If the file size is below this value, the file will not be split. '
     'An upload record will be recorded in the database per batch, and '
     'validation and success messages will be returned per batch. '
-    'Only CSV files will be batched; Excel files will be uploaded as one file. '
-    'A negative or 0 value can be used to indicate no batching.'
+    'Excel files are batched from the "Metadata submission" sheet, or the first sheet. '
+    'A negative or 0 value can be used to indicate no batching. '
+    'Until every batch is accepted, the accepted batches are recorded in '
+    'FILE.checkpoint.json so that a failed submission can be continued with --resume.'
 )
 
 
@@ -37,20 +44,29 @@ def metadata(ctx):
 @opt_blanks_delete()
 @opt_batch_size(help=ADD_APPEND_BATCH_SIZE_HELP,
                 default=5000)
+@opt_parallel(help=PARALLEL_HELP)
+@opt_resume()
+@opt_local_validation()
 def submission_add(
         file: BufferedReader,
         owner_org: str,
         shared_projects: List[str],
         proforma: str,
         blanks_will_delete: bool,
-        batch_size: int):
+        batch_size: int,
+        parallel: int,
+        resume: bool,
+        local_validation: bool):
     add_metadata(
         file, 
         owner_org, 
         shared_projects, 
         proforma, 
         blanks_will_delete, 
-        batch_size)
+        batch_size,
+        parallel,
+        resume,
+        local_validation)
 
 
 @metadata.command('update', help="""
@@ -66,20 +82,29 @@ def submission_add(
 @opt_blanks_delete()
 @opt_batch_size(help=ADD_APPEND_BATCH_SIZE_HELP,
                 default=5000)
+@opt_parallel(help=PARALLEL_HELP)
+@opt_resume()
+@opt_local_validation()
 def submission_append(
         file: BufferedReader, 
         owner_org: str,
         shared_projects: List[str],
         proforma: str, 
         blanks_will_delete: bool,
-        batch_size: int):   
+        batch_size: int,
+        parallel: int,
+        resume: bool,
+        local_validation: bool):   
     append_metadata(
         file, 
         owner_org, 
         shared_projects, 
         proforma, 
         blanks_will_delete, 
-        batch_size)
+        batch_size,
+        parallel,
+        resume,
+        local_validation)
 
 
 @metadata.command('validate')
@@ -92,14 +117,19 @@ def submission_append(
                      'Validation messages will be returned per batch.'
                      'A negative or 0 value can be used to indicate no batching.',
                 default=5000)
+@opt_parallel(help=PARALLEL_HELP)
+@opt_local_validation()
 def submission_validate(
         file: BufferedReader, 
         owner_org: str, 
         proforma: str, 
         is_update: bool, 
-        batch_size: int):
+        batch_size: int,
+        parallel: int,
+        local_validation: bool):
     """
     Check uploaded content for errors and warnings. This is a read-only
     action. No data will modified.
     """
-    validate_metadata(file, owner_org, proforma, is_update, batch_size)
+    validate_metadata(
+        file, owner_org, proforma, is_update, batch_size, parallel, local_validation)
@@ -0,0 +1,78 @@
+"""
+A record of which batches of a metadata submission the server has accepted,
+kept next to the submitted file while a batched submission is in progress.
+After a failure, `--resume` submits only the batches not yet accepted.
+
+Accepted batches are recorded by the hash of their rows, so the rows that
+failed can be fixed in the file before resuming: a batch whose rows have
+changed is submitted again. The checkpoint also records the submission's
+options, and is only resumed if they still match. It is removed once every
+batch has been accepted.
+"""
+import json
+import os
+from typing import Dict
+from typing import Set
+
+from loguru import logger
+
+from trakka.utils.exceptions import TrakkaCliException
+from trakka.utils.fs import atomic_write
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+SUBMISSION_KEY = 'submission'
+COMPLETED_KEY = 'completed'
+
+
+def get_checkpoint_path(source_path: str) -> str:
+    return f'{source_path}{CHECKPOINT_SUFFIX}'
+
+
+class SubmissionCheckpoint:
+    """
+    The accepted batches of one submission, identified by the hash of their
+    rows. submission holds whatever identifies the submission, eg. the
+    endpoint and batch size.
+    """
+    def __init__(self, source_path: str, submission: Dict, resume: bool):
+        self.path = get_checkpoint_path(source_path)
+        self.submission = submission
+        self.completed: Set[str] = self._load() if resume else set()
+
+    def _load(self) -> Set[str]:
+        try:
+            with open(self.path, encoding='UTF-8') as file:
+                saved = json.load(file)
+        except FileNotFoundError:
+            logger.info(f'No checkpoint found at {self.path}; submitting every batch')
+            return set()
+        except (OSError, ValueError) as ex:
+            raise TrakkaCliException(
+                f'Could not read checkpoint {self.path}: {ex}') from ex
+        if saved.get(SUBMISSION_KEY) != self.submission:
+            raise TrakkaCliException(
+                f'Checkpoint {self.path} is for different submission options. '
+                'Run without --resume to submit every batch again.')
+        completed = set(saved.get(COMPLETED_KEY, []))
+        logger.info(f'Resuming: {len(completed)} batch(es) already accepted; '
+                    'batches with the same rows will be skipped')
+        return completed
+
+    def record(self, batch_hash: str):
+        self.completed.add(batch_hash)
+        try:
+            with atomic_write(self.path) as file:
+                json.dump({
+                    SUBMISSION_KEY: self.submission,
+                    COMPLETED_KEY: sorted(self.completed),
+                }, file)
+        except OSError as ex:
+            logger.warning(f'Could not update checkpoint {self.path}: {ex}')
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as ex:
+            logger.warning(f'Could not remove checkpoint {self.path}: {ex}')
@@ -0,0 +1,47 @@
+"""
+Reading a CSV or Excel metadata submission a chunk of rows at a time, as
+DataFrames of text, so that a large file is never held in memory at once.
+"""
+from io import BufferedReader
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from trakka.components.metadata.xlsx import iter_xlsx_rows
+
+
+def iter_frames(file: BufferedReader, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Yield an empty frame with the file's columns, then its rows in frames of
+    up to chunk_rows, all as str. Blank cells are ''; a CSV row shorter than
+    the header is padded with NaN. Nothing is yielded for a file with no
+    header.
+    """
+    suffix = Path(file.name).suffix
+    if suffix == '.csv':
+        chunks = pd.read_csv(
+            file,
+            dtype=str,
+            index_col=False,
+            keep_default_na=False,
+            chunksize=chunk_rows,
+        )
+        first = next(chunks, None)
+        if first is None:
+            return
+        yield first.iloc[:0]
+        if len(first.index) > 0:
+            yield first
+        yield from chunks
+    elif suffix == '.xlsx':
+        rows = iter_xlsx_rows(file)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield pd.DataFrame(columns=header, dtype=str)
+        while chunk := list(islice(rows, chunk_rows)):
+            yield pd.DataFrame(chunk, columns=header, dtype=str)
+    else:
+        raise ValueError('File must be .csv or .xlsx')
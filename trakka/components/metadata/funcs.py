@@ -1,15 +1,35 @@
+from concurrent.futures import Future
+from dataclasses import dataclass
+import hashlib
+from contextlib import closing
+from itertools import chain
+from itertools import islice
+from time import sleep
+from typing import Iterator
 from typing import List
 
 from pathlib import Path
-from io import BufferedReader, StringIO
-import codecs
+from io import BufferedReader, BytesIO
 
+from httpx import HTTPError
+from httpx import TransportError
 from loguru import logger
-import pandas as pd
 
 from trakka.utils.misc import logger_wraps
 from trakka.utils.api import api_post_multipart
+from trakka.utils.api import api_post_multipart_raw
+from trakka.utils.api import get_response
+from trakka.utils.exceptions import FailedResponseException
+from trakka.utils.exceptions import TrakkaCliException
+from trakka.utils.exceptions import UnknownResponseException
+from trakka.utils.output import log_response
+from trakka.utils.parallel import DEFAULT_PARALLEL
+from trakka.utils.parallel import map_concurrently
 from trakka.utils.paths import SUBMISSION_PATH
+from trakka.utils.retry import retry
+from trakka.components.metadata.checkpoint import SubmissionCheckpoint
+from trakka.components.metadata.local_validation import check_submission
+from trakka.components.metadata.frames import iter_frames
 
 SUBMISSION_UPLOAD = 'UploadSubmissions'
 SUBMISSION_UPLOAD_APPEND = 'UploadSubmissions?appendMode=True'
@@ -22,6 +42,11 @@ METADATA_BY_FIELD_PATH = 'by-field'
 OWNER_ORG_HEADER = 'X-Metadata-Owner-Org-Abbrev'
 SHARED_PROJECTS_HEADER = 'X-Metadata-Shared-Projects-Abbrev'
 
+# Further attempts at a batch after a server error or a dropped connection,
+# the first after BATCH_RETRY_DELAY seconds and each later one after twice as long
+BATCH_RETRIES = 2
+BATCH_RETRY_DELAY = 2.0
+
 @logger_wraps()
 def add_metadata(
         file: BufferedReader,
@@ -30,7 +55,12 @@ def add_metadata(
         proforma_abbrev: str,
         blanks_will_delete: bool,
         batch_size: int,
+        parallel: int = DEFAULT_PARALLEL,
+        resume: bool = False,
+        local_validation: bool = True,
 ):
+    if local_validation:
+        check_submission(file, proforma_abbrev, False, blanks_will_delete)
     path = "/".join([SUBMISSION_PATH, SUBMISSION_UPLOAD])
     if blanks_will_delete:
         path = f"{path}?{DELETE_ON_BLANK_PARAM}"
@@ -40,7 +70,9 @@ def add_metadata(
         owner_org, 
         shared_projects, 
         proforma_abbrev, 
-        batch_size)
+        batch_size,
+        parallel,
+        resume=resume)
 
 
 @logger_wraps()
@@ -51,7 +83,12 @@ def append_metadata(
         proforma_abbrev: str,
         blanks_will_delete: bool,
         batch_size: int,
+        parallel: int = DEFAULT_PARALLEL,
+        resume: bool = False,
+        local_validation: bool = True,
 ):
+    if local_validation:
+        check_submission(file, proforma_abbrev, True, blanks_will_delete)
     path = "/".join([SUBMISSION_PATH, SUBMISSION_UPLOAD_APPEND])
     
     if blanks_will_delete:
@@ -63,7 +100,9 @@ def append_metadata(
         owner_org, 
         shared_projects, 
         proforma_abbrev, 
-        batch_size)
+        batch_size,
+        parallel,
+        resume=resume)
 
 
 @logger_wraps()
@@ -73,10 +112,32 @@ def validate_metadata(
         proforma_abbrev: str,
         is_append: bool,
         batch_size: int,
+        parallel: int = DEFAULT_PARALLEL,
+        local_validation: bool = True,
 ):
+    if local_validation:
+        check_submission(file, proforma_abbrev, is_append)
     path = SUBMISSION_VALIDATE_APPEND if is_append else SUBMISSION_VALIDATE
     path = "/".join([SUBMISSION_PATH, path])
-    _call_batched_submission(path, file, owner_org, [], proforma_abbrev, batch_size)
+    # Validation changes nothing on the server, so there is nothing to resume
+    _call_batched_submission(
+        path, file, owner_org, [], proforma_abbrev, batch_size, parallel, checkpoint=False)
+
+
+@dataclass
+class _Batch:
+    """A batch of rows from the submitted file, serialised as its own CSV file"""
+    first_row: int
+    last_row: int
+    body: BytesIO
+
+    @property
+    def rows(self) -> str:
+        return f"{self.first_row}-{self.last_row}"
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.body.getvalue()).hexdigest()
 
 
 def _call_batched_submission(
@@ -86,43 +147,145 @@ def _call_batched_submission(
         shared_projects: List[str],
         proforma_abbrev: str,
         batch_size: int,
-):    
+        parallel: int = DEFAULT_PARALLEL,
+        resume: bool = False,
+        checkpoint: bool = True,
+):
+    """
+    Submit the file in batches of batch_size rows. With checkpoint, the
+    batches the server accepts are recorded next to the file until every
+    batch has been accepted, and resume skips batches with the same rows
+    as one recorded by an earlier run of the same submission.
+    """
     if batch_size < 1:
         _call_submission(path, file, owner_org, shared_projects, proforma_abbrev)
         return
     
-    filepath = Path(file.name)
-    # pylint: disable=C0103
-    if filepath.suffix == '.csv':
-        df = pd.read_csv(file, dtype=str, index_col=False, keep_default_na=False, na_values='')
+    # Closed before the caller closes the file, even if a batch fails
+    with closing(_iter_batches(file, batch_size)) as source:
+        first_batches = list(islice(source, 2))
+        if len(first_batches) < 2:
+            # Just upload the original file
+            source.close()
+            file.seek(0)
+            _call_submission(path, file, owner_org, shared_projects, proforma_abbrev)
+            return
+
+        progress = None
+        if checkpoint:
+            progress = SubmissionCheckpoint(file.name, {
+                'path': path,
+                'owner_org': owner_org,
+                'shared_projects': list(shared_projects),
+                'proforma': proforma_abbrev,
+                'batch_size': batch_size,
+            }, resume)
+
+        logger.info(f"Uploading rows in batches of {batch_size}, {parallel} at a time")
+        failed = []
+        for batch, future in map_concurrently(
+                lambda b: _post_batch(path, b, owner_org, shared_projects, proforma_abbrev),
+                _skip_completed(chain(first_batches, source), progress),
+                parallel):
+            if not _report_batch(batch, future):
+                failed.append(batch.rows)
+            elif progress is not None:
+                progress.record(batch.sha256)
+
+        if failed:
+            raise TrakkaCliException(
+                f"Failed to submit {len(failed)} batch(es), rows: {', '.join(failed)}."
+                + (" Fix the rows or retry, then run again with --resume to submit only the "
+                   "batches not yet accepted." if progress is not None else ""))
+        if progress is not None:
+            progress.remove()
+    logger.info("Batched submission complete")
+
+
+def _skip_completed(
+        batches: Iterator[_Batch],
+        progress: SubmissionCheckpoint = None,
+) -> Iterator[_Batch]:
+    for batch in batches:
+        if progress is not None and batch.sha256 in progress.completed:
+            logger.info(f"Skipping rows {batch.rows}, accepted by an earlier run")
+            continue
+        yield batch
+
+
+def _report_batch(batch: _Batch, future: Future) -> bool:
+    """Log the server's messages for one batch; returns whether it succeeded"""
+    try:
+        response = future.result()
+        logger.info(f"Rows {batch.rows}:")
+        get_response(response, log_resp=True)
+        return True
+    except FailedResponseException as ex:
+        logger.error(f"Rows {batch.rows} failed")
+        log_response(ex.parsed_resp)
+    except (UnknownResponseException, HTTPError) as ex:
+        logger.error(f"Rows {batch.rows} failed")
+        logger.error(ex)
+    return False
 
-    elif filepath.suffix == '.xlsx':
-        # Batching not currently supported, just upload the original file
-        _call_submission(path, file, owner_org, shared_projects, proforma_abbrev)
-        return
-    
-    if filepath.suffix != '.csv':
-        raise ValueError('File must be .csv or .xlsx')
-    
-    # pylint: disable=possibly-used-before-assignment
-    num_rows = df.shape[0]
-    if num_rows <= batch_size:
-        # Just upload the original file
-        file.seek(0)
-        _call_submission(path, file, owner_org, shared_projects, proforma_abbrev)
-        return
-    
-    logger.info(f"Uploading {num_rows} rows in batches of {batch_size}")
-    encode = codecs.getwriter('utf-8')
-    for index in range(0, num_rows, batch_size):
-        logger.info(f"Uploading rows {index}-{index+batch_size-1}")
-        chunk = df.iloc[index:index+batch_size, :]
-        buffer = StringIO()
-        buffer.name = f"{filepath.stem}_batch_rows{index}-{index+batch_size-1}.csv"
-        chunk.to_csv(buffer, index=False)
-        _call_submission(path, encode(buffer), owner_org, shared_projects, proforma_abbrev)
-        
-    logger.info("Batched upload complete")
+
+def _iter_batches(file: BufferedReader, batch_size: int) -> Iterator[_Batch]:
+    """Read and serialise each batch of rows in turn, so only the batches in flight are held"""
+    stem = Path(file.name).stem
+    frames = iter_frames(file, batch_size)
+    next(frames, None)
+    first_row = 0
+    for frame in frames:
+        yield _make_batch(first_row, len(frame.index), frame.to_csv(index=False), stem)
+        first_row += len(frame.index)
+
+
+def _make_batch(first_row: int, num_rows: int, csv_text: str, stem: str) -> _Batch:
+    last_row = first_row + num_rows - 1
+    body = BytesIO(csv_text.encode('utf-8'))
+    body.name = f"{stem}_batch_rows{first_row}-{last_row}.csv"
+    return _Batch(first_row, last_row, body)
+
+
+def _post_batch(
+        path: str,
+        batch: _Batch,
+        owner_org: str,
+        shared_projects: List[str],
+        proforma_abbrev: str,
+):
+    """
+    Post one batch, trying again after a server error or a dropped
+    connection. Any other response, including a rejected batch, is returned
+    to be reported.
+    """
+    responses = []
+    attempts = 0
+
+    def _attempt():
+        nonlocal attempts
+        if attempts:
+            sleep(BATCH_RETRY_DELAY * 2 ** (attempts - 1))
+        attempts += 1
+        logger.info(f"Uploading rows {batch.rows}")
+        batch.body.seek(0)
+        try:
+            response = api_post_multipart_raw(
+                path=path,
+                data={
+                    'proforma-abbrev': proforma_abbrev,
+                },
+                files={'file': (batch.body.name, batch.body)},
+                custom_headers=_submission_headers(owner_org, shared_projects),
+            )
+        except TransportError as ex:
+            raise UnknownResponseException(f"{type(ex).__name__}: {ex}") from ex
+        if response.status_code >= 500:
+            get_response(response)
+        responses.append(response)
+
+    retry(_attempt, BATCH_RETRIES, f"rows {batch.rows} at {path}")
+    return responses[-1]
 
 
 def _call_submission(
@@ -132,15 +295,18 @@ def _call_submission(
         shared_projects: List[str],
         proforma_abbrev: str,
 ):
-    headers = {OWNER_ORG_HEADER: owner_org,}
-    if shared_projects:
-        headers[SHARED_PROJECTS_HEADER] = ",".join(shared_projects)
-
     api_post_multipart(
         path=path,
         data={
             'proforma-abbrev': proforma_abbrev,
         },
         files={'file': (file.name, file)},
-        custom_headers=headers
+        custom_headers=_submission_headers(owner_org, shared_projects),
     )
+
+
+def _submission_headers(owner_org: str, shared_projects: List[str]) -> dict:
+    headers = {OWNER_ORG_HEADER: owner_org,}
+    if shared_projects:
+        headers[SHARED_PROJECTS_HEADER] = ",".join(shared_projects)
+    return headers
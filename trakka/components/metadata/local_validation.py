@@ -0,0 +1,218 @@
+"""
+Checking a metadata submission against its pro forma before anything is
+uploaded. Missing required columns, blank required values, values outside a
+categorical field's valid values, and numbers and dates that cannot be
+parsed are found a column at a time with pandas, a chunk of rows at a time,
+and reported per cell. The server still validates everything it is sent;
+this only catches the errors that can be found without it.
+
+The pro forma spec comes from the local lookup cache, so a check repeated
+within the hour does not need the server at all. As the cached spec may be
+out of date, a file that fails the check is checked again against the spec
+on the server before any error is reported.
+"""
+from dataclasses import dataclass
+from io import BufferedReader
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from trakka.utils.exceptions import TrakkaCliException
+from trakka.utils.helpers.proforma import get_proforma_by_abbrev
+from trakka.components.metadata.frames import iter_frames
+
+SEQ_ID_COLUMN = 'Seq_ID'
+# Pro formas still list these, but the server ignores them in a submission;
+# ownership and sharing come from --owner and --project
+IGNORED_COLUMNS = {'Owner_group', 'Shared_groups'}
+CHUNK_ROWS = 50_000
+MAX_REPORTED_ERRORS = 100
+MAX_LISTED_VALUES = 10
+
+# A field with no primitive type is categorical, as in the pro forma template
+CATEGORICAL = 'categorical'
+INTEGER = 'number'
+DOUBLE = 'double'
+DATE = 'date'
+
+
+@dataclass
+class FieldSpec:
+    name: str
+    type: str
+    is_required: bool
+    valid_values: List[str]
+
+
+def check_submission(
+        file: BufferedReader,
+        proforma_abbrev: str,
+        is_append: bool,
+        blanks_will_delete: bool = False,
+):
+    """
+    Raise TrakkaCliException, after logging each error found, if the file
+    does not satisfy the pro forma. In append mode only Seq_ID is required,
+    and blank cells are ignored unless they will delete values. The file is
+    rewound afterwards, ready to be submitted.
+    """
+    blanks_are_errors = not is_append or blanks_will_delete
+    report = _check_file(file, get_proforma_fields(proforma_abbrev), is_append, blanks_are_errors)
+    if report.count:
+        logger.info(f"Checking the file again against pro forma {proforma_abbrev} from the server")
+        report = _check_file(
+            file,
+            get_proforma_fields(proforma_abbrev, use_cache=False),
+            is_append,
+            blanks_are_errors)
+
+    if report.unknown_columns:
+        logger.warning(f"Columns not in the pro forma: {', '.join(report.unknown_columns)}")
+    if report.count:
+        report.log()
+        raise TrakkaCliException(
+            f"Found {report.count} error(s) checking the file against pro forma "
+            f"{proforma_abbrev}; nothing was submitted. "
+            "Use --no-local-validation to send the file to the server as it is.")
+    logger.info(f"Checked the file against pro forma {proforma_abbrev}: no errors found")
+
+
+def get_proforma_fields(abbrev: str, use_cache: bool = True) -> List[FieldSpec]:
+    return [
+        FieldSpec(
+            name=mapping['metaDataColumnName'],
+            type=mapping.get('metaDataColumnPrimitiveType') or CATEGORICAL,
+            is_required=mapping.get('isRequired') in (True, 'True'),
+            valid_values=list(mapping.get('metaDataColumnValidValues') or []),
+        )
+        for mapping in get_proforma_by_abbrev(abbrev, use_cache)['columnMappings']
+    ]
+
+
+def _check_file(
+        file: BufferedReader,
+        proforma_fields: List[FieldSpec],
+        is_append: bool,
+        blanks_are_errors: bool,
+) -> '_ErrorReport':
+    """Check the whole file against the pro forma's fields, then rewind it"""
+    fields = {
+        field.name: field for field in proforma_fields
+        if field.name not in IGNORED_COLUMNS
+    }
+    report = _ErrorReport()
+    frames = iter_frames(file, CHUNK_ROWS)
+    header = next(frames, None)
+    if header is not None:
+        _check_columns(list(header.columns), fields, is_append, report)
+        first_row = 0
+        for frame in frames:
+            _check_frame(frame, first_row, fields, blanks_are_errors, report)
+            first_row += len(frame.index)
+    file.seek(0)
+    return report
+
+
+def _check_columns(
+        columns: List[str],
+        fields: Dict[str, FieldSpec],
+        is_append: bool,
+        report: '_ErrorReport',
+):
+    required = [SEQ_ID_COLUMN] if is_append \
+        else [name for name, field in fields.items() if field.is_required]
+    for name in required:
+        if name not in columns:
+            report.add_column(name, 'required column is missing')
+    report.unknown_columns = [
+        name for name in columns if name not in fields and name not in IGNORED_COLUMNS]
+
+
+def _check_frame(
+        frame: pd.DataFrame,
+        first_row: int,
+        fields: Dict[str, FieldSpec],
+        blanks_are_errors: bool,
+        report: '_ErrorReport',
+):
+    for column in frame.columns:
+        field = fields.get(column)
+        if field is None:
+            continue
+        # Metadata columns repeat a few values many times, so each distinct
+        # value is checked once and the result mapped back to the rows.
+        # Short rows in a CSV file are padded with NaN.
+        codes, distinct = pd.factorize(frame[column].fillna(''))
+        values = pd.Series(distinct, dtype=str).str.strip()
+        blank = (values == '').to_numpy()
+        if field.is_required and blanks_are_errors:
+            report.add(values, codes, first_row, column, blank, 'required value is blank')
+        invalid = _find_invalid(values, field)
+        if invalid is not None:
+            report.add(values, codes, first_row, column, ~blank & invalid, _describe(field))
+
+
+def _find_invalid(values: pd.Series, field: FieldSpec) -> Optional[np.ndarray]:
+    """Which values cannot be valid for the field's type, or None if any may be"""
+    if field.type == CATEGORICAL and field.valid_values:
+        # Valid values are compared ignoring case, so that only values the
+        # server would certainly reject are reported
+        allowed = {value.casefold() for value in field.valid_values}
+        valid = values.str.casefold().isin(allowed)
+    elif field.type == INTEGER:
+        valid = values.str.fullmatch(r'[+-]?\d+')
+    elif field.type == DOUBLE:
+        valid = pd.to_numeric(values, errors='coerce').notna()
+    elif field.type == DATE:
+        valid = pd.to_datetime(values, format='ISO8601', errors='coerce', utc=True).notna()
+    else:
+        return None
+    return ~valid.to_numpy(dtype=bool)
+
+
+def _describe(field: FieldSpec) -> str:
+    if field.type == CATEGORICAL:
+        if len(field.valid_values) > MAX_LISTED_VALUES:
+            return 'is not one of the valid values for the field'
+        return f"is not one of {', '.join(field.valid_values)}"
+    if field.type == INTEGER:
+        return 'is not a whole number'
+    if field.type == DOUBLE:
+        return 'is not a number'
+    return 'is not an ISO 8601 date, eg. 2024-01-31'
+
+
+class _ErrorReport:
+    """Counts every error, and keeps the first MAX_REPORTED_ERRORS to log"""
+    def __init__(self):
+        self.count = 0
+        self.errors: List[str] = []
+        self.unknown_columns: List[str] = []
+
+    def add_column(self, column: str, message: str):
+        self.count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Column {column}: {message}")
+
+    def add(self, values: pd.Series, codes: np.ndarray, first_row: int, column: str,
+            invalid: np.ndarray, message: str):
+        """Report the rows whose code is that of an invalid value"""
+        if not invalid.any():
+            return
+        positions = invalid[codes].nonzero()[0]
+        self.count += len(positions)
+        for position in positions[:MAX_REPORTED_ERRORS - len(self.errors)]:
+            value = values.iat[codes[position]]
+            self.errors.append(
+                f"Row {first_row + position}, {column}: '{value}' {message}"
+                if value else f"Row {first_row + position}, {column}: {message}")
+
+    def log(self):
+        for error in self.errors:
+            logger.error(error)
+        if self.count > len(self.errors):
+            logger.error(f"... and {self.count - len(self.errors)} more")
@@ -0,0 +1,54 @@
+"""
+Reading the rows of an Excel metadata submission without loading the whole
+sheet. The workbook is opened in openpyxl's read-only mode, which parses the
+sheet as it is iterated, and each cell is rendered as the text it would have
+in a CSV submission.
+"""
+from datetime import date
+from datetime import datetime
+from datetime import time
+from typing import BinaryIO
+from typing import Iterator
+from typing import List
+
+from openpyxl import load_workbook
+
+METADATA_SHEET_NAME = 'Metadata submission'
+
+
+def iter_xlsx_rows(file: BinaryIO) -> Iterator[List[str]]:
+    """
+    Yield the header row and then each data row of the submission sheet, as
+    text. The sheet is the one a generated pro forma names
+    'Metadata submission', or else the first. Rows are cut to the width of
+    the header, and rows with no values are skipped.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook[METADATA_SHEET_NAME] \
+            if METADATA_SHEET_NAME in workbook.sheetnames else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = [format_cell(value) for value in next(rows, ())]
+        while header and header[-1] == '':
+            header.pop()
+        if not header:
+            return
+        yield header
+        for row in rows:
+            values = [format_cell(value) for value in row[:len(header)]]
+            if any(values):
+                yield values + [''] * (len(header) - len(values))
+    finally:
+        workbook.close()
+
+
+def format_cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == time() else value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -6,6 +6,8 @@ from trakka.utils.api import api_post, api_patch, api_get, api_put
 from trakka.utils.helpers.output import call_get_and_print
 from trakka.utils.helpers.project import get_project_by_abbrev
 from trakka.utils.helpers.plots import get_plot_by_abbrev
+from trakka.utils.lookup_cache import PLOT
+from trakka.utils.lookup_cache import invalidate
 from trakka.utils.misc import logger_wraps
 from trakka.utils.paths import PLOT_PATH
 
@@ -70,7 +72,7 @@ def update_plot(
     else:
         spec_string = None
             
-    plot = get_plot_by_abbrev(abbrev)
+    plot = get_plot_by_abbrev(abbrev, use_cache=False)
     plot_put = {
         prop: plot[prop] for prop in [
             'abbreviation',
@@ -98,6 +100,7 @@ def update_plot(
         path=f'{PLOT_PATH}/{abbrev}',
         data=plot_put
     )
+    invalidate(PLOT)
 
 
 @logger_wraps()
@@ -107,6 +110,7 @@ def disable_plot(abbrev: str):
     api_patch(
         path=f'{PLOT_PATH}/{abbrev}/disable',
     )
+    invalidate(PLOT)
 
     logger.info('Done.')
 
@@ -118,6 +122,7 @@ def enable_plot(abbrev: str):
     api_patch(
         path=f'{PLOT_PATH}/{abbrev}/enable',
     )
+    invalidate(PLOT)
 
     logger.info('Done.')
 
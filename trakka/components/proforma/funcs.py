@@ -13,12 +13,15 @@ from trakka.utils.exceptions import \
     UnknownResponseException, \
     TrakkaCliException
 from trakka.utils.helpers.upload import upload_multipart
+from trakka.utils.helpers.proforma import get_proforma_by_abbrev
 from trakka.utils.helpers.share import resolve_share_targets
+from trakka.utils.lookup_cache import PROFORMA
+from trakka.utils.lookup_cache import invalidate
 from trakka.utils.misc import logger_wraps
 from trakka.utils.output import print_dataframe, log_response, get_viewtype_columns
 from trakka.utils.paths import PROFORMA_PATH
 from trakka.utils.retry import retry
-from trakka.utils.fs import FileHash, get_hash
+from trakka.utils.fs import HashingReader
 from .proforma_generation_utils import generate_template
 
 ATTACH = 'Attach'
@@ -40,6 +43,7 @@ def disable_proforma(abbrev: str):
     api_patch(
         path=f'{PROFORMA_PATH}/{abbrev}/disable',
     )
+    invalidate(PROFORMA)
 
     logger.info('Done.')
 
@@ -51,6 +55,7 @@ def enable_proforma(abbrev: str):
     api_patch(
         path=f'{PROFORMA_PATH}/{abbrev}/enable',
     )
+    invalidate(PROFORMA)
 
     logger.info('Done.')
 
@@ -94,6 +99,7 @@ def update_proforma(abbrev: str, name: str, description: str):
         path=f'{PROFORMA_PATH}/{abbrev}/{UPDATE}',
         data=data,
     )
+    invalidate(PROFORMA)
 
 
 @logger_wraps()
@@ -106,7 +112,7 @@ def add_version_proforma(
 
     _validate_add_version_args(inherit, required_columns, optional_columns, remove_field)
 
-    data = api_get(path=f'{PROFORMA_PATH}/abbrev/{abbrev}')['data']
+    data = get_proforma_by_abbrev(abbrev, use_cache=False)
 
     current_field_spec = {field['metaDataColumnName']: field['isRequired']
                           for field in data['columnMappings']}
@@ -140,6 +146,7 @@ def add_version_proforma(
             "abbreviation": abbrev,
             "columnNames": column_names
         })
+    invalidate(PROFORMA)
 
     logger.info('Done.')
 
@@ -174,9 +181,9 @@ def attach_proforma(abbrev: str,
     abbrev:
     file:
     """
-    file_hash = get_hash(filepath)
     with open(filepath, 'rb') as file_content:
-        files = [('files[]', (filepath, file_content))]
+        hashed_file = HashingReader(file_content)
+        files = [('files[]', (filepath, hashed_file))]
 
         custom_headers = {
             'proforma-abbrev': abbrev,
@@ -184,7 +191,7 @@ def attach_proforma(abbrev: str,
         }
         try:
             retry(
-                func=lambda f=files, fh=file_hash, ch=custom_headers: _post_proforma(f, fh, ch),
+                func=lambda f=files, hf=hashed_file, ch=custom_headers: _post_proforma(f, hf, ch),
                 retries=0,
                 desc=f"{abbrev} at " + "/".join([PROFORMA_PATH, ATTACH]),
                 delay=0.0
@@ -197,6 +204,7 @@ def attach_proforma(abbrev: str,
         ) as ex:
             logger.error(f'Pro Forma {abbrev} failed upload')
             logger.error(ex)
+    invalidate(PROFORMA)
 
 
 @logger_wraps()
@@ -208,10 +216,7 @@ def generate_proforma(
 ):
     "Generate an XLSX template for a pro forma"    
     # Get the pro forma spec
-    response = api_get(
-        path=f"{PROFORMA_PATH}/abbrev/{abbrev}"
-    )
-    field_df = _get_proforma_fields_df(response['data'])
+    field_df = _get_proforma_fields_df(get_proforma_by_abbrev(abbrev))
     field_df.index = field_df['name']
     restricted_values = {
         field:sum([v.split(',') for v in valuestr.split(';')],[])
@@ -350,10 +355,10 @@ def list_groups_proforma(abbrev: str, out_format: str):
     )
 
 
-def _post_proforma(files, file_hash: FileHash, custom_headers: dict):
+def _post_proforma(files, hashed_file: HashingReader, custom_headers: dict):
     upload_multipart(path="/".join([PROFORMA_PATH, ATTACH]),
                      files=files,
-                     file_hash=file_hash,
+                     hashed_file=hashed_file,
                      custom_headers=custom_headers)
 
 def _validate_add_version_args(
@@ -409,6 +414,7 @@ def _build_field_spec(
 
 def rm_attach_proforma(identifier: str, version: int):
     api_delete(path=f'{PROFORMA_PATH}/{identifier}/{version}/Attach')
+    invalidate(PROFORMA)
 
 
 def update_field_class_proforma(
@@ -416,10 +422,7 @@ def update_field_class_proforma(
         field_identifiers: List[str],
         metadata_class: str,
 ):
-    response = api_get(
-        path=f"{PROFORMA_PATH}/abbrev/{identifier}"
-    )
-    fields = response["data"]["columnMappings"]
+    fields = get_proforma_by_abbrev(identifier, use_cache=False)["columnMappings"]
     field_abbrevs = [f["metaDataColumnName"] for f in fields]
     field_global_ids = [f["metaDataColumnGlobalId"] for f in fields]
     for field_identifier in field_identifiers:
@@ -435,3 +438,4 @@ def update_field_class_proforma(
                 "class": metadata_class,
             },
         )
+    invalidate(PROFORMA)
@@ -4,12 +4,13 @@ import time
 
 from loguru import logger
 from trakka.utils.api import api_get, api_patch
-from trakka.utils.fs import get_hash
+from trakka.utils.fs import HashingReader
 from trakka.utils.helpers.output import call_get_and_print_table_on_state_change
 from trakka.utils.helpers.output import call_get_and_print_dataset_status
 from trakka.utils.helpers.upload import upload_multipart_tracking_token
 from trakka.utils.misc import logger_wraps
 from trakka.utils.output import print_dict
+from trakka.utils.progress import TransferProgress
 from trakka.utils.paths import PROJECT_PATH
 
 DATASET_UPLOAD_PATH = 'dataset'
@@ -31,13 +32,14 @@ def add_dataset(
         'filename': filename,
     }
 
-    file_hash = get_hash(filepath)
     with open(filepath, 'rb') as file_content:
-        files = [('files[]', (filename, file_content))]
+        progress = TransferProgress(f'Uploading {filename}', os.path.getsize(filepath))
+        hashed_file = HashingReader(file_content, progress)
+        files = [('files[]', (filename, hashed_file))]
         upload_multipart_tracking_token(path=path,
-                                                         files=files,
-                                                         file_hash=file_hash,
-                                                         custom_headers=custom_headers)
+                                        files=files,
+                                        hashed_file=hashed_file,
+                                        custom_headers=custom_headers)
 
 
 @logger_wraps()
@@ -74,12 +76,13 @@ def add_dataset_blocking(
         'filename': filename,
     }
 
-    file_hash = get_hash(filepath)
     with open(filepath, 'rb') as file_content:
-        files = [('files[]', (filename, file_content))]
+        progress = TransferProgress(f'Uploading {filename}', os.path.getsize(filepath))
+        hashed_file = HashingReader(file_content, progress)
+        files = [('files[]', (filename, hashed_file))]
         tracking_token = upload_multipart_tracking_token(path=path_adding,
                                                          files=files,
-                                                         file_hash=file_hash,
+                                                         hashed_file=hashed_file,
                                                          custom_headers=custom_headers)
     path_track = "/".join([PROJECT_PATH,
                            abbrev,
@@ -7,6 +7,7 @@ from trakka.utils.helpers.output import call_get_and_print
 from trakka.utils.http import HEADERS, get_header_value
 from trakka.utils.misc import logger_wraps
 from trakka.utils.api import api_patch, api_get_stream, api_post_multipart
+from trakka.utils.download import write_response
 from trakka.utils.paths import PROJECT_PATH
 
 DOCUMENT_PATH = 'documents'
@@ -75,9 +76,7 @@ def download_document(
         file_path = os.path.join(output_dir, filename)
         file_path = _get_unqiue_filepath(file_path)
 
-        with open(file_path, "wb") as file:
-            for chunk in resp.iter_raw(chunk_size=128):
-                file.write(chunk)
+        write_response(resp, file_path, preallocate=True)
 
         logger.success(f"Downloaded: {filename} To: {file_path}")
     
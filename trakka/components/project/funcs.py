@@ -5,6 +5,8 @@ from trakka.utils.api import api_patch
 from trakka.utils.api import api_put
 from trakka.utils.helpers.output import call_get_and_print
 from trakka.utils.helpers.project import get_project_by_abbrev
+from trakka.utils.lookup_cache import PROJECT
+from trakka.utils.lookup_cache import invalidate
 from trakka.utils.misc import logger_wraps
 from trakka.utils.output import get_viewtype_columns
 from trakka.utils.paths import PROJECT_PATH
@@ -78,7 +80,7 @@ def update_project(
         status: str,
         watermark_trees: bool
 ):
-    project = get_project_by_abbrev(project_abbreviation)
+    project = get_project_by_abbrev(project_abbreviation, use_cache=False)
     
     # ProjectDTO fields which should go in ProjectPutDTO
     put_project = {
@@ -117,17 +119,21 @@ def update_project(
     if watermark_trees is not None:
         put_project['watermarkTrees'] = watermark_trees
         
-    return api_put(
+    response = api_put(
         path=f"{PROJECT_PATH}/{project_abbreviation}",
         data=put_project
     )
+    invalidate(PROJECT)
+    return response
 
 @logger_wraps()
 def set_dashboard(project_abbreviation: str, dashboard_name: str):
-    return api_patch(
+    response = api_patch(
         path='/'.join([PROJECT_PATH, SET_DASHBOARD, project_abbreviation]),
         data=dashboard_name
     )
+    invalidate(PROJECT)
+    return response
 
 
 @logger_wraps()
@@ -148,7 +154,9 @@ def get_dashboard(project_abbreviation: str, out_format: str):
 @logger_wraps()
 def enable_project(abbrev: str):
     api_patch(f'{PROJECT_PATH}/{abbrev}/Enable')
+    invalidate(PROJECT)
 
 @logger_wraps()
 def disable_project(abbrev: str):
     api_patch(f'{PROJECT_PATH}/{abbrev}/Disable')
+    invalidate(PROJECT)
@@ -1,3 +1,4 @@
+from trakka.utils import known_samples
 from trakka.utils.helpers.share import resolve_share_target
 from trakka.utils.misc import logger_wraps
 from trakka.utils.api import api_patch, api_get
@@ -84,6 +85,7 @@ def disable_sample(
             "seqIds": seq_ids
         },
     )
+    known_samples.remove(seq_ids)
 
 
 @logger_wraps()
@@ -105,3 +107,4 @@ def purge_sample(
     api_patch(
         path="/".join([SAMPLE_PATH, seq_id, PURGE]),
     )
+    known_samples.remove([seq_id])
@@ -13,6 +13,7 @@ from trakka.utils.options import opt_seq_id
 from trakka.utils.options import opt_force_mutex_skip
 from trakka.utils.options import opt_skip_mutex_force
 from trakka.utils.options import opt_delete_all
+from trakka.utils.options import opt_parallel
 
 from trakka.utils.cmd_filter import hide_admin_cmds
 
@@ -50,11 +51,13 @@ seq.add_command(sync)
     help='The Seq_IDs of specific sequences to download',
     cls=RequiredMutuallyExclusiveOption,
     mutually_exclusive=['group_name'])
+@opt_parallel(help='Number of sequence files to download concurrently')
 def seq_get(
         output_dir,
         seq_type: str,
         group_name: str,
         seq_id: List[str],
+        parallel: int,
 ):
     """Download sequence files to the local drive
 
@@ -70,6 +73,7 @@ def seq_get(
         seq_type_enum,
         group_name,
         seq_id,
+        parallel,
     )
 
 
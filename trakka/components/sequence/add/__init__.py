@@ -9,6 +9,7 @@ from trakka.utils.options import opt_owner_org
 from trakka.utils.options import opt_skip_mutex_force
 from trakka.utils.options import opt_shared_projects
 from trakka.utils.options import opt_create_samples
+from trakka.utils.options import opt_parallel
 from ..funcs import add_fasta_cns_submission
 from ..funcs import add_sequence_submission
 
@@ -20,6 +21,11 @@ METADATA_ADD_HELP_TEXT = """
     are uploading to sample records that are already shared.
 """
 
+PARALLEL_HELP_TEXT = (
+    'Number of samples to upload concurrently. Files for the next samples are '
+    'hashed while earlier uploads are still in flight.'
+)
+
 
 @click.group()
 @click.pass_context
@@ -46,6 +52,7 @@ def add(ctx):
 @opt_force_mutex_skip(
     help="Upload sequences and supersede any existing sequences of the same type.")
 @opt_shared_projects()
+@opt_parallel(help=PARALLEL_HELP_TEXT)
 # pylint: disable=invalid-name
 def seq_add_fastq_ill_PE(
         csv_file: BufferedReader,
@@ -54,9 +61,10 @@ def seq_add_fastq_ill_PE(
         create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = 1,
 ):
     add_sequence_submission(
-        SeqType.FASTQ_ILL_PE, csv_file, owner_org, shared_projects, create, skip, force)
+        SeqType.FASTQ_ILL_PE, csv_file, owner_org, shared_projects, create, skip, force, parallel)
 
 
 @add.command(SeqType.FASTQ_ILL_SE.value, help=f"""
@@ -76,6 +84,7 @@ def seq_add_fastq_ill_PE(
 @opt_force_mutex_skip(
     help="Upload sequences and supersede any existing sequences of the same type.")
 @opt_shared_projects()
+@opt_parallel(help=PARALLEL_HELP_TEXT)
 # pylint: disable=invalid-name
 def seq_add_fastq_ill_SE(
         csv_file: BufferedReader,
@@ -84,9 +93,10 @@ def seq_add_fastq_ill_SE(
         create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = 1,
 ):
     add_sequence_submission(
-        SeqType.FASTQ_ILL_SE, csv_file, owner_org, shared_projects, create, skip, force)
+        SeqType.FASTQ_ILL_SE, csv_file, owner_org, shared_projects, create, skip, force, parallel)
 
 
 @add.command(SeqType.FASTQ_ONT.value, help=f"""
@@ -106,6 +116,7 @@ def seq_add_fastq_ill_SE(
 @opt_force_mutex_skip(
     help="Upload sequences and supersede any existing sequences of the same type.")
 @opt_shared_projects()
+@opt_parallel(help=PARALLEL_HELP_TEXT)
 def seq_add_fastq_ont(
         csv_file: BufferedReader,
         owner_org: str,
@@ -113,9 +124,10 @@ def seq_add_fastq_ont(
         create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = 1,
 ):
     add_sequence_submission(
-        SeqType.FASTQ_ONT, csv_file, owner_org, shared_projects, create, skip, force)
+        SeqType.FASTQ_ONT, csv_file, owner_org, shared_projects, create, skip, force, parallel)
 
 
 @add.command(SeqType.FASTA_CNS.value, help=f"""
@@ -135,6 +147,7 @@ def seq_add_fastq_ont(
 @opt_force_mutex_skip(
     help="Upload sequences and supersede any existing sequences of the same type.")
 @opt_shared_projects()
+@opt_parallel(help=PARALLEL_HELP_TEXT)
 def seq_add_fasta_cns(
         fasta_file: BufferedReader,
         owner_org: str,
@@ -142,10 +155,11 @@ def seq_add_fasta_cns(
         create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = 1,
 ):
     # FASTA-CNS is a special case as the CLI does the work of splitting the file,
     # and there is no CSV
-    add_fasta_cns_submission(fasta_file, owner_org, shared_projects, create, skip, force)
+    add_fasta_cns_submission(fasta_file, owner_org, shared_projects, create, skip, force, parallel)
 
 
 @add.command(SeqType.FASTA_ASM.value, help=f"""
@@ -165,6 +179,7 @@ def seq_add_fasta_cns(
 @opt_force_mutex_skip(
     help="Upload sequences and supersede any existing sequences of the same type.")
 @opt_shared_projects()
+@opt_parallel(help=PARALLEL_HELP_TEXT)
 def seq_add_fasta_asm(
         csv_file: BufferedReader,
         owner_org: str,
@@ -172,6 +187,7 @@ def seq_add_fasta_asm(
         create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = 1,
 ):
     add_sequence_submission(
-        SeqType.FASTA_ASM, csv_file, owner_org, shared_projects, create, skip, force)
+        SeqType.FASTA_ASM, csv_file, owner_org, shared_projects, create, skip, force, parallel)
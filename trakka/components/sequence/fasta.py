@@ -0,0 +1,116 @@
+"""
+Splitting a multi-FASTA file into single-contig upload bodies. The file is
+memory-mapped and scanned for record boundaries, and each record is uploaded
+as the bytes it occupies in the file, read a chunk at a time. Neither the
+file nor any record is parsed into objects or copied in memory as a whole,
+so memory use stays flat however large the input is.
+"""
+import hashlib
+import mmap
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+from typing import Union
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+MappedFile = Union[mmap.mmap, bytes]
+
+
+@dataclass
+class FastaRecord:
+    """A record's title line, without the '>', and its byte range in the file"""
+    header: str
+    source: MappedFile
+    start: int
+    end: int
+
+    @property
+    def id(self) -> str:
+        # Same rule as Biopython: the first word of the title line
+        words = self.header.split(None, 1)
+        return words[0] if words else ''
+
+
+@contextmanager
+def map_fasta(fasta_file) -> Iterator[MappedFile]:
+    """Memory-map an open FASTA file for reading"""
+    if not os.fstat(fasta_file.fileno()).st_size:
+        # An empty file cannot be mapped
+        yield b''
+        return
+    with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def iter_fasta_records(source: MappedFile) -> Iterator[FastaRecord]:
+    """
+    Yield each record in a FASTA file in order. As with Biopython, the file
+    must start with a record's title line.
+    """
+    if not source:
+        return
+    if source[:1] != b'>':
+        raise ValueError('FASTA file must start with a title line beginning with ">"')
+    start = 0
+    while start != -1:
+        next_start = _next_record_start(source, start)
+        end = len(source) if next_start == -1 else next_start
+        header_end = source.find(b'\n', start, end)
+        if header_end == -1:
+            header_end = end
+        header = source[start + 1:header_end].decode().rstrip()
+        yield FastaRecord(header, source, start, end)
+        start = next_start
+
+
+def _next_record_start(source: MappedFile, position: int) -> int:
+    found = source.find(b'\n>', position)
+    return -1 if found == -1 else found + 1
+
+
+class FastaRecordReader:
+    """
+    Read-only binary file over the bytes of one FASTA record. It supports
+    seek and tell, so httpx can measure it for the Content-Length and
+    rewind it before sending.
+    """
+    def __init__(self, record: FastaRecord, name: str):
+        self.name = name
+        self._source = record.source
+        self._start = record.start
+        self._end = record.end
+        self._position = record.start
+
+    @property
+    def length(self) -> int:
+        return self._end - self._start
+
+    def read(self, size: int = -1) -> bytes:
+        stop = self._end if size is None or size < 0 else min(self._end, self._position + size)
+        chunk = self._source[self._position:stop]
+        self._position = max(self._position, stop)
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            position = self._start + offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        else:
+            position = self._end + offset
+        self._position = max(self._start, position)
+        return self.tell()
+
+    def tell(self) -> int:
+        return self._position - self._start
+
+    def close(self):
+        pass
+
+    def sha256(self) -> str:
+        file_hash = hashlib.sha256()
+        for offset in range(self._start, self._end, HASH_CHUNK_SIZE):
+            file_hash.update(self._source[offset:min(self._end, offset + HASH_CHUNK_SIZE)])
+        return file_hash.hexdigest()
@@ -1,30 +1,33 @@
 # pylint: disable=too-many-locals
 import os
 from pathlib import Path
-from io import BufferedReader, StringIO, TextIOWrapper
-import codecs
-import hashlib
+from io import BufferedReader
 from dataclasses import dataclass
 from typing import List
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
 
 import httpx
 import pandas as pd
 from pandas.core.frame import DataFrame
 from loguru import logger
 from httpx import HTTPStatusError
-from Bio import SeqIO
 
 from trakka.utils.exceptions import FailedResponseException, CliArgumentException
+from trakka.utils.exceptions import TrakkaCliException
 from trakka.utils.exceptions import UnknownResponseException
 from trakka.utils.exceptions import IncorrectHashException
 from trakka.utils.misc import logger_wraps
 from trakka.utils.api import api_patch
 from trakka.utils.api import api_post_multipart_raw
 from trakka.utils.api import api_get
+from trakka.utils.api import api_get_records
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
 from trakka.utils.api import api_post
 from trakka.utils.api import get_response
-from trakka.utils.api import api_get_stream
 from trakka.utils.enums.api import RESPONSE_TYPE_ERROR
 from trakka.utils.paths import SAMPLE_PATH
 from trakka.utils.paths import SEQUENCE_PATH
@@ -36,13 +39,26 @@ from trakka.utils.paths import SEQUENCE_BY_SAMPLE_PATH
 from trakka.utils.output import create_response_object
 from trakka.utils.output import log_response
 from trakka.utils.output import log_response_compact
+from trakka.utils.output import read_pd_columns
+from trakka.utils.output import read_pd_in_batches
 from trakka.utils.fs import create_dir
+from trakka.utils.download import download_file
+from trakka.utils.download import discard_partial_download
 
 from trakka.utils.output import print_dataframe
 from trakka.utils.enums.seq import SeqType
 from trakka.utils.retry import retry
+from trakka.utils.parallel import map_concurrently
+from trakka.utils.parallel import DEFAULT_PARALLEL
 from trakka.utils.api import api_delete
-from trakka.utils.fs import FileHash, verify_hash
+from trakka.utils.fs import FileHash, HashingReader, verify_hash
+from trakka.utils.hash_cache import cached_sha256
+from trakka.utils.progress import TransferProgress
+from trakka.utils import known_samples
+from trakka.components.sequence.fasta import FastaRecord
+from trakka.components.sequence.fasta import FastaRecordReader
+from trakka.components.sequence.fasta import iter_fasta_records
+from trakka.components.sequence.fasta import map_fasta
 
 SEQ_ID_CSV = 'Seq_ID'
 SEQ_ID_HEADER = 'seq-id'
@@ -63,6 +79,8 @@ HEADER_MAP = {
 
 USE_IS_ACTIVE_FLAG = 'useIsActiveFlag'
 
+SHARE_BATCH_SIZE = 500
+
 MODE_HEADER = 'mode'
 MODE_SKIP = 'skip'
 MODE_OVERWRITE = 'overwrite'
@@ -89,23 +107,40 @@ def add_fasta_cns_submission(
         should_create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = DEFAULT_PARALLEL,
 ):
     """Iterate through a FASTA file and submit each sequence as a separate sample"""
     _validate_streamlined_seq_args(owner_org, shared_projects, should_create)
 
     name_prefix = _calc_name_prefix(fasta_file)
 
+    with map_fasta(fasta_file) as mapped_fasta:
+        _upload_fasta_records(
+            mapped_fasta, name_prefix, owner_org, shared_projects, should_create,
+            skip, force, parallel)
+
+
+def _upload_fasta_records(
+        mapped_fasta,
+        name_prefix: str,
+        owner_org: str,
+        shared_projects: List[str],
+        should_create: bool,
+        skip: bool,
+        force: bool,
+        parallel: int,
+):
     failed_samples = []
     upload_success_count = 0
     total_upload_count = 0
-    records = list(SeqIO.parse(TextIOWrapper(fasta_file), 'fasta'))
-    seq_ids = [record.id for record in records]
     if should_create:
+        # Only headers are decoded in this pass; sequences are left on disk
+        seq_ids = [record.id for record in iter_fasta_records(mapped_fasta)]
         _create_samples(seq_ids, owner_org, shared_projects)
-    for record in records:
+
+    def _upload_record(record):
         seq_id = record.id.split()[0].split("|")[0]
         logger.info(f"Uploading {seq_id}")
-        total_upload_count += 1
 
         file = _create_single_contig_file(
             name_prefix,
@@ -120,13 +155,19 @@ def add_fasta_cns_submission(
             [file]
         )
 
+        retry(
+            func=lambda f=[file], ch=custom_headers: _post_sequence(f, ch),
+            retries=1,
+            desc=f"{seq_id} at " + SEQUENCE_PATH,
+            delay=0.0
+        )
+
+    records = iter_fasta_records(mapped_fasta)
+    for record, future in map_concurrently(_upload_record, records, parallel):
+        seq_id = record.id.split()[0].split("|")[0]
+        total_upload_count += 1
         try:
-            retry(
-                func=lambda f=[file], ch=custom_headers: _post_sequence(f, ch),
-                retries=1,
-                desc=f"{seq_id} at " + SEQUENCE_PATH,
-                delay=0.0
-            )
+            future.result()
             upload_success_count += 1
         except FailedResponseException as ex:
             logger.error(f'Sample {seq_id} failed upload')
@@ -154,10 +195,13 @@ def add_sequence_submission(
         should_create: bool,
         skip: bool = False,
         force: bool = False,
+        parallel: int = DEFAULT_PARALLEL,
 ):
     """
     Generic handling of uploading any sequence type.
     Handles the case where the user provides a CSV mapping Seq_IDs to files.
+    With parallel > 1, each worker hashes and uploads one sample at a time,
+    so hashing of later samples overlaps with uploads already in flight.
     """
     _validate_streamlined_seq_args(owner_org, shared_projects, should_create)
     csv_dataframe = _get_and_validate_csv(csv_file, seq_type)
@@ -173,17 +217,24 @@ def add_sequence_submission(
     failed_samples = []
     upload_success_count = 0
     total_upload_count = 0
-        
-    for _, row in csv_dataframe.iterrows():
-        try:
-            logger.info(f"Uploading {row[SEQ_ID_CSV]}")
-            total_upload_count += 1
 
-            sample_files = _get_files_from_csv_paths(row, seq_type)
+    def _upload_row(row):
+        logger.info(f"Uploading {row[SEQ_ID_CSV]}")
+        sample_files = []
+        try:
+            _open_files_from_csv_paths(row, seq_type, sample_files)
             custom_headers = _build_headers(seq_type, row, force, skip, sample_files)
 
             retry(lambda sf=sample_files, ch=custom_headers: _post_sequence(
                 sf, ch), 1, "/".join([SEQUENCE_PATH]))
+        finally:
+            _close_files(sample_files)
+
+    rows = [row for _, row in csv_dataframe.iterrows()]
+    for row, future in map_concurrently(_upload_row, rows, parallel):
+        total_upload_count += 1
+        try:
+            future.result()
             upload_success_count += 1
 
         except FailedResponseException as ex:
@@ -196,6 +247,7 @@ def add_sequence_submission(
                 UnknownResponseException,
                 HTTPStatusError,
                 IncorrectHashException,
+                ValueError,
         ) as ex:
             logger.error(f'Sample {row[SEQ_ID_CSV]} failed upload')
             logger.error(ex)
@@ -233,17 +285,17 @@ def _calc_name_prefix(fasta_file):
     return name_prefix
 
 
-def _create_single_contig_file(name_prefix, seq_id, record) -> SeqFile:
+def _create_single_contig_file(name_prefix, seq_id, record: FastaRecord) -> SeqFile:
     """
-    Generate the upload single-contig FASTA file for a single FASTA record
+    Generate the upload single-contig FASTA file for a single FASTA record.
+    The record's bytes are read from the mapped input file as they are sent.
     """
     single_contig_filename = f"{name_prefix}_{seq_id}_split.fasta"
-    single_contig = StringIO()
-    SeqIO.write([record], single_contig, "fasta")
-    encode = codecs.getwriter('utf-8')
+    single_contig = FastaRecordReader(record, single_contig_filename)
+    progress = TransferProgress(f'Uploading {single_contig_filename}', single_contig.length)
     return SeqFile(
-        multipart=('files[]', (single_contig_filename, encode(single_contig))),
-        sha256=hashlib.sha256(single_contig.getvalue().encode()).hexdigest(),
+        multipart=('files[]', (single_contig_filename, HashingReader(single_contig, progress))),
+        sha256=single_contig.sha256(),
         filename=single_contig_filename,
     )
 
@@ -276,11 +328,21 @@ def _post_sequence(sample_files: list[SeqFile], custom_headers):
     data = get_response(resp, True)
 
     if resp.status_code == 200:
+        _verify_sent_hashes(sample_files)
         hashes = [FileHash(filename=f.filename, sha256=f.sha256)
                   for f in sample_files]
         verify_hash(hashes, data)
 
 
+def _verify_sent_hashes(sample_files: list[SeqFile]):
+    """Check the bytes streamed to the server match the hash sent in the header"""
+    for sample_file in sample_files:
+        _, (_, file) = sample_file.multipart
+        if isinstance(file, HashingReader) and file.hexdigest() != sample_file.sha256:
+            raise IncorrectHashException(
+                f'{sample_file.filename} changed while it was being uploaded')
+
+
 def take_sample_names(data, filter_prop):
     try:
         # Expecting response with flat sample summary dtos
@@ -332,32 +394,39 @@ def _validate_csv_sequence_submission(csv_dataframe: DataFrame, seq_type: SeqTyp
     return messages
 
 
-def _download_seq_file(file_path, filename, query_path, params, sample_dir):
+def _download_seq_file(file_path, filename, query_path, params, sample_dir) -> Optional[str]:
+    """
+    Download a sequence file, resuming a partial download if one was left by
+    an earlier run. Returns the SHA-256 of the downloaded bytes, or None if
+    the download failed.
+    """
     try:
-        def _write_chunks(resp: httpx.Response):
-            for chunk in resp.iter_raw(chunk_size=128):
-                file.write(chunk)
-
         if not os.path.exists(sample_dir):
             create_dir(sample_dir)
-        with open(file_path, 'wb') as file:
-            api_get_stream(query_path, _write_chunks, params)
+        sha256 = download_file(query_path, params, file_path)
 
         logger.success(f'Downloaded: {filename} To: {file_path}')
+        return sha256
 
     except FailedResponseException as ex:
         log_response_compact(ex.parsed_resp)
         logger.error(f'Failed downloading {filename} To: {file_path}')
-        os.remove(file_path)
+        discard_partial_download(file_path)
     except UnknownResponseException as ex:
         log_response_compact(ex)
         logger.error(f'Failed downloading {filename} To: {file_path}')
-        os.remove(file_path)
+        discard_partial_download(file_path)
     except HTTPStatusError as ex:
         logger.error(
             f'Failed downloading {filename} To: {file_path}. Error: {ex}'
         )
-        os.remove(file_path)
+        discard_partial_download(file_path)
+    except httpx.TransportError as ex:
+        logger.error(
+            f'Failed downloading {filename} To: {file_path}. Error: {ex!r}. '
+            'The partial download is kept and will be resumed next time.'
+        )
+    return None
 
 
 def _get_seq_download_path(
@@ -377,7 +446,9 @@ def _get_seq_download_path(
 def _download_sequences(
         output_dir: str,
         samples_seq_info: pd.DataFrame,
+        parallel: int = DEFAULT_PARALLEL,
 ):
+    downloads = []
     for _i, ssi in samples_seq_info.iterrows():
         sample_name = ssi['sampleName']
         dto_read = str(ssi['read'])
@@ -397,13 +468,23 @@ def _download_sequences(
             dto_read,
             seq_type, )
 
-        _download_seq_file(file_path, filename, query_path, params, sample_dir)
+        downloads.append((file_path, filename, query_path, params, sample_dir))
+
+    if parallel > 1:
+        logger.info(f'Downloading {len(downloads)} files, {parallel} at a time')
+
+    for _download, future in map_concurrently(
+            lambda d: _download_seq_file(*d), downloads, parallel):
+        future.result()
 
 
 def _filter_sequences(data, seq_type: SeqType) -> List[Dict]:
-    data_filtered = list(filter(lambda x: seq_type is None or x['type'] == seq_type.value, data))
-    data_filtered = list(filter(lambda x: x['isActive'] is True, data_filtered))
-    return data_filtered
+    return list(_iter_filtered_sequences(data, seq_type))
+
+
+def _iter_filtered_sequences(data: Iterable[Dict], seq_type: SeqType) -> Iterator[Dict]:
+    data_filtered = filter(lambda x: seq_type is None or x['type'] == seq_type.value, data)
+    return filter(lambda x: x['isActive'] is True, data_filtered)
 
 
 def _get_seq_api_by_group(group_name: str):
@@ -428,33 +509,56 @@ def _get_seq_api_by_sample_names(seq_ids: List[str]):
     return paths
 
 
+def _get_seq_data_by_sample_names(seq_ids: List[str]) -> List[Dict]:
+    """
+    Look up the sequences of each sample, running as many lookups at once as
+    the HTTP session has connections. Each distinct Seq_ID is requested once,
+    and results are returned in the order the Seq_IDs were given.
+    """
+    unique_paths = dict.fromkeys(_get_seq_api_by_sample_names(seq_ids))
+    workers = min(len(unique_paths), TrakkaCxt.get_value(CxtKey.HTTP_POOL_SIZE))
+    for path, future in map_concurrently(
+            lambda p: api_get(path=p)['data'], unique_paths, workers):
+        unique_paths[path] = future.result()
+
+    data = []
+    for path in _get_seq_api_by_sample_names(seq_ids):
+        data.extend(unique_paths[path])
+    return data
+
+
 # pylint: disable=duplicate-code,no-else-return
 def _get_seq_data(
         group_name: str,
         seq_type: SeqType = None,
         seq_ids: List[str] = None,
+        group_params: Dict = None,
 ):
     if group_name is None and (seq_ids is None or len(seq_ids) == 0):
         raise ValueError(
             "Either group name or Seq_IDs must be provided to get sequence information")
-    data = []
     if group_name:
-        api_path = _get_seq_api_by_group(group_name)
-        data = api_get(path=api_path)['data']
-        result = _filter_sequences(data, seq_type)
+        # A group's list can be very large, so it is decoded as it arrives
+        df = api_get_records(
+            _get_seq_api_by_group(group_name),
+            lambda records: read_pd_in_batches(
+                _iter_filtered_sequences(records, seq_type),
+                lambda batch: read_pd_columns(batch, dtype=str),
+            ),
+            params=group_params,
+        )
     else:
-        api_paths = _get_seq_api_by_sample_names(seq_ids)
-        for path in api_paths:
-            data.extend(api_get(path=path)['data'])
+        data = _get_seq_data_by_sample_names(seq_ids)
         result = _filter_sequences(data, seq_type)
-        skipped_samples = [sample for sample in seq_ids if
-                           sample not in [item['sampleName'] for item in result]]
+        found_samples = {item['sampleName'] for item in result}
+        skipped_samples = [sample for sample in seq_ids if sample not in found_samples]
         if skipped_samples:
             logger.warning('Skipped samples with no available sequences: '
                            f'{",".join(skipped_samples)}')
-    df = pd.DataFrame(result, dtype=str)
-    # pd DF from records is coercing read to a float and producing nans regardless of dtype
-    df['read'] = pd.Series([row['read'] for row in result], dtype=str)
+        # Built by column, as from records read would be coerced to a float
+        df = read_pd_columns(result, dtype=str)
+    if 'read' not in df.columns:
+        df['read'] = pd.Series(dtype=str)
     return df
 
 
@@ -464,6 +568,7 @@ def get_sequences(
         seq_type: SeqType = None,
         group_name: str = None,
         seq_ids: List[str] = None,
+        parallel: int = DEFAULT_PARALLEL,
 ):
     if not os.path.exists(output_dir):
         create_dir(output_dir)
@@ -473,7 +578,7 @@ def get_sequences(
         seq_type,
         seq_ids,
     )
-    _download_sequences(output_dir, data)
+    _download_sequences(output_dir, data, parallel)
 
 
 # pylint: disable=duplicate-code
@@ -542,8 +647,14 @@ def _check_csv_files(csv_row: pd.Series, messages: List[Dict]):
             ))
 
 
-def _get_files_from_csv_paths(csv_row: pd.Series, seq_type: SeqType) -> List[SeqFile]:
-    sample_files = []
+def _open_files_from_csv_paths(
+        csv_row: pd.Series,
+        seq_type: SeqType,
+        sample_files: List[SeqFile]):
+    """
+    Open the row's files into sample_files as they are opened, so that the
+    caller can close those already open if a later one fails
+    """
     columns = _csv_columns(seq_type)
     for column in columns:
         # We assume everything in the CSV that's not the Seq_ID is a file path
@@ -551,9 +662,8 @@ def _get_files_from_csv_paths(csv_row: pd.Series, seq_type: SeqType) -> List[Seq
             continue
         read_hint = _col_name_to_read_hint(column)
         file = _get_file(csv_row[column], read_hint)
-        _ensure_read_hint_and_filename_agrees(file)
         sample_files.append(file)
-    return sample_files
+        _ensure_read_hint_and_filename_agrees(file)
 
 
 def _col_name_to_read_hint(column):
@@ -579,17 +689,28 @@ def _ensure_read_hint_and_filename_agrees(file):
 
 
 def _get_file(filepath: str, read_hint: str = None) -> SeqFile:
+    # The hash header has to be sent ahead of the body, so it comes from the
+    # hash cache or a separate streaming pass. The upload itself hashes the
+    # bytes it sends so that a file changed since it was hashed is caught.
+    sha256 = cached_sha256(filepath)
+    progress = TransferProgress(f'Uploading {filepath}', os.path.getsize(filepath))
     # pylint: disable=consider-using-with
-    file = open(filepath, 'rb')
+    file = HashingReader(open(filepath, 'rb'), progress)
     filename = os.path.basename(file.name)
     return SeqFile(
         multipart=('files[]', (filename, file)),
-        sha256=hashlib.sha256(file.read()).hexdigest(),
+        sha256=sha256,
         filename=filename,
         read_hint=read_hint
     )
 
 
+def _close_files(sample_files: List[SeqFile]):
+    for sample_file in sample_files:
+        _, (_, file) = sample_file.multipart
+        file.close()
+
+
 def _csv_columns(seq_type: SeqType):
     if seq_type in CSV_COLUMNS:
         return CSV_COLUMNS[seq_type]
@@ -601,23 +722,59 @@ def _create_samples(
         owner_org: str,
         shared_projects: list[str],
 ) -> None:
-    for seq_id in seq_ids:
+    """
+    Create any samples not already known to exist, then share all of them.
+    The server only creates one sample per request, so creates run
+    concurrently, up to the HTTP pool size. Samples recorded as existing by
+    an earlier run are not sent again.
+    """
+    unique_ids = list(dict.fromkeys(seq_ids))
+    known = known_samples.load()
+    to_create = [seq_id for seq_id in unique_ids if seq_id not in known]
+    skipped_count = len(unique_ids) - len(to_create)
+    if skipped_count:
+        logger.info(f'Skipping {skipped_count} samples known to exist from an earlier run')
+
+    created, existing, failed = [], [], []
+    workers = min(len(to_create), TrakkaCxt.get_value(CxtKey.HTTP_POOL_SIZE))
+    for seq_id, future in map_concurrently(
+            lambda s: _create_sample(s, owner_org), to_create, workers):
         try:
-            api_post(SAMPLE_PATH, data={
-                'name': seq_id,
-                'owner': owner_org,
-            })
+            (created if future.result() else existing).append(seq_id)
         except FailedResponseException as ex:
-            sample_exists_msg = f"Sample {seq_id} already exists"
-            if any(sample_exists_msg in m for m in ex.get_error_messages()):
-                logger.warning(sample_exists_msg)
-            else:
-                raise ex
+            logger.error(f'Failed to create sample {seq_id}')
+            log_response_compact(ex.parsed_resp)
+            failed.append(seq_id)
+    known_samples.add(created + existing)
+
+    logger.info(
+        f'Samples: {len(created)} created, {len(existing) + skipped_count} already existed, '
+        f'{len(failed)} failed')
+    if failed:
+        raise TrakkaCliException(f'Failed to create samples: {", ".join(failed)}')
+
     for project in shared_projects:
-        api_patch(f'{SAMPLE_PATH}/Share', data={
-            'seqIds': seq_ids,
-            'groupName': f'{project}-Group',
+        for start in range(0, len(unique_ids), SHARE_BATCH_SIZE):
+            api_patch(f'{SAMPLE_PATH}/Share', data={
+                'seqIds': unique_ids[start:start + SHARE_BATCH_SIZE],
+                'groupName': f'{project}-Group',
+            })
+
+
+def _create_sample(seq_id: str, owner_org: str) -> bool:
+    """Returns True if the sample was created, False if it already existed"""
+    try:
+        api_post(SAMPLE_PATH, data={
+            'name': seq_id,
+            'owner': owner_org,
         })
+        return True
+    except FailedResponseException as ex:
+        sample_exists_msg = f"Sample {seq_id} already exists"
+        if any(sample_exists_msg in m for m in ex.get_error_messages()):
+            logger.warning(sample_exists_msg)
+            return False
+        raise ex
 
 
 def _validate_streamlined_seq_args(
@@ -5,6 +5,8 @@ from trakka.utils.options import opt_output_dir, opt_group_name
 from trakka.utils.options import opt_recalc_hash
 from trakka.utils.options import opt_seq_type
 from trakka.utils.options import opt_batch_size
+from trakka.utils.options import opt_parallel
+from trakka.utils.options import opt_hash_workers
 from .funcs import seq_sync_get
 
 
@@ -19,15 +21,12 @@ def sync(ctx):
 @opt_group_name(default=None, multiple=False, required=True)
 @opt_recalc_hash()
 @opt_seq_type(required=True)
-@opt_batch_size(help='Specifies the number of sequence downloads to perform '
-                     'in a single batch during sync. This may improve '
-                     'performance depending on how many total sequences are expected. '
-                     'When resuming from an interruption, the '
-                     'entire batch will be re-tried even if some within a '
-                     'batch might have succeeded. For large fastq files, the '
-                     'recommended size is 1 to 10. For large numbers of small '
-                     'fasta files, the recommended size is 1000 or more.',
+@opt_batch_size(help='Deprecated and ignored. Each completed download is now '
+                     'recorded as soon as it finishes, so an interrupted sync '
+                     'resumes from the last completed file.',
                 default=1)
+@opt_parallel(help='Number of sequence files to download concurrently.')
+@opt_hash_workers()
 @option(
     '--reset/--skip-reset',
     'reset',
@@ -42,6 +41,8 @@ def get_seq(
         recalculate_hashes: bool,
         seq_type: str,
         batch_size: int,
+        parallel: int,
+        hash_workers: int,
         reset: bool):
     """
     Download sequence files from server to disk. Patches any local
@@ -54,4 +55,6 @@ def get_seq(
         recalculate_hashes,
         seq_type,
         batch_size,
-        reset)
+        reset,
+        parallel,
+        hash_workers)
@@ -11,6 +11,12 @@ CURRENT_STATE_KEY = 'current_state'
 CURRENT_ACTION_KEY = 'current_action'
 TRASH_DIR_KEY = 'trash_dir'
 DOWNLOAD_BATCH_SIZE_KEY = 'download_batch_size'
+PARALLEL_DOWNLOADS_KEY = 'parallel_downloads'
+HASH_WORKERS_KEY = 'hash_workers'
+SERVER_MANIFEST_FILE_KEY = 'server_manifest_file'
+MANIFEST_WATERMARK_KEY = 'manifest_watermark'
+PENDING_MANIFEST_WATERMARK_KEY = 'pending_manifest_watermark'
+LAST_FULL_MANIFEST_PULL_KEY = 'last_full_manifest_pull'
 
 # File extensions
 FASTQ_EXTS = ['fastq', 'fq']
@@ -33,6 +39,7 @@ BLOB_FILE_PATH_KEY = 'blobFilePath'
 SERVER_SHA_256_KEY = 'serverSha256'
 TYPE_KEY = 'type'
 IS_ACTIVE_KEY = 'isActive'
+CREATED_KEY = 'created'
 
 # Manifest file keys
 SEQ_ID_KEY = 'Seq_ID'
@@ -53,4 +60,8 @@ INTERMEDIATE_FASTA_AGGREGATE_FILE_NAME = 'intermediate-consensus.fasta'
 INTERMEDIATE_MANIFEST_FILE = 'intermediate-manifest-SEQTYPE.csv'
 OBSOLETE_OBJECTS_FILE = 'delete-targets-SEQTYPE.csv'
 SYNC_STATE_FILE = 'sync-state-SEQTYPE.json'
+SERVER_MANIFEST_FILE = 'server-manifest-SEQTYPE.csv'
+# A full manifest pull is forced this often, to pick up sequences that were
+# removed or deactivated, which an incremental pull cannot see
+FULL_MANIFEST_PULL_INTERVAL_HOURS = 24
 TRASH_DIR = '.trash'
@@ -16,6 +16,8 @@ from .constant import GROUP_NAME_KEY
 from .constant import SEQ_TYPE_KEY
 from .constant import RECALCULATE_HASH_KEY
 from .constant import DOWNLOAD_BATCH_SIZE_KEY
+from .constant import PARALLEL_DOWNLOADS_KEY
+from .constant import HASH_WORKERS_KEY
 from .constant import SYNC_STATE_FILE_KEY
 
 
@@ -26,7 +28,9 @@ def seq_sync_get(
         recalc_hash: bool,
         seq_type: str,
         download_batch_size: int,
-        reset_opt: bool):
+        reset_opt: bool,
+        parallel_downloads: int = 1,
+        hash_workers: int = 1):
 
     sync_state = {}
     state_file_path = os.path.join(output_dir, SYNC_STATE_FILE.replace('SEQTYPE', seq_type))
@@ -46,6 +50,8 @@ def seq_sync_get(
         # Settings allowed to be overriden between runs.
         sync_state[RECALCULATE_HASH_KEY] = recalc_hash
         sync_state[DOWNLOAD_BATCH_SIZE_KEY] = download_batch_size
+        sync_state[PARALLEL_DOWNLOADS_KEY] = parallel_downloads
+        sync_state[HASH_WORKERS_KEY] = hash_workers
         save_json(sync_state, state_file_path)
 
     elif not os.path.exists(output_dir):
@@ -57,7 +63,9 @@ def seq_sync_get(
             recalc_hash,
             output_dir,
             seq_type,
-            download_batch_size)
+            download_batch_size=download_batch_size,
+            parallel_downloads=parallel_downloads,
+            hash_workers=hash_workers)
 
         save_json(sync_state, state_file_path)
 
@@ -71,6 +79,8 @@ def seq_sync_get(
     logger.info(f'{GROUP_NAME_KEY}: {sync_state[GROUP_NAME_KEY]}')
     logger.info(f'{SEQ_TYPE_KEY}: {sync_state[SEQ_TYPE_KEY]}')
     logger.info(f'{RECALCULATE_HASH_KEY}: {sync_state[RECALCULATE_HASH_KEY]}')
+    logger.info(f'{PARALLEL_DOWNLOADS_KEY}: {sync_state[PARALLEL_DOWNLOADS_KEY]}')
+    logger.info(f'{HASH_WORKERS_KEY}: {sync_state[HASH_WORKERS_KEY]}')
 
     state_machine = configure_state_machine()
     final_state = state_machine.run(sync_state)
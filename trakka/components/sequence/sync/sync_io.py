@@ -1,20 +1,31 @@
 # pylint: disable=broad-exception-caught
 import os
 import json
-import hashlib
 import pandas as pd
 
+from trakka.utils.fs import atomic_write
+from trakka.utils.hash_cache import cached_sha256
+
+from .constant import FILE_NAME_ON_DISK_KEY
+from .constant import HOT_SWAP_NAME_KEY
 from .constant import INTERMEDIATE_MANIFEST_FILE_KEY
+from .constant import SEQ_TYPE_KEY
+from .constant import SERVER_MANIFEST_FILE
+from .constant import SERVER_MANIFEST_FILE_KEY
+from .constant import STATUS_KEY
 from .constant import OUTPUT_DIR_KEY
 from .errors import SyncError
 
+JOURNAL_SUFFIX = '.journal'
+PENDING_SUFFIX = '.next'
+
 invalid_output_dir = [
     '/', '/usr', '/home', '/bin', '/sbin', '/var', '/etc', '/opt'
 ]
 
 
 def save_json(dict_obj: dict, path: str):
-    with open(path, 'w', encoding='UTF-8') as file:
+    with atomic_write(path) as file:
         json.dump(dict_obj, file)
 
 
@@ -43,15 +54,85 @@ def read_from_csv_or_empty(sync_state: dict, state_key: str) -> pd.DataFrame:
 
 def save_int_manifest(data_frame, sync_state):
     path = get_path(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
-    with open(path, 'w', encoding='UTF-8') as file:
-        data_frame.to_csv(file, index=False)
-        file.close()
+    save_to_csv(data_frame, path)
+
+
+def get_journal_path(sync_state: dict) -> str:
+    return get_path(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY) + JOURNAL_SUFFIX
+
+
+class StatusJournal:
+    """
+    Append-only record of the status of each file as it completes. Each
+    entry is one JSON line, fsync'd before the next download is recorded, so
+    a checkpoint costs the same however large the manifest is. A line torn by
+    a crash is ignored when the journal is read back.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        # pylint: disable=consider-using-with
+        self._file = open(self.path, 'a', encoding='UTF-8')
+        return self
+
+    def __exit__(self, *args):
+        self._file.close()
+
+    def record(self, file_name: str, status: str, hot_swap_name: str = None):
+        entry = {FILE_NAME_ON_DISK_KEY: file_name, STATUS_KEY: status}
+        if hot_swap_name:
+            entry[HOT_SWAP_NAME_KEY] = hot_swap_name
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+def read_journal(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, encoding='UTF-8') as file:
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # The last line may have been cut short by a crash
+                continue
+    return entries
+
+
+def remove_journal(sync_state: dict):
+    path = get_journal_path(sync_state)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def get_server_manifest_path(sync_state: dict) -> str:
+    file_name = sync_state.get(SERVER_MANIFEST_FILE_KEY) \
+        or SERVER_MANIFEST_FILE.replace('SEQTYPE', sync_state[SEQ_TYPE_KEY])
+    return os.path.join(get_output_dir(sync_state), file_name)
+
+
+def get_pending_server_manifest_path(sync_state: dict) -> str:
+    return get_server_manifest_path(sync_state) + PENDING_SUFFIX
+
+
+def read_server_manifest(path: str) -> pd.DataFrame:
+    """
+    Read a cached copy of the server's sequence list. Values are kept exactly
+    as written, eg. a read of 'None', so rows compare equal to freshly pulled
+    ones.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
 
 
 def save_to_csv(data_frame, path):
-    with open(path, 'w', encoding='UTF-8') as file:
+    with atomic_write(path) as file:
         data_frame.to_csv(file, index=False)
-        file.close()
 
 
 def get_path(sync_state: dict, key_to_file: str):
@@ -72,8 +153,5 @@ def get_output_dir(sync_state):
     return output_dir
 
 
-def calc_hash(path):
-    with open(path, 'rb') as file:
-        file_hash = hashlib.sha256(file.read()).hexdigest().lower()
-        file.close()
-    return file_hash
+def calc_hash(path, use_cache: bool = True):
+    return cached_sha256(path, use_cache).lower()
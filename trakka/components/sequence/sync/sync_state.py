@@ -7,6 +7,8 @@ from .sync_validator import \
     ensure_download_batch_size_positive
 
 from .constant import SYNC_STATE_FILE
+from .constant import SERVER_MANIFEST_FILE
+from .constant import SERVER_MANIFEST_FILE_KEY
 from .constant import INTERMEDIATE_MANIFEST_FILE
 from .constant import MANIFEST_FILE_NAME
 from .constant import OBSOLETE_OBJECTS_FILE
@@ -21,6 +23,8 @@ from .constant import GROUP_NAME_KEY
 from .constant import SEQ_TYPE_KEY
 from .constant import RECALCULATE_HASH_KEY
 from .constant import DOWNLOAD_BATCH_SIZE_KEY
+from .constant import PARALLEL_DOWNLOADS_KEY
+from .constant import HASH_WORKERS_KEY
 
 from .sync_io import read_sync_state
 from .sync_workflow import set_state_pulling_manifest
@@ -31,11 +35,14 @@ def initialise(
         recalc_hash,
         output_dir,
         seq_type,
-        download_batch_size) -> dict:
+        download_batch_size,
+        parallel_downloads=1,
+        hash_workers=1) -> dict:
     sync_state = {}
     set_state_pulling_manifest(sync_state)
     sync_state[SYNC_STATE_FILE_KEY] = SYNC_STATE_FILE.replace('SEQTYPE', seq_type)
     sync_state[MANIFEST_KEY] = MANIFEST_FILE_NAME.replace('SEQTYPE', seq_type)
+    sync_state[SERVER_MANIFEST_FILE_KEY] = SERVER_MANIFEST_FILE.replace('SEQTYPE', seq_type)
     sync_state[OBSOLETE_OBJECTS_FILE_KEY] = OBSOLETE_OBJECTS_FILE.replace('SEQTYPE', seq_type)
     sync_state[INTERMEDIATE_MANIFEST_FILE_KEY] = \
         INTERMEDIATE_MANIFEST_FILE.replace('SEQTYPE', seq_type)
@@ -45,6 +52,8 @@ def initialise(
     sync_state[OUTPUT_DIR_KEY] = output_dir
     sync_state[TRASH_DIR_KEY] = TRASH_DIR
     sync_state[DOWNLOAD_BATCH_SIZE_KEY] = download_batch_size
+    sync_state[PARALLEL_DOWNLOADS_KEY] = parallel_downloads
+    sync_state[HASH_WORKERS_KEY] = hash_workers
     return sync_state
 
 
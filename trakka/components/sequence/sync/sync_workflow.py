@@ -3,16 +3,23 @@ import os.path
 from glob import glob
 import re
 from datetime import datetime
+from datetime import timedelta
 import shutil
+from typing import Tuple
 import pandas as pd
 
 from loguru import logger
 
 from trakka.components.sequence.funcs import _download_seq_file
 from trakka.components.sequence.funcs import _get_seq_download_path
+from trakka.utils.exceptions import UnknownResponseException
 from trakka.utils.exceptions import raise_sync_exception_if_none
+from trakka.utils.parallel import map_concurrently
 from trakka.utils.retry import retry
+from trakka.utils.download import discard_partial_download
+from trakka.utils.download import is_partial_download
 from trakka.utils.enums.seq import SeqType, convert_to_seq_type
+from trakka.utils.paths import SEQUENCE_CREATED_AFTER_QUERY
 
 from .errors import WorkflowError
 from .sync_io import \
@@ -21,6 +28,13 @@ from .sync_io import \
     read_from_csv_or_empty, \
     get_path, \
     save_int_manifest, \
+    StatusJournal, \
+    get_journal_path, \
+    read_journal, \
+    remove_journal, \
+    get_server_manifest_path, \
+    get_pending_server_manifest_path, \
+    read_server_manifest, \
     calc_hash, \
     save_to_csv, \
     save_json
@@ -37,7 +51,13 @@ from .constant import HOT_SWAP_NAME_KEY
 from .constant import FILE_PATH_KEY
 from .constant import DETECTION_DATE_KEY
 from .constant import OBSOLETE_OBJECTS_FILE_KEY
-from .constant import DOWNLOAD_BATCH_SIZE_KEY
+from .constant import PARALLEL_DOWNLOADS_KEY
+from .constant import HASH_WORKERS_KEY
+from .constant import MANIFEST_WATERMARK_KEY
+from .constant import PENDING_MANIFEST_WATERMARK_KEY
+from .constant import LAST_FULL_MANIFEST_PULL_KEY
+from .constant import FULL_MANIFEST_PULL_INTERVAL_HOURS
+from .constant import CREATED_KEY
 from .constant import INTERMEDIATE_MANIFEST_FILE_KEY
 from .constant import INTERMEDIATE_FASTA_AGGREGATE_FILE_NAME
 from .constant import MANIFEST_KEY
@@ -67,9 +87,11 @@ from ..funcs import _get_seq_data
 
 USE_CACHE = "use_cache"
 CHECK_HASH = "check_hash"
-DF = "df"
-IDX = "idx"
-ROW = "row"
+
+# A file that fails to download, or arrives with the wrong hash, is
+# downloaded again after DOWNLOAD_RETRY_DELAY seconds
+DOWNLOAD_RETRIES = 1
+DOWNLOAD_RETRY_DELAY = 5.0
 
 
 def configure_state_machine() -> StateMachine:
@@ -180,15 +202,24 @@ def pull_manifest(sync_state: dict):
         "pull_manifest: seq_type_enum cannot be None."
         "Please check the state file.")
     
-    data = _get_seq_data(group_name, seq_type_enum)
+    data, unchanged = pull_sequence_list(sync_state, group_name, seq_type_enum)
 
     logger.success(f'Freshly pulled manifest has {len(data)} entries.')
     path = get_path(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
     logger.info(f'Saving to intermediate manifest: {path}')
 
     if len(data) > 0:
+        # Keep the pulled list for the next incremental pull. It only
+        # replaces the cached copy once this sync has finalised.
+        save_to_csv(data, get_pending_server_manifest_path(sync_state))
+        sync_state[PENDING_MANIFEST_WATERMARK_KEY] = _watermark(data)
+
+        # Entries unchanged since the last completed sync only need their
+        # file to still be there, so analysis skips their hash check
+        int_man = data.copy()
+        int_man[STATUS_KEY] = unchanged.map({True: MATCH, False: ''})
         with open(path, 'w', encoding='UTF-8') as file:
-            data.to_csv(file, index=False)
+            int_man.to_csv(file, index=False)
     else:
         initialise_empty_int_manifest(sync_state)
 
@@ -197,6 +228,89 @@ def pull_manifest(sync_state: dict):
     logger.success(f'Finished: {Action.pull_manifest}')
 
 
+def pull_sequence_list(
+        sync_state: dict,
+        group_name: str,
+        seq_type_enum: SeqType) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Pull the group's sequence list. If an earlier sync completed recently,
+    only sequences created since its watermark are requested and merged into
+    the cached list. Otherwise, or if the server does not filter by creation
+    time, the full list is used. Returns the list and a mask of the entries
+    carried over unchanged from the cache.
+
+    createdAfter is not part of every server's API. A server that ignores it
+    returns sequences created before the watermark, which is taken as the
+    full list; the list is also pulled in full at least every
+    FULL_MANIFEST_PULL_INTERVAL_HOURS.
+    """
+    cached = read_server_manifest(get_server_manifest_path(sync_state))
+    watermark = _incremental_pull_watermark(sync_state, cached)
+    if watermark is None:
+        data = _get_seq_data(group_name, seq_type_enum)
+        sync_state[LAST_FULL_MANIFEST_PULL_KEY] = datetime.now().isoformat()
+        return data, pd.Series(False, index=data.index)
+
+    added = _get_seq_data(
+        group_name, seq_type_enum, group_params={SEQUENCE_CREATED_AFTER_QUERY: watermark})
+    if len(added) > 0 and not \
+            (pd.to_datetime(added[CREATED_KEY], utc=True, errors='coerce')
+             > pd.to_datetime(watermark, utc=True)).all():
+        logger.info('Server returned the full sequence list; '
+                    'incremental manifest pulls are not supported.')
+        sync_state[LAST_FULL_MANIFEST_PULL_KEY] = datetime.now().isoformat()
+        return added, pd.Series(False, index=added.index)
+
+    logger.info(f'Pulled {len(added)} sequences created since {watermark}')
+    if len(added) == 0:
+        return cached, pd.Series(True, index=cached.index)
+
+    # A new sequence for a sample and read replaces the cached one
+    replaced = _entry_keys(cached).isin(_entry_keys(added))
+    kept = cached[~replaced]
+    data = pd.concat([kept, added], ignore_index=True)
+    unchanged = pd.Series(data.index < len(kept), index=data.index)
+    return data, unchanged
+
+
+def _entry_keys(data: pd.DataFrame) -> pd.MultiIndex:
+    """
+    The sample, type and read of each entry. The cached list is read back
+    with nulls as '', while a pulled one has None or NaN, so nulls are made
+    '' on both sides.
+    """
+    keys = data[[SAMPLE_NAME_KEY, TYPE_KEY, READ_KEY]]
+    return pd.MultiIndex.from_frame(keys.astype(object).where(keys.notna(), '').astype(str))
+
+
+def _incremental_pull_watermark(sync_state: dict, cached: pd.DataFrame):
+    watermark = sync_state.get(MANIFEST_WATERMARK_KEY)
+    last_full_pull = sync_state.get(LAST_FULL_MANIFEST_PULL_KEY)
+    if not watermark or not last_full_pull or len(cached) == 0 \
+            or CREATED_KEY not in cached.columns or sync_state[RECALCULATE_HASH_KEY]:
+        return None
+    full_pull_age = datetime.now() - datetime.fromisoformat(last_full_pull)
+    if full_pull_age > timedelta(hours=FULL_MANIFEST_PULL_INTERVAL_HOURS):
+        return None
+    return watermark
+
+
+def _watermark(data: pd.DataFrame):
+    if CREATED_KEY not in data.columns:
+        return None
+    created = pd.to_datetime(data[CREATED_KEY], utc=True, errors='coerce').dropna()
+    return created.max().isoformat() if len(created) > 0 else None
+
+
+def promote_server_manifest(sync_state: dict):
+    """Make the list pulled by this sync the base for the next incremental pull"""
+    pending_path = get_pending_server_manifest_path(sync_state)
+    if not os.path.exists(pending_path):
+        return
+    os.replace(pending_path, get_server_manifest_path(sync_state))
+    sync_state[MANIFEST_WATERMARK_KEY] = sync_state.pop(PENDING_MANIFEST_WATERMARK_KEY, None)
+
+
 def set_state_analysing(sync_state: dict):
     sync_state[CURRENT_STATE_KEY] = SName.ANALYSING
     sync_state[CURRENT_ACTION_KEY] = Action.analyse
@@ -223,16 +337,12 @@ def analyse(sync_state: dict):
     if STATUS_KEY not in int_man.columns:
         int_man[STATUS_KEY] = ""
 
-    output_dir = get_output_dir(sync_state)
-    for index, row in int_man.iterrows():
-        seq_path = os.path.join(
-            output_dir,
-            str(row[SAMPLE_NAME_KEY]),
-            str(row[TYPE_KEY]),
-            str(row[FILE_NAME_ON_DISK_KEY]))
-
-        ctx = {DF: int_man, IDX: index, ROW: row}
-        analyse_status(ctx, use_hash_cache, seq_path, hash_cache)
+    int_man[STATUS_KEY] = analyse_status(
+        int_man,
+        get_output_dir(sync_state),
+        use_hash_cache,
+        hash_cache,
+        sync_state.get(HASH_WORKERS_KEY, 1))
 
     save_int_manifest(int_man, sync_state)
     sync_state[CURRENT_STATE_KEY] = SName.DONE_ANALYSING
@@ -243,10 +353,9 @@ def analyse(sync_state: dict):
 def build_hash_dict(published_manifest):
     hash_dict = {}
     hash_keys = [c for c in published_manifest.columns if c.startswith('HASH_')]
-    for _, row in published_manifest.iterrows():
-        for hash_key in hash_keys:
-            filename_key = hash_key[len('HASH_'):]
-            hash_dict[row[filename_key]] = row[hash_key]
+    for hash_key in hash_keys:
+        filename_key = hash_key[len('HASH_'):]
+        hash_dict.update(zip(published_manifest[filename_key], published_manifest[hash_key]))
     return hash_dict
 
 
@@ -272,33 +381,67 @@ def set_state_downloading(sync_state: dict):
 def download(sync_state: dict):
     logger.success(f'Started: {Action.download}')
 
-    batch_size = sync_state[DOWNLOAD_BATCH_SIZE_KEY]
+    parallel = sync_state.get(PARALLEL_DOWNLOADS_KEY, 1)
     data_frame = read_from_csv(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
 
     if HOT_SWAP_NAME_KEY not in data_frame.columns:
         data_frame[HOT_SWAP_NAME_KEY] = ""
 
-    save_int_manifest(data_frame, sync_state)
-
-    path = get_path(sync_state, INTERMEDIATE_MANIFEST_FILE_KEY)
-    with open(path, 'w', encoding='UTF-8') as file:
-        for index, row in data_frame.iterrows():
-            if row[STATUS_KEY] != DOWNLOADED and row[STATUS_KEY] != MATCH:
-                get_file_from_server(data_frame, index, row, sync_state)
-
-            if index % batch_size == 0:
-                data_frame.to_csv(file, index=False)
-                file.seek(0)
-
-        # One final save.
-        data_frame.to_csv(file, index=False)
-        file.close()
+    # Statuses recorded before an interruption are folded into the manifest
+    # before the journal is started afresh
+    replay_journal(data_frame, sync_state)
+    compact_journal(data_frame, sync_state)
+
+    pending = data_frame.index[
+        ~data_frame[STATUS_KEY].isin([DOWNLOADED, MATCH])]
+
+    # Workers only fetch files, each given a copy of its row, as pandas
+    # does not support reading a frame while another thread writes to it.
+    # Every status update and journal entry happens here, on the calling thread.
+    rows = zip(pending, data_frame.loc[pending].to_dict('records'))
+    with StatusJournal(get_journal_path(sync_state)) as journal:
+        for (index, _row), future in map_concurrently(
+                lambda item: get_file_from_server(item[1], sync_state),
+                rows,
+                parallel):
+            status, hot_swap_name = future.result()
+            data_frame.at[index, STATUS_KEY] = status
+            if hot_swap_name:
+                data_frame.at[index, HOT_SWAP_NAME_KEY] = hot_swap_name
+            journal.record(data_frame.at[index, FILE_NAME_ON_DISK_KEY], status, hot_swap_name)
+
+    compact_journal(data_frame, sync_state)
 
     sync_state[CURRENT_STATE_KEY] = SName.DONE_DOWNLOADING
     sync_state[CURRENT_ACTION_KEY] = Action.set_state_finalising
     logger.success(f'Finished: {Action.download}')
 
 
+def replay_journal(data_frame: pd.DataFrame, sync_state: dict):
+    """Apply the statuses recorded in the download journal to the manifest"""
+    entries = read_journal(get_journal_path(sync_state))
+    if not entries:
+        return
+    logger.info(f'Resuming download: {len(entries)} files already recorded')
+    journal = pd.DataFrame(entries).drop_duplicates(FILE_NAME_ON_DISK_KEY, keep='last')
+    journal = journal.set_index(FILE_NAME_ON_DISK_KEY)
+    file_names = data_frame[FILE_NAME_ON_DISK_KEY]
+    recorded = file_names.isin(journal.index)
+    data_frame.loc[recorded, STATUS_KEY] = \
+        file_names[recorded].map(journal[STATUS_KEY]).to_numpy()
+    if HOT_SWAP_NAME_KEY in journal.columns:
+        hot_swap_names = file_names.map(journal[HOT_SWAP_NAME_KEY].dropna())
+        has_hot_swap = hot_swap_names.notna()
+        data_frame.loc[has_hot_swap, HOT_SWAP_NAME_KEY] = \
+            hot_swap_names[has_hot_swap].to_numpy()
+
+
+def compact_journal(data_frame: pd.DataFrame, sync_state: dict):
+    """Atomically save the manifest, then drop the journal it now includes"""
+    save_int_manifest(data_frame, sync_state)
+    remove_journal(sync_state)
+
+
 def set_state_finalising(sync_state: dict):
     sync_state[CURRENT_STATE_KEY] = SName.FINALISING
     sync_state[CURRENT_ACTION_KEY] = Action.finalise
@@ -327,6 +470,7 @@ def finalise(sync_state: dict):
         finalise_each_file(int_med, sync_state)
         publish_new_manifest(int_med, sync_state)
         detect_and_record_obsolete_files(int_med, sync_state)
+        promote_server_manifest(sync_state)
 
         sync_state[CURRENT_STATE_KEY] = SName.DONE_FINALISING
         sync_state[CURRENT_ACTION_KEY] = Action.set_state_aggregating
@@ -370,6 +514,7 @@ def remove_int_manifest(output_dir, sync_state):
 
     if os.path.exists(int_m_path):
         os.remove(int_m_path)
+    remove_journal(sync_state)
 
 
 def set_state_up_to_date(sync_state: dict):
@@ -379,46 +524,42 @@ def set_state_up_to_date(sync_state: dict):
 
 def finalise_each_file(int_med, sync_state):
     output_dir = get_output_dir(sync_state)
-    for index, row in int_med.iterrows():
-
-        sample_name = str(row[SAMPLE_NAME_KEY])
-
-        dest = os.path.join(
-            output_dir,
-            sample_name,
-            row[TYPE_KEY],
-            row[FILE_NAME_ON_DISK_KEY])
-
-        if row[STATUS_KEY] == DRIFTED:
-            src = os.path.join(
-                output_dir,
-                sample_name,
-                row[TYPE_KEY],
-                row[HOT_SWAP_NAME_KEY])
-
+    status = int_med[STATUS_KEY]
+
+    unexpected = ~status.isin([DRIFTED, MATCH, DOWNLOADED, DONE])
+    if unexpected.any():
+        raise WorkflowError(
+            f'Reach an impossible state in the depths of {Action.finalise}. '
+            f'Expecting each file state to be only "{MATCH}", '
+            f'"{DOWNLOADED}", or "{DRIFTED}" but got something else. '
+            f'The caller, probably {Action.finalise}, should have checked '
+            f'my inputs before calling me.')
+
+    sample_dirs = [
+        os.path.join(output_dir, str(sample_name), seq_type)
+        for sample_name, seq_type in zip(int_med[SAMPLE_NAME_KEY], int_med[TYPE_KEY])]
+    dests = pd.Series(
+        [os.path.join(sample_dir, file_name)
+         for sample_dir, file_name in zip(sample_dirs, int_med[FILE_NAME_ON_DISK_KEY])],
+        index=int_med.index,
+        dtype=object)
+
+    is_drifted = (status == DRIFTED).to_numpy()
+    if is_drifted.any():
+        for sample_dir, hot_swap_name, dest in zip(
+                [d for d, drifted in zip(sample_dirs, is_drifted) if drifted],
+                int_med.loc[is_drifted, HOT_SWAP_NAME_KEY],
+                dests[is_drifted]):
             logger.warning(f'Hot swapping: {dest}')
-            os.rename(src, dest)
+            os.rename(os.path.join(sample_dir, hot_swap_name), dest)
             logger.info(f'Done hot swapping: {dest}')
 
-            int_med.at[index, STATUS_KEY] = DONE
-
-        elif row[STATUS_KEY] == MATCH or\
-                row[STATUS_KEY] == DOWNLOADED:
-
-            int_med.at[index, STATUS_KEY] = DONE
-            logger.info(f'Done: {dest}')
-
-        elif row[STATUS_KEY] == DONE:
-            logger.info(f'Already done: {dest}')
-
-        else:
-            raise WorkflowError(
-                f'Reach an impossible state in the depths of {Action.finalise}. '
-                f'Expecting each file state to be only "{MATCH}", '
-                f'"{DOWNLOADED}", or "{DRIFTED}" but got something else. '
-                f'The caller, probably {Action.finalise}, should have checked '
-                f'my inputs before calling me.')
+    for dest in dests[status.isin([MATCH, DOWNLOADED])]:
+        logger.info(f'Done: {dest}')
+    for dest in dests[status == DONE]:
+        logger.info(f'Already done: {dest}')
 
+    int_med[STATUS_KEY] = DONE
     logger.info(f'Finalized {int_med.shape[0]} entries.')
     save_int_manifest(int_med, sync_state)
 
@@ -429,11 +570,7 @@ def detect_and_record_obsolete_files(int_med, sync_state):
     # Get the list of files on disk. The array is a list of (full_path,
     # file_name_only)
     files_on_disk = []
-    obsoletes = pd.DataFrame({
-        FILE_PATH_KEY: [],
-        FILE_NAME_KEY: [],
-        DETECTION_DATE_KEY: []
-    })
+    detection_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
 
     # Subdirectories to scan are of form outdir/*/seqtype
     files = glob(os.path.join(get_output_dir(sync_state),'*',sync_state[SEQ_TYPE_KEY],'*'))
@@ -443,22 +580,22 @@ def detect_and_record_obsolete_files(int_med, sync_state):
         rf".+_[0-9TZ]+_[a-z0-9]{{8}}(_R\d)?(\.({seq_ext_regexstr}))?(\.({GZ_EXT}))?$")
 
     for path in files:
+        if is_partial_download(path):
+            # Partial downloads are resumed by the next download
+            continue
         if seqfile_regex.match(os.path.basename(path)):
-            files_on_disk.append((
-                path,
-                os.path.basename(path),
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-            ))
+            files_on_disk.append((path, os.path.basename(path), detection_date))
         else:
             logger.warning(
                 f"Ignoring unexpected file {path} in sequence directory")
 
     # If files found on disk are not in the intermediate manifest,
     # it is added to the list of obsolete files.
-    for triplet in files_on_disk:
-        result = int_med.loc[(int_med[FILE_NAME_ON_DISK_KEY] == triplet[-2])]
-        if len(result.index) == 0:
-            obsoletes.loc[len(obsoletes.index)] = triplet
+    on_manifest = set(int_med[FILE_NAME_ON_DISK_KEY])
+    obsoletes = pd.DataFrame(
+        [triplet for triplet in files_on_disk if triplet[1] not in on_manifest],
+        columns=[FILE_PATH_KEY, FILE_NAME_KEY, DETECTION_DATE_KEY],
+        dtype=object)
 
     # Check the reverse direction. If something is on the current obsolete list
     # of file, and is also in the intermediate manifest, then it needs to be
@@ -549,8 +686,14 @@ def publish_new_manifest(int_med, sync_state):
     logger.success(f'Published final manifest: {m_path}')
 
 
-def get_file_from_server(data_frame, index, row, sync_state):
+def get_file_from_server(row, sync_state) -> Tuple[str, str]:
+    """
+    Download the file for a single intermediate manifest entry.
+    Returns the new status of the entry, and the hot swap file name if a
+    fresh copy of a drifted file was downloaded.
+    """
     file_path = ""
+    hot_swap_name = None
     try:
         filename = row[FILE_NAME_ON_DISK_KEY]
         sample_name = str(row[SAMPLE_NAME_KEY])
@@ -565,82 +708,110 @@ def get_file_from_server(data_frame, index, row, sync_state):
             seq_type,)
 
         if row[STATUS_KEY] == DRIFTED:
-            fresh_name = f'{row[FILE_NAME_ON_DISK_KEY]}.fresh'
+            hot_swap_name = f'{row[FILE_NAME_ON_DISK_KEY]}.fresh'
             logger.info(f'Drifted from server: {file_path}')
-            logger.info(f'Downloading fresh copy to temp file: {fresh_name}')
-            data_frame.at[index, HOT_SWAP_NAME_KEY] = fresh_name
-            file_path = os.path.join(dest_dir, fresh_name)
-
-        retry(lambda fp=file_path, fn=filename, qp=query_path, pm=params, sd=dest_dir:
-              _download_seq_file(fp, fn, qp, pm, sd),
-              1,
-              query_path)
-
-        check_download_hash(data_frame, file_path, index, row)
+            logger.info(f'Downloading fresh copy to temp file: {hot_swap_name}')
+            file_path = os.path.join(dest_dir, hot_swap_name)
+
+        def _download_and_check():
+            # Dropped connections are resumed inside the download itself
+            local_hash = _download_seq_file(file_path, filename, query_path, params, dest_dir)
+            if local_hash is None:
+                raise UnknownResponseException(f'Could not download {file_path}')
+            if not check_download_hash(file_path, local_hash, row):
+                # Start the next attempt from scratch, not from the bad bytes
+                discard_partial_download(file_path)
+                os.remove(file_path)
+                raise UnknownResponseException(f'Bad hash for {file_path}')
+
+        retry(_download_and_check, DOWNLOAD_RETRIES, query_path, delay=DOWNLOAD_RETRY_DELAY)
 
         # Drifted entries are left for finalisation to hot swap.
         # Otherwise, mark the entry as successfully downloaded.
-        if data_frame.at[index, STATUS_KEY] != DRIFTED and \
-                data_frame.at[index, STATUS_KEY] != FAILED:
-
-            data_frame.at[index, STATUS_KEY] = DOWNLOADED
+        if row[STATUS_KEY] == DRIFTED:
+            return DRIFTED, hot_swap_name
+        return DOWNLOADED, hot_swap_name
 
     except Exception as ex:
-        data_frame.at[index, STATUS_KEY] = FAILED
         logger.error(f'Failed to download: {file_path}. Error: {ex}')
+        return FAILED, hot_swap_name
 
 
-def check_download_hash(data_frame, file_path, index, row):
-    local_hash = calc_hash(file_path)
+def check_download_hash(file_path, local_hash, row) -> bool:
+    """Compare the hash computed while downloading to the server's hash"""
+    if local_hash is None:
+        return False
     server_hash = row[SERVER_SHA_256_KEY]
 
     if local_hash.casefold() != server_hash.casefold():
         logger.error(f"Bad hash. Invalidating: {file_path}")
-        data_frame.at[index, STATUS_KEY] = FAILED
-
-
-def set_match_status(ctx, seq_path):
-    azure_path = os.path.join(
-        ctx[ROW][BLOB_FILE_PATH_KEY],
-        ctx[ROW][INT_FILE_NAME_KEY])
-    logger.info(f'Matched: {seq_path} ==> Azure: {azure_path}')
-    ctx[DF].at[ctx[IDX], STATUS_KEY] = MATCH
+        return False
+    return True
 
 
 def analyse_status(
-        ctx: dict,
+        int_man: pd.DataFrame,
+        output_dir: str,
         use_hash_cache: bool,
-        seq_path: str,
-        hash_cache: dict):
-    previously_matched = ctx[ROW][STATUS_KEY] == MATCH
-
-    if not os.path.exists(seq_path):
-        logger.warning(f'Missing: {seq_path}')
-        ctx[DF].at[ctx[IDX], STATUS_KEY] = MISSING
+        hash_cache: dict,
+        hash_workers: int) -> pd.Series:
+    """
+    Work out the MATCH/DRIFTED/MISSING status of every entry in the
+    intermediate manifest. Files needing a hash are hashed concurrently and
+    the statuses are returned as a single column.
+    """
+    seq_paths = pd.Series(
+        [os.path.join(output_dir, str(sample), str(seq_type), str(file_name))
+         for sample, seq_type, file_name in zip(
+            int_man[SAMPLE_NAME_KEY], int_man[TYPE_KEY], int_man[FILE_NAME_ON_DISK_KEY])],
+        index=int_man.index,
+        dtype=object)
+    exists = seq_paths.map(os.path.exists).astype(bool)
+
+    # Entries matched before an interrupted analysis, or when the user chose
+    # not to do hash checks, only need their file to still be there. Hash
+    # checks can take hours, so they are not redone.
+    needs_check = exists & (int_man[STATUS_KEY] != MATCH)
+
+    hashes = pd.Series(None, index=int_man.index, dtype=object)
+    if use_hash_cache:
+        hashes[needs_check] = int_man.loc[needs_check, FILE_NAME_ON_DISK_KEY].map(hash_cache)
+        logger.info(f'Hash cache hits: {hashes[needs_check].notna().sum()}')
+    to_hash = seq_paths[needs_check & hashes.isna()]
+    hashes.update(_hash_files(to_hash, use_hash_cache, hash_workers))
 
-    elif (not previously_matched) or ctx[ROW][STATUS_KEY] == FAILED:
+    matched = hashes.str.casefold() == int_man[SERVER_SHA_256_KEY].astype(str).str.casefold()
+    status = pd.Series(MATCH, index=int_man.index, dtype=object)
+    status[~exists] = MISSING
+    status[needs_check & ~matched] = DRIFTED
 
-        # If told to use cache and there is a cache hit.
-        if use_hash_cache and ctx[ROW][FILE_NAME_ON_DISK_KEY] in hash_cache:
-            logger.info("Hash cache hit.")
-            seq_hash = hash_cache[ctx[ROW][FILE_NAME_ON_DISK_KEY]]
-        else:
-            seq_hash = calc_hash(seq_path)
+    _log_status(int_man, seq_paths, status)
+    return status
 
-        if seq_hash.casefold() == ctx[ROW][SERVER_SHA_256_KEY].casefold():
-            set_match_status(ctx, seq_path)
-        else:
-            logger.warning(f'Drifted: {seq_path}')
-            ctx[DF].at[ctx[IDX], STATUS_KEY] = DRIFTED
 
-    else:
-        # This happens in two cases:
-        # 1) The user chose to not do hash checks.
-        # 2) The entry was previously matched when the analysis
-        #    got interrupted. Don't want to redo the hash checks
-        #    again because the process could take hours. Just check
-        #    that the file is still there.
-        set_match_status(ctx, seq_path)
+def _log_status(int_man: pd.DataFrame, seq_paths: pd.Series, status: pd.Series):
+    for seq_path in seq_paths[status == MISSING]:
+        logger.warning(f'Missing: {seq_path}')
+    for seq_path in seq_paths[status == DRIFTED]:
+        logger.warning(f'Drifted: {seq_path}')
+    is_match = status == MATCH
+    for seq_path, blob_path, file_name in zip(
+            seq_paths[is_match],
+            int_man.loc[is_match, BLOB_FILE_PATH_KEY],
+            int_man.loc[is_match, INT_FILE_NAME_KEY]):
+        logger.info(f'Matched: {seq_path} ==> Azure: {os.path.join(blob_path, file_name)}')
+
+
+def _hash_files(seq_paths: pd.Series, use_hash_cache: bool, hash_workers: int) -> pd.Series:
+    if len(seq_paths) > 0:
+        logger.info(f'Hashing {len(seq_paths)} files with {hash_workers} workers')
+    hashes = {}
+    for index, future in map_concurrently(
+            lambda idx: calc_hash(seq_paths[idx], use_hash_cache),
+            seq_paths.index,
+            hash_workers):
+        hashes[index] = future.result()
+    return pd.Series(hashes, dtype=object)
 
 
 def move_delete_targets_to_trash(
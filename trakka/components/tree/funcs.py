@@ -3,6 +3,8 @@ from trakka.components.tree.version.funcs import add_tree_version
 from trakka.utils.api import api_post, api_patch
 from trakka.utils.api import api_put
 from trakka.utils.helpers.tree import get_tree_by_abbrev
+from trakka.utils.lookup_cache import TREE
+from trakka.utils.lookup_cache import invalidate
 from trakka.utils.helpers.output import call_get_and_print
 from trakka.utils.misc import logger_wraps
 from trakka.utils.paths import TREE_PATH
@@ -45,7 +47,7 @@ def update_tree(
         project: str,
         is_active: bool,
 ):
-    tree = get_tree_by_abbrev(abbrev)
+    tree = get_tree_by_abbrev(abbrev, use_cache=False)
 
     if name is not None:
         tree['name'] = name
@@ -60,6 +62,7 @@ def update_tree(
         path=f'{TREE_PATH}/{abbrev}',
         data=tree
     )
+    invalidate(TREE)
 
 
 @logger_wraps()
@@ -67,6 +70,7 @@ def disable_tree(abbrev: str):
     api_patch(
         path=f'{TREE_PATH}/disable/{abbrev}',
     )
+    invalidate(TREE)
 
 
 @logger_wraps()
@@ -74,3 +78,4 @@ def enable_tree(abbrev: str):
     api_patch(
         path=f'{TREE_PATH}/enable/{abbrev}',
     )
+    invalidate(TREE)
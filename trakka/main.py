@@ -7,42 +7,26 @@ import click
 from click.core import Context
 from loguru import logger
 
-from trakka.utils.config import get_server_info_or_create
 from trakka.utils.privilege import TENANT_RESOURCE
 
 from trakka.utils.context import CxtKey
 from trakka.utils.context import TrakkaCxt
-from trakka.components.admin import admin
-from trakka.components.auth import auth
-from trakka.components.user import user
-from trakka.components.org import org
-from trakka.components.log import log_subcommands
-from trakka.components.project import project
-from trakka.components.tree import tree
-from trakka.components.metadata import metadata
-from trakka.components.sequence import seq
-from trakka.components.proforma import proforma
-from trakka.components.field import field
-from trakka.components.fieldtype import fieldtype
-from trakka.components.group import group
-from trakka.components.sample import sample
-from trakka.components.dashboard import dashboard
-from trakka.components.plot import plot
-from trakka.components.iam import iam
+from trakka.utils.context import DEFAULT_POOL_SIZE
+from trakka.utils.context import DEFAULT_KEEPALIVE_EXPIRY
 
 from trakka import __version__ as VERSION
 from trakka import __prog_name__ as PROG_NAME
-from trakka.utils.datetimes import LOCAL_TIMEZONE
+from trakka.utils.enums.timezone import LOCAL_TIMEZONE
+from trakka.utils.misc import AUTH_COMMAND
+from trakka.utils.misc import LazyCommand
 from trakka.utils.misc import TrakkaCliTopLevel
 from trakka.utils.logger import is_debug
 from trakka.utils.misc import HELP_OPTS
 from trakka.utils.exceptions import FailedResponseException
-from trakka.utils.output import log_response
 from trakka.utils.logger import setup_logger
 from trakka.utils.logger import LOG_LEVEL_INFO
 from trakka.utils.logger import LOG_LEVELS
 from trakka.utils.cmd_filter import show_admin_cmds
-from trakka.utils.version import check_version, warn_if_austrakka
 
 
 CONTEXT_SETTINGS = {"help_option_names": HELP_OPTS}
@@ -116,6 +100,33 @@ CONTEXT_SETTINGS = {"help_option_names": HELP_OPTS}
     type=bool,
     help="Skip check for new CLI version"
 )
+@click.option(
+    TrakkaCxt.get_option_name(CxtKey.HTTP_POOL_SIZE),
+    show_envvar=True,
+    envvar=TrakkaCxt.get_env_var_name(CxtKey.HTTP_POOL_SIZE),
+    default=DEFAULT_POOL_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Maximum number of connections kept open to the server"
+)
+@click.option(
+    TrakkaCxt.get_option_name(CxtKey.HTTP_KEEPALIVE_EXPIRY),
+    show_envvar=True,
+    envvar=TrakkaCxt.get_env_var_name(CxtKey.HTTP_KEEPALIVE_EXPIRY),
+    default=DEFAULT_KEEPALIVE_EXPIRY,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Seconds an idle connection is kept open for reuse"
+)
+@click.option(
+    TrakkaCxt.get_option_name(CxtKey.NO_CACHE),
+    show_envvar=True,
+    envvar=TrakkaCxt.get_env_var_name(CxtKey.NO_CACHE),
+    is_flag=True,
+    default=False,
+    help="Look up projects, trees, plots and pro formas on the server "
+         "instead of using the local cache, and ignore the record of known samples"
+)
 @click.option(
     '--log',
     'log_var',
@@ -124,7 +135,7 @@ CONTEXT_SETTINGS = {"help_option_names": HELP_OPTS}
 )
 @click.version_option(message="%(prog)s v%(version)s", version=VERSION, prog_name=PROG_NAME)
 @click.pass_context
-def cli(
+def cli(  # pylint: disable=too-many-locals
         ctx: Context,
         uri: str,
         token: str,
@@ -133,6 +144,9 @@ def cli(
         skip_cert_verify: bool,
         use_http2: bool,
         skip_version_check: bool,
+        http_pool_size: int,
+        http_keepalive_expiry: float,
+        no_cache: bool,
         log_var: str,
 ):
     ctx.context = {
@@ -144,8 +158,16 @@ def cli(
         CxtKey.LOG_LEVEL.value: log_level,
         CxtKey.SESSION_ID.value: str(uuid.uuid4()),
         CxtKey.TIMEZONE.value: timezone,
+        CxtKey.HTTP_POOL_SIZE.value: http_pool_size,
+        CxtKey.HTTP_KEEPALIVE_EXPIRY.value: http_keepalive_expiry,
+        CxtKey.NO_CACHE.value: no_cache,
     }
     setup_logger(log_level, log_var)
+    # Imported here rather than at the top so that --help does not load the
+    # HTTP clients
+    # pylint: disable=import-outside-toplevel
+    from trakka.utils.config import get_server_info_or_create
+    from trakka.utils.version import check_version, warn_if_austrakka
     warn_if_austrakka()
     if not skip_version_check:
         server_info = get_server_info_or_create(
@@ -159,24 +181,41 @@ def cli(
                          + " rolling.")
 
 
+# Top-level commands, each imported only when it is run. The help text is
+# listed here so that `trakka --help` need not import them.
+COMMANDS = {
+    'admin': LazyCommand('trakka.components.admin:admin',
+                         'Commands related to administration'),
+    AUTH_COMMAND: LazyCommand('trakka.components.auth:auth', 'Commands related to auth'),
+    'user': LazyCommand('trakka.components.user:user', 'Commands related to users'),
+    'org': LazyCommand('trakka.components.org:org', 'Commands related to organisations'),
+    'group': LazyCommand('trakka.components.group:group', 'Commands related to groups'),
+    'project': LazyCommand('trakka.components.project:project', 'Commands related to projects'),
+    'tree': LazyCommand('trakka.components.tree:tree', 'Commands related to trees'),
+    'plot': LazyCommand('trakka.components.plot:plot', 'Commands related to plots'),
+    'dashboard': LazyCommand('trakka.components.dashboard:dashboard',
+                             'Commands related to defining a dashboard'),
+    'metadata': LazyCommand('trakka.components.metadata:metadata',
+                            'Commands related to metadata submissions'),
+    'sample': LazyCommand('trakka.components.sample:sample', 'Commands related to samples'),
+    'seq': LazyCommand('trakka.components.sequence:seq', 'Commands related to sequences'),
+    'proforma': LazyCommand('trakka.components.proforma:proforma',
+                            'Commands related to metadata proformas'),
+    'field': LazyCommand('trakka.components.field:field', 'Commands related to metadata fields'),
+    'fieldtype': LazyCommand('trakka.components.fieldtype:fieldtype',
+                             'Commands related to metadata field types'),
+    'iam': LazyCommand('trakka.components.iam:iam',
+                       'Commands related to role based access control'),
+    'log': LazyCommand('trakka.components.log:log_subcommands',
+                       'Commands related to system logs', args=(TENANT_RESOURCE,)),
+}
+ADMIN_COMMANDS = ['admin', 'user', 'org', 'plot', 'dashboard', 'iam', 'log']
+
+
 def get_cli():
-    cli.add_command(admin) if show_admin_cmds() else None
-    cli.add_command(auth)
-    cli.add_command(user) if show_admin_cmds() else None
-    cli.add_command(org) if show_admin_cmds() else None
-    cli.add_command(group)
-    cli.add_command(project)
-    cli.add_command(tree)
-    cli.add_command(plot) if show_admin_cmds() else None
-    cli.add_command(dashboard) if show_admin_cmds() else None
-    cli.add_command(metadata)
-    cli.add_command(sample)
-    cli.add_command(seq)
-    cli.add_command(proforma)
-    cli.add_command(field)
-    cli.add_command(fieldtype)
-    cli.add_command(iam) if show_admin_cmds() else None
-    cli.add_command(log_subcommands(TENANT_RESOURCE)) if show_admin_cmds() else None
+    for name, command in COMMANDS.items():
+        cli.add_lazy_command(name, command) \
+            if name not in ADMIN_COMMANDS or show_admin_cmds() else None
     return cli
 
 
@@ -185,6 +224,8 @@ def main():
         # pylint: disable=no-value-for-parameter
         get_cli()()
     except FailedResponseException as ex:
+        # pylint: disable=import-outside-toplevel
+        from trakka.utils.output import log_response
         logger.error("Request failed")
         log_response(ex.parsed_resp)
         sys.exit(1)
@@ -1,18 +1,26 @@
 import http
 import json
+import threading
 from typing import Callable
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Tuple
+from typing import TypeVar
 from typing import Union
 from json.decoder import JSONDecodeError
 from http import HTTPStatus
 
+from click import get_current_context
 from httpx import HTTPStatusError
 import httpx
+from loguru import logger
 
 from trakka.utils.exceptions import FailedResponseException
 from trakka.utils.exceptions import UnknownResponseException
 from trakka.utils.exceptions import UnauthorizedException
+from trakka.utils.exceptions import TrakkaCliException
+from trakka.utils.json_stream import JsonRecordStream
 from trakka.utils.output import log_response
 from trakka.utils.context import CxtKey
 from trakka.utils.context import TrakkaCxt
@@ -22,6 +30,11 @@ CONTENT_TYPE_JSON = 'application/json'
 CONTENT_TYPE_MULTIPART = 'multipart/form-data; charset=utf-8; boundary=+++'
 WWW_AUTHENTICATE = 'www-authenticate'
 INVALID_TOKEN = 'invalid_token'
+HTTP_CLIENT_META_KEY = 'trakka.http_client'
+
+_client_lock = threading.Lock()
+
+T = TypeVar('T')
 
 def _get_default_headers(
         content_type: str = CONTENT_TYPE_JSON,
@@ -76,29 +89,99 @@ def get_response(response: httpx.Response, log_resp: bool = False) -> Dict:
     return parsed_resp
 
 
-def _get_client(
-        content_type: str = CONTENT_TYPE_JSON
-):
-    return httpx.Client(
-        headers=_get_default_headers(content_type),
+def _get_request_headers(
+        content_type: str,
+        custom_headers: Dict = None,
+) -> Dict:
+    custom_headers = {} if custom_headers is None else custom_headers
+    return {'Content-Type': content_type} | custom_headers
+
+
+class _ConnectionTracker:
+    """
+    Response hook that reports in the debug log whether each request was
+    served by a freshly opened connection or by one reused from the pool.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+        self.opened = 0
+        self.reused = 0
+
+    def __call__(self, response: httpx.Response):
+        stream = response.extensions.get('network_stream')
+        if stream is None:
+            return
+        with self._lock:
+            reused = id(stream) in self._seen
+            self._seen.add(id(stream))
+            if reused:
+                self.reused += 1
+            else:
+                self.opened += 1
+        logger.debug(
+            f"{'Reused' if reused else 'Opened'} connection "
+            f"{id(stream):#x} for {response.request.method} {response.request.url}"
+        )
+
+
+def _create_client() -> Tuple[httpx.Client, Callable[[], None]]:
+    pool_size = TrakkaCxt.get_value(CxtKey.HTTP_POOL_SIZE)
+    tracker = _ConnectionTracker()
+    client = httpx.Client(
+        headers=_get_default_headers(),
         verify=not TrakkaCxt.get_value(CxtKey.SKIP_CERT_VERIFY),
         timeout=None,
         http2=TrakkaCxt.get_value(CxtKey.USE_HTTP2),
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=TrakkaCxt.get_value(CxtKey.HTTP_KEEPALIVE_EXPIRY),
+        ),
+        event_hooks={'response': [tracker]},
     )
 
+    def close():
+        client.close()
+        logger.debug(
+            f"Closed HTTP session: {tracker.opened} connection(s) opened, "
+            f"{tracker.reused} request(s) served by a reused connection"
+        )
+
+    return client, close
+
+
+def _get_client() -> httpx.Client:
+    """
+    Returns the HTTP session shared by every request made during this CLI
+    invocation. The session is created on first use and closed when the
+    top-level click context is torn down.
+    """
+    try:
+        ctx = get_current_context()
+    except RuntimeError as ex:
+        raise TrakkaCliException(
+            "Error creating HTTP session. Context may not be active."
+        ) from ex
+    with _client_lock:
+        client = ctx.meta.get(HTTP_CLIENT_META_KEY)
+        if client is None:
+            client, close = _create_client()
+            ctx.meta[HTTP_CLIENT_META_KEY] = client
+            ctx.find_root().call_on_close(close)
+    return client
+
 
 def _use_http_client(
-        content_type: str = CONTENT_TYPE_JSON,
         log_resp: bool = False,
         parse_resp: bool = True
 ):
     def decorator(func):
         def inner_func(*args, **kwargs):
-            with _get_client(content_type) as client:
-                response = func(*args, **kwargs, client=client)
-                if parse_resp:
-                    return get_response(response, log_resp)
-                return response
+            response = func(*args, **kwargs, client=_get_client())
+            if parse_resp:
+                return get_response(response, log_resp)
+            return response
         return inner_func
     return decorator
 
@@ -120,24 +203,62 @@ def api_get_stream(
         path: str,
         func: Callable[[httpx.Response], None],
         params: Dict = None,
+        headers: Dict = None,
+        allow_status: Tuple[int, ...] = (),
         client: httpx.Client = None,
 ):
     """
-    Throws httpx.HTTPStatusError if status is not 2xx.
+    Throws httpx.HTTPStatusError if status is not 2xx, unless the status is
+    one of allow_status, in which case func is left to handle the response.
     """
     if params is None:
         params = {}
     resp: httpx.Response
-    with client.stream("GET", _get_url(path), params=params) as resp:
-        try:
-            resp.raise_for_status()
-        except HTTPStatusError:
-            resp.read()
-            get_response(resp, log_resp=True)
+    with client.stream("GET", _get_url(path), params=params, headers=headers) as resp:
+        if resp.status_code not in allow_status:
+            try:
+                resp.raise_for_status()
+            except HTTPStatusError:
+                resp.read()
+                get_response(resp, log_resp=True)
         func(resp)
 
 
-@_use_http_client(content_type=CONTENT_TYPE_MULTIPART, log_resp=True)
+def api_get_records(
+        path: str,
+        consume: Callable[[Iterator[Dict]], T],
+        params: Dict = None,
+) -> T:
+    """
+    GET a list endpoint and pass its 'data' records to consume as they are
+    decoded from the response, instead of loading the whole body first.
+    Returns whatever consume returns. Error responses are raised as they
+    are by api_get.
+    """
+    result = []
+
+    def read(resp: httpx.Response):
+        stream = JsonRecordStream(resp.iter_bytes())
+        records = iter(stream)
+        try:
+            result.append(consume(records))
+            # Finish the body so the rest of the envelope is read
+            for _ in records:
+                pass
+        except JSONDecodeError as ex:
+            raise UnknownResponseException(
+                f'{resp.status_code}: invalid JSON response: {ex}'
+            ) from ex
+        if 'data' not in stream.envelope or 'messages' not in stream.envelope:
+            raise UnknownResponseException(
+                f'{resp.status_code}: response has no data or messages'
+            )
+
+    api_get_stream(path, read, params=params)
+    return result[0]
+
+
+@_use_http_client(log_resp=True)
 def api_post_multipart(
         path: str,
         files,
@@ -146,18 +267,16 @@ def api_post_multipart(
         custom_headers: Dict = None,
         client: httpx.Client = None,
 ):
-    custom_headers = {} if custom_headers is None else custom_headers
     return client.post(
         _get_url(path),
         data=data,
         params=params,
         files=files,
-        headers=dict(client.headers) | custom_headers
+        headers=_get_request_headers(CONTENT_TYPE_MULTIPART, custom_headers)
     )
 
 
-@_use_http_client(content_type=CONTENT_TYPE_MULTIPART,
-                  log_resp=True, parse_resp=False)
+@_use_http_client(log_resp=True, parse_resp=False)
 def api_post_multipart_raw(
         path: str,
         files,
@@ -166,13 +285,12 @@ def api_post_multipart_raw(
         custom_headers: Dict = None,
         client: httpx.Client = None,
 ):
-    custom_headers = {} if custom_headers is None else custom_headers
     return client.post(
         _get_url(path),
         data=data,
         params=params,
         files=files,
-        headers=dict(client.headers) | custom_headers
+        headers=_get_request_headers(CONTENT_TYPE_MULTIPART, custom_headers)
     )
 
 
@@ -238,9 +356,8 @@ def api_delete(
         custom_headers: Dict = None,
         client: httpx.Client = None,
 ):
-    custom_headers = {} if custom_headers is None else custom_headers
     return client.delete(
         _get_url(path),
         params=params,
-        headers=dict(client.headers) | custom_headers
+        headers=_get_request_headers(CONTENT_TYPE_JSON, custom_headers)
     )
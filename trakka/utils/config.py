@@ -1,12 +1,16 @@
-# pylint: disable=consider-using-with
+import copy
 import json
 import os
+from datetime import datetime
+from datetime import timedelta
 from pathlib import Path
 from typing import Any, Dict, Union
 
 import httpx
 from loguru import logger
 
+from trakka.utils.fs import atomic_write
+
 CONF_ENVIRONMENTS = "Environments"
 CONF_SERVER_INFO = "ServerInfo"
 CONF_URL = "Url"
@@ -14,6 +18,14 @@ CONF_CLIENT_ID = "ClientId"
 CONF_TENANT_ID = "TenantId"
 CONF_API_SCOPE = "ApiScope"
 CONF_USE_SERVER_INFO_ENDPOINT = "UseServerInfoEndpoint"
+# Servers whose info could not be fetched, and when to next try them
+CONF_SERVER_INFO_RETRY_AFTER = "ServerInfoRetryAfter"
+
+SERVER_INFO_TIMEOUT = 5.0
+SERVER_INFO_RETRY_INTERVAL = timedelta(hours=1)
+
+# The parsed config, keyed by the file's path, modification time and size
+_config_cache: Dict[tuple, Dict] = {}
 
 
 def get_config_dir() -> str:
@@ -43,8 +55,34 @@ def create_config_file_if_not_exists():
 
 
 
+def read_config(conf_file: str) -> Dict:
+    """
+    Parse the config file, or copy the one parsed earlier in this process
+    if the file has not changed since. Callers may change what is returned
+    without changing the cached config.
+    """
+    stat = os.stat(conf_file)
+    key = (conf_file, stat.st_mtime_ns, stat.st_size)
+    if key not in _config_cache:
+        with open(conf_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        _config_cache.clear()
+        _config_cache[key] = data
+    return copy.deepcopy(_config_cache[key])
+
+
+def write_config(conf_file: str, data: Dict):
+    with atomic_write(conf_file) as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    _config_cache.clear()
+
+
+def _find_env_conf(url: str, data: Any) -> Union[Dict, None]:
+    return next((e for e in data[CONF_ENVIRONMENTS] if e[CONF_URL] == url), None)
+
+
 def _get_server_info(url: str, data: Any) -> Union[tuple[str, str, str], None]:
-    env_conf = [e for e in data[CONF_ENVIRONMENTS] if e[CONF_URL] == url][0]
+    env_conf = _find_env_conf(url, data)
     if env_conf is None:
         logger.debug("Config for env " + url + " not found. "
                      + "Using default auth values.")
@@ -72,8 +110,15 @@ def _get_server_info(url: str, data: Any) -> Union[tuple[str, str, str], None]:
 
 
 def _server_info_exists(url: str, data: Any) -> bool:
-    return not next(
-        iter([e for e in data[CONF_ENVIRONMENTS] if e[CONF_URL] == url]), None) is None
+    return _find_env_conf(url, data) is not None
+
+
+def _retry_pending(url: str, data: Any) -> bool:
+    retry_after = data.get(CONF_SERVER_INFO_RETRY_AFTER, {}).get(url)
+    try:
+        return retry_after is not None and datetime.now() < datetime.fromisoformat(retry_after)
+    except (TypeError, ValueError):
+        return False
 
 
 def get_server_info_or_create(
@@ -84,31 +129,41 @@ def get_server_info_or_create(
     conf_file = get_config_file()
     if not os.path.isfile(conf_file):
         return None
-    
-    orig_conf = open(conf_file, "r", encoding="utf-8")
-    data = json.load(orig_conf)
-    orig_conf.close()
+
+    data = read_config(conf_file)
     exists = _server_info_exists(url, data)
     if exists:
         return _get_server_info(url, data)
+    if _retry_pending(url, data):
+        logger.debug(
+            f"Server info for {url} could not be fetched recently. Using default auth values."
+        )
+        return None
     logger.debug(
         f"Server info does not exist for {url}. Attempting to get it"
     )
     env_entry = _get_new_server_info(url, vertify_vert)
+    retry_after = data.setdefault(CONF_SERVER_INFO_RETRY_AFTER, {})
     if env_entry is None:
-        return None
-    data[CONF_ENVIRONMENTS].append(env_entry)
+        retry_after[url] = (datetime.now() + SERVER_INFO_RETRY_INTERVAL).isoformat()
+    else:
+        retry_after.pop(url, None)
+        data[CONF_ENVIRONMENTS].append(env_entry)
+    if not retry_after:
+        del data[CONF_SERVER_INFO_RETRY_AFTER]
 
-    upd_conf = open(conf_file, "w", encoding="utf-8")
-    json.dump(data, upd_conf, ensure_ascii=False, indent=4)
-    upd_conf.close()
+    try:
+        write_config(conf_file, data)
+    except OSError as ex:
+        logger.warning(f"Unable to update local config. - {ex}")
     return _get_server_info(url, data)
 
 
 def _get_new_server_info(url: str, vertify_vert: bool) -> Union[Dict, None]:
     data = {}
     try:
-        r = httpx.get(url + "/api/Version", verify=not vertify_vert)
+        r = httpx.get(
+            url + "/api/Version", verify=not vertify_vert, timeout=SERVER_INFO_TIMEOUT)
         if not r.is_success:
             logger.warning(
                 "Unable to contact server to determine auth information.")
@@ -7,6 +7,9 @@ from trakka.utils.exceptions import TrakkaCliException
 
 CLI_PREFIX = 'AT'
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
 
 class CxtKey(Enum):
     """
@@ -20,6 +23,9 @@ class CxtKey(Enum):
     LOG_LEVEL = 'log_level'
     SESSION_ID = 'session_id'
     TIMEZONE = 'timezone'
+    HTTP_POOL_SIZE = 'http_pool_size'
+    HTTP_KEEPALIVE_EXPIRY = 'http_keepalive_expiry'
+    NO_CACHE = 'no_cache'
 
 
 class TrakkaCxt:
@@ -5,9 +5,8 @@ import pandas as pd
 
 from trakka.utils.misc import logger_wraps
 from trakka.utils.context import TrakkaCxt, CxtKey
-
-ORIGINAL_TIMEZONE = 'original'
-LOCAL_TIMEZONE = 'local'
+from trakka.utils.enums.timezone import ORIGINAL_TIMEZONE
+from trakka.utils.enums.timezone import LOCAL_TIMEZONE
 
 API_DATETIME_FORMAT = 'ISO8601'
 DT_FORMAT_WITH_TZ = '%Y-%m-%d %H:%M:%S %Z'
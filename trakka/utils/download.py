@@ -0,0 +1,226 @@
+"""
+Resumable file downloads. Bytes are written to a `.part` file next to the
+target and hashed as they arrive. If the transfer is interrupted, the next
+attempt asks the server for the remaining bytes with a Range request, and
+starts again from scratch if the server does not honour it. The target only
+appears once the download is complete.
+
+The ETag or Last-Modified of the response is kept next to the `.part` file
+and sent as If-Range, so that the server sends the whole file again,
+rather than the rest of a file that has since changed. A partial download
+with no validator is not resumed.
+"""
+import hashlib
+import os
+import re
+from http import HTTPStatus
+from time import sleep
+from typing import Dict
+
+import httpx
+from loguru import logger
+
+from trakka.utils import hash_cache
+from trakka.utils.api import api_get_stream
+from trakka.utils.exceptions import UnknownResponseException
+from trakka.utils.fs import atomic_write
+from trakka.utils.fs import update_hash_from_file
+
+PART_SUFFIX = '.part'
+VALIDATOR_SUFFIX = '.validator'
+DEFAULT_DOWNLOAD_ATTEMPTS = 3
+# A dropped connection is resumed after DOWNLOAD_RETRY_DELAY seconds, and
+# each later one after twice as long as the last
+DOWNLOAD_RETRY_DELAY = 1.0
+DOWNLOAD_BUFFER_SIZE_ENV = 'AT_DOWNLOAD_BUFFER_SIZE_MB'
+DEFAULT_DOWNLOAD_BUFFER_SIZE_MB = 4
+
+_CONTENT_RANGE_START = re.compile(r'bytes (\d+)-')
+
+
+def get_download_buffer_size() -> int:
+    """Size in bytes of the write buffer for downloads, set by AT_DOWNLOAD_BUFFER_SIZE_MB"""
+    size_mb = os.getenv(DOWNLOAD_BUFFER_SIZE_ENV) or DEFAULT_DOWNLOAD_BUFFER_SIZE_MB
+    try:
+        return max(1, int(float(size_mb) * 1024 * 1024))
+    except ValueError as ex:
+        raise ValueError(f'{DOWNLOAD_BUFFER_SIZE_ENV} must be a number, got {size_mb}') from ex
+
+
+def write_response(
+        resp: httpx.Response,
+        file_path: str,
+        mode: str = 'wb',
+        file_hash=None,
+        preallocate: bool = False,
+        buffer_size: int = None) -> int:
+    """
+    Stream a response body to file_path. Network reads are coalesced in a
+    large write buffer, so the disk sees a few large writes rather than one
+    per network read. Returns the number of bytes written.
+
+    With preallocate, the space for the whole body is reserved up front where
+    the platform supports it. This grows the file to its final size straight
+    away, so it must not be used on files that are resumed by their size.
+    """
+    written = 0
+    with open(file_path, mode, buffering=buffer_size or get_download_buffer_size()) as file:  # pylint: disable=unspecified-encoding
+        if preallocate:
+            _preallocate(file, resp)
+        for chunk in resp.iter_raw():
+            file.write(chunk)
+            if file_hash is not None:
+                file_hash.update(chunk)
+            written += len(chunk)
+        if preallocate:
+            # Drop any reserved space the body did not fill
+            file.truncate()
+    return written
+
+
+def _preallocate(file, resp: httpx.Response):
+    length = int(resp.headers.get('Content-Length') or 0)
+    if length <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(file.fileno(), file.tell(), length)
+    except OSError as ex:
+        # Not every filesystem supports it, and it is only an optimisation
+        logger.debug(f'Could not preallocate {file.name}: {ex}')
+
+
+def get_part_path(file_path: str) -> str:
+    return f'{file_path}{PART_SUFFIX}'
+
+
+def get_validator_path(file_path: str) -> str:
+    return f'{get_part_path(file_path)}{VALIDATOR_SUFFIX}'
+
+
+def is_partial_download(path: str) -> bool:
+    """Whether path is a partial download, or its validator, kept to be resumed"""
+    return path.endswith((PART_SUFFIX, f'{PART_SUFFIX}{VALIDATOR_SUFFIX}'))
+
+
+def download_file(
+        path: str,
+        params: Dict,
+        file_path: str,
+        attempts: int = DEFAULT_DOWNLOAD_ATTEMPTS) -> str:
+    """
+    Download from the API path to file_path, resuming a partial download
+    left by an earlier attempt if there is one. Returns the SHA-256 of the
+    complete file, computed while it was written.
+
+    A dropped connection is resumed, waiting longer each time, until
+    `attempts` attempts have been made. If it still fails the .part file is
+    kept, so a later run can carry on from where it stopped.
+    """
+    part_path = get_part_path(file_path)
+    attempt = 1
+    while True:
+        try:
+            sha256 = _download_to_part(path, params, file_path)
+            break
+        except httpx.TransportError as ex:
+            if attempt >= attempts:
+                raise
+            delay = DOWNLOAD_RETRY_DELAY * 2 ** (attempt - 1)
+            attempt += 1
+            logger.warning(
+                f'Download of {file_path} interrupted: {ex!r}. Resuming in {delay:g}s...')
+            sleep(delay)
+
+    os.replace(part_path, file_path)
+    _remove(get_validator_path(file_path))
+    hash_cache.store(os.path.realpath(file_path), os.stat(file_path), sha256)
+    return sha256
+
+
+def discard_partial_download(file_path: str):
+    _remove(get_part_path(file_path))
+    _remove(get_validator_path(file_path))
+
+
+def _download_to_part(path: str, params: Dict, file_path: str) -> str:
+    part_path = get_part_path(file_path)
+    validator_path = get_validator_path(file_path)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    validator = _read_validator(validator_path) if offset else None
+    if offset and not validator:
+        logger.info(f'Cannot tell whether {part_path} is still current. Restarting download')
+        offset = 0
+    result = {}
+
+    def _write_response(resp: httpx.Response):
+        if offset and resp.status_code == HTTPStatus.PARTIAL_CONTENT \
+                and _content_range_start(resp) == offset:
+            logger.info(f'Resuming download of {part_path} from byte {offset}')
+            sha256 = update_hash_from_file(hashlib.sha256(), part_path)
+            mode = 'ab'
+        elif resp.status_code == HTTPStatus.OK:
+            if offset:
+                logger.info(f'Server did not resume {part_path}. Restarting download')
+            _write_validator(validator_path, resp)
+            sha256 = hashlib.sha256()
+            mode = 'wb'
+        else:
+            result['status'] = resp.status_code
+            return
+
+        write_response(resp, part_path, mode, sha256)
+        result['sha256'] = sha256.hexdigest()
+
+    if not offset:
+        api_get_stream(path, _write_response, params)
+    else:
+        api_get_stream(
+            path,
+            _write_response,
+            params,
+            headers={'Range': f'bytes={offset}-', 'If-Range': validator},
+            allow_status=(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,))
+
+    if 'sha256' in result:
+        return result['sha256']
+    if not offset:
+        raise UnknownResponseException(f"{result['status']}: Unexpected response to download")
+
+    # The server could not serve the range asked for, eg. because the
+    # partial file is stale. Start again without it.
+    logger.info(f'Server could not resume {part_path}. Restarting download')
+    discard_partial_download(file_path)
+    return _download_to_part(path, params, file_path)
+
+
+def _content_range_start(resp: httpx.Response) -> int:
+    match = _CONTENT_RANGE_START.match(resp.headers.get('Content-Range', ''))
+    return int(match.group(1)) if match else -1
+
+
+def _write_validator(validator_path: str, resp: httpx.Response):
+    """
+    Keep the response's strong ETag, or else its Last-Modified, for If-Range.
+    A weak ETag cannot be used with If-Range.
+    """
+    etag = resp.headers.get('ETag', '')
+    validator = etag if etag and not etag.startswith('W/') \
+        else resp.headers.get('Last-Modified', '')
+    if not validator:
+        _remove(validator_path)
+        return
+    with atomic_write(validator_path) as file:
+        file.write(validator)
+
+
+def _read_validator(validator_path: str) -> str:
+    try:
+        with open(validator_path, encoding='UTF-8') as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        return ''
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,2 @@
+ORIGINAL_TIMEZONE = 'original'
+LOCAL_TIMEZONE = 'local'
@@ -1,8 +1,17 @@
 import hashlib
+import json
 import os
+import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
 
+from loguru import logger
+
 from trakka.utils.exceptions import IncorrectHashException
+from trakka.utils.progress import TransferProgress
+
+HASH_BUFFER_SIZE_ENV = 'AT_HASH_BUFFER_SIZE_MB'
+DEFAULT_HASH_BUFFER_SIZE_MB = 8
 
 
 @dataclass
@@ -13,14 +22,49 @@ class FileHash:
 
 def create_dir(output_dir):
     try:
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
 
     except PermissionError as ex:
         raise ValueError(
             f'Write permission denied for given output directory {output_dir}') from ex
 
 
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str = 'UTF-8'):
+    """
+    Open a temporary file next to path for writing, and rename it over path
+    once the block completes. Readers, and later runs after a crash, only ever
+    see the old or the new contents, never a partial write.
+    """
+    tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    encoding = None if 'b' in mode else encoding
+    try:
+        with open(tmp_path, mode.replace('w', 'x'), encoding=encoding) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_json_dict(path: str, description: str) -> dict:
+    """
+    Read a JSON object kept as a local cache or record. A missing file, or
+    one that cannot be read or does not hold an object, reads as {}.
+    """
+    try:
+        with open(path, encoding='UTF-8') as file:
+            data = json.load(file)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as ex:
+        logger.debug(f'Ignoring unreadable {description}: {ex}')
+        return {}
+
+
 def verify_hash(hashes: list[FileHash], resp: dict):
     errors = []
     for upload_dto in resp['data']:
@@ -60,8 +104,86 @@ def verify_hash_dataset_job(a_hash: FileHash, upload_dto: dict):
         raise IncorrectHashException(error)
 
 
+def get_hash_buffer_size() -> int:
+    """Size in bytes of the buffer used to hash files, set by AT_HASH_BUFFER_SIZE_MB"""
+    size_mb = os.getenv(HASH_BUFFER_SIZE_ENV) or DEFAULT_HASH_BUFFER_SIZE_MB
+    try:
+        return max(1, int(float(size_mb) * 1024 * 1024))
+    except ValueError as ex:
+        raise ValueError(f'{HASH_BUFFER_SIZE_ENV} must be a number, got {size_mb}') from ex
+
+
+def update_hash_from_file(file_hash, filepath: str, buffer_size: int = None):
+    """
+    Feed a file to a hashlib object by reading it into one reusable buffer,
+    so memory use stays fixed however large the file is.
+    """
+    buffer = bytearray(buffer_size or get_hash_buffer_size())
+    view = memoryview(buffer)
+    with open(filepath, 'rb', buffering=0) as file:
+        while n_read := file.readinto(buffer):
+            file_hash.update(view[:n_read])
+    return file_hash
+
+
+def sha256_file(filepath: str, buffer_size: int = None) -> str:
+    return update_hash_from_file(hashlib.sha256(), filepath, buffer_size).hexdigest()
+
+
 def get_hash(filepath):
-    with open(filepath, 'rb') as file:
+    return FileHash(
+        filename=os.path.basename(filepath),
+        sha256=sha256_file(filepath))
+
+
+class HashingReader:
+    """
+    Wraps a binary file so that the SHA-256 of the bytes is computed as they
+    are read, eg. by httpx while streaming an upload. Seeking back to the
+    start, which httpx does before sending the body, restarts the hash.
+    If given, progress is told how many bytes have been read so far.
+    """
+    def __init__(self, file, progress: TransferProgress = None):
+        self._file = file
+        self._sha256 = hashlib.sha256()
+        self._progress = progress
+
+    @property
+    def name(self):
+        return self._file.name
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self._sha256.update(chunk)
+        if self._progress is not None:
+            self._progress.update(len(chunk))
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        position = self._file.seek(offset, whence)
+        if position == 0:
+            self._sha256 = hashlib.sha256()
+            if self._progress is not None:
+                self._progress.reset()
+        return position
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+    def file_hash(self) -> FileHash:
         return FileHash(
-            filename=os.path.basename(filepath),
-            sha256=hashlib.sha256(file.read()).hexdigest())
+            filename=os.path.basename(self.name),
+            sha256=self.hexdigest())
@@ -0,0 +1,120 @@
+"""
+A local index of file hashes keyed by the file's path and stat metadata
+(size, mtime, inode), so files that have not changed since they were last
+hashed do not need to be read again. Any change to size, mtime or inode
+invalidates the entry.
+
+The cache is a SQLite database in the trakka config directory. Its location
+can be overridden with AT_HASH_CACHE_FILE. A cache that cannot be opened or
+written is skipped rather than failing the command.
+"""
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from trakka.utils.config import get_config_dir
+from trakka.utils.fs import sha256_file
+
+HASH_CACHE_FILE_ENV = 'AT_HASH_CACHE_FILE'
+HASH_CACHE_FILE_NAME = 'hash-cache.sqlite'
+
+_CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS file_hash (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+)'''
+
+
+class _HashIndex:
+    """The open cache database, reopened if AT_HASH_CACHE_FILE changes"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.path: Optional[str] = None
+        self.disabled_path: Optional[str] = None
+
+    def get_connection(self) -> Optional[sqlite3.Connection]:
+        cache_file = get_hash_cache_file()
+        if cache_file == self.path:
+            return self.connection
+        if cache_file == self.disabled_path:
+            return None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection, self.path = None, None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+            connection = sqlite3.connect(
+                cache_file, timeout=10, isolation_level=None, check_same_thread=False)
+            connection.execute(_CREATE_TABLE)
+        except (sqlite3.Error, OSError) as ex:
+            logger.warning(f'Hash cache unavailable, hashing files in full: {ex}')
+            self.disabled_path = cache_file
+            return None
+        self.connection, self.path = connection, cache_file
+        return self.connection
+
+    def execute(self, sql: str, params: tuple) -> Optional[list]:
+        with self.lock:
+            connection = self.get_connection()
+            if connection is None:
+                return None
+            try:
+                return connection.execute(sql, params).fetchall()
+            except sqlite3.Error as ex:
+                logger.debug(f'Hash cache query failed: {ex}')
+                return None
+
+
+_index = _HashIndex()
+
+
+def get_hash_cache_file() -> str:
+    return os.getenv(HASH_CACHE_FILE_ENV) or os.path.join(get_config_dir(), HASH_CACHE_FILE_NAME)
+
+
+def lookup(path: str, stat: os.stat_result) -> Optional[str]:
+    rows = _index.execute(
+        'SELECT sha256 FROM file_hash '
+        'WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?',
+        (path, stat.st_size, stat.st_mtime_ns, stat.st_ino))
+    return rows[0][0] if rows else None
+
+
+def store(path: str, stat: os.stat_result, sha256: str):
+    _index.execute(
+        'INSERT OR REPLACE INTO file_hash (path, size, mtime_ns, inode, sha256) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, sha256))
+
+
+def cached_sha256(filepath: str, use_cache: bool = True) -> str:
+    """
+    Return the SHA-256 of a file, reusing the cached value if the file's stat
+    metadata is unchanged. With use_cache=False the file is always hashed, but
+    the result is still stored for next time.
+    """
+    path = os.path.realpath(filepath)
+    stat = os.stat(path)
+    if use_cache:
+        sha256 = lookup(path, stat)
+        if sha256 is not None:
+            logger.debug(f'Hash cache hit: {filepath}')
+            return sha256
+
+    sha256 = sha256_file(path)
+    # Only trust the hash if the file did not change while it was read
+    if _same_file_state(stat, os.stat(path)):
+        store(path, stat, sha256)
+    return sha256
+
+
+def _same_file_state(before: os.stat_result, after: os.stat_result) -> bool:
+    return (before.st_size, before.st_mtime_ns, before.st_ino) \
+        == (after.st_size, after.st_mtime_ns, after.st_ino)
@@ -2,8 +2,9 @@ from typing import Dict, Union, List
 from loguru import logger
 
 from trakka.utils.api import api_get
+from trakka.utils.api import api_get_records
 from trakka.utils.misc import logger_wraps
-from trakka.utils.output import print_dataframe, read_pd
+from trakka.utils.output import print_dataframe, read_pd, read_pd_in_batches
 
 @logger_wraps()
 def call_get_and_print(
@@ -33,6 +34,38 @@ def call_get_and_print(
     )
     
 
+@logger_wraps()
+def call_get_list_and_print(
+        path: str,
+        out_format: str,
+        params: Dict = None,
+        restricted_cols: Union[List[str], None] = None,
+        datetime_cols: list[str] = None
+):
+    """
+    As call_get_and_print, for endpoints that can return very long lists.
+    Records are decoded and tabulated in batches as the response arrives.
+    """
+    params = {} if params is None else params
+    result = api_get_records(
+        path=path,
+        consume=lambda records: read_pd_in_batches(
+            records, lambda batch: read_pd(batch, out_format)),
+        params=params,
+    )
+
+    if result.empty:
+        logger.info("Nothing found.")
+        return
+
+    print_dataframe(
+        result,
+        out_format,
+        restricted_cols=restricted_cols,
+        datetime_cols=datetime_cols,
+    )
+
+
 def call_get_and_print_dataset_status(path: str,
                                       out_format: str,
                                       params: Dict = None):
@@ -1,6 +1,12 @@
 from trakka.utils.api import api_get
+from trakka.utils.lookup_cache import PLOT
+from trakka.utils.lookup_cache import cached_lookup
 from trakka.utils.paths import PLOT_PATH
 
 
-def get_plot_by_abbrev(abbrev: str):
-    return api_get(path=f"{PLOT_PATH}/abbrev/{abbrev}")['data']
+def get_plot_by_abbrev(abbrev: str, use_cache: bool = True):
+    return cached_lookup(
+        PLOT,
+        abbrev,
+        lambda: api_get(path=f"{PLOT_PATH}/abbrev/{abbrev}")['data'],
+        use_cache)
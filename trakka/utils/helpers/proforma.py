@@ -0,0 +1,12 @@
+from trakka.utils.api import api_get
+from trakka.utils.lookup_cache import PROFORMA
+from trakka.utils.lookup_cache import cached_lookup
+from trakka.utils.paths import PROFORMA_PATH
+
+
+def get_proforma_by_abbrev(abbrev: str, use_cache: bool = True):
+    return cached_lookup(
+        PROFORMA,
+        abbrev,
+        lambda: api_get(path=f"{PROFORMA_PATH}/abbrev/{abbrev}")['data'],
+        use_cache)
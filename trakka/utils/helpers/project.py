@@ -1,6 +1,12 @@
 from trakka.utils.api import api_get
+from trakka.utils.lookup_cache import PROJECT
+from trakka.utils.lookup_cache import cached_lookup
 from trakka.utils.paths import PROJECT_PATH
 
 
-def get_project_by_abbrev(abbrev: str):
-    return api_get(path=f"{PROJECT_PATH}/{abbrev}")['data']
+def get_project_by_abbrev(abbrev: str, use_cache: bool = True):
+    return cached_lookup(
+        PROJECT,
+        abbrev,
+        lambda: api_get(path=f"{PROJECT_PATH}/{abbrev}")['data'],
+        use_cache)
@@ -1,6 +1,12 @@
 from trakka.utils.api import api_get
+from trakka.utils.lookup_cache import TREE
+from trakka.utils.lookup_cache import cached_lookup
 from trakka.utils.paths import TREE_PATH
 
 
-def get_tree_by_abbrev(abbrev: str):
-    return api_get(path=f"{TREE_PATH}/abbrev/{abbrev}")['data']
+def get_tree_by_abbrev(abbrev: str, use_cache: bool = True):
+    return cached_lookup(
+        TREE,
+        abbrev,
+        lambda: api_get(path=f"{TREE_PATH}/abbrev/{abbrev}")['data'],
+        use_cache)
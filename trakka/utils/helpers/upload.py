@@ -1,6 +1,6 @@
 from loguru import logger
 
-from trakka.utils.fs import verify_hash_single, FileHash
+from trakka.utils.fs import verify_hash_single, HashingReader
 from trakka.utils.fs import verify_hash_dataset_job
 from trakka.utils.misc import logger_wraps
 from trakka.utils.api import api_post_multipart_raw, get_response
@@ -10,7 +10,7 @@ from trakka.utils.api import api_post_multipart_raw, get_response
 def upload_multipart(
         path: str,
         files,
-        file_hash: FileHash,
+        hashed_file: HashingReader,
         custom_headers: dict):
 
     resp = api_post_multipart_raw(
@@ -20,14 +20,14 @@ def upload_multipart(
     )
     data = get_response(resp, True)
     if resp.status_code == 200:
-        verify_hash_single(file_hash, data)
+        verify_hash_single(hashed_file.file_hash(), data)
 
 
 @logger_wraps()
 def upload_multipart_tracking_token(
         path: str,
         files,
-        file_hash: FileHash,
+        hashed_file: HashingReader,
         custom_headers: dict):
 
     resp = api_post_multipart_raw(
@@ -38,6 +38,6 @@ def upload_multipart_tracking_token(
     data = get_response(resp, True)
     dto = data['data']
     logger.info('Checking Hash...')
-    verify_hash_dataset_job(file_hash, dto)
+    verify_hash_dataset_job(hashed_file.file_hash(), dto)
     logger.success('Hash Verified!')
     return dto['trackingToken']
@@ -0,0 +1,123 @@
+"""
+Incremental decoding of API responses whose 'data' member is a long list.
+The body is decoded as it arrives, and each element of the list is handed
+on as soon as it is complete. Neither the raw body nor the whole list is
+ever held in memory, only the record being decoded and whatever the
+consumer keeps.
+"""
+import codecs
+import json
+import re
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+
+DATA_KEY = 'data'
+WHITESPACE = ' \t\n\r'
+# A number or literal is only known to be complete once one of these follows it
+SCALAR_END = re.compile(r'[ \t\n\r,\]}]')
+
+# Consumed text is dropped from the buffer once this much has built up
+COMPACT_THRESHOLD = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class JsonRecordStream:
+    """
+    Iterates over the elements of one list member of a JSON object read
+    from a stream of byte chunks, eg. httpx.Response.iter_bytes(). Every
+    other member is decoded whole into `envelope`, which is complete once
+    iteration has finished; the streamed list is recorded there as None.
+    A member that is not a list is yielded as a single record, unless it
+    is null.
+
+    Raises json.JSONDecodeError if the body is not a JSON object.
+    """
+    def __init__(self, chunks: Iterable[bytes], key: str = DATA_KEY):
+        self.key = key
+        self.envelope: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            name = self._value()
+            if not isinstance(name, str):
+                self._fail('Expecting property name enclosed in double quotes')
+            self._expect(':')
+            if name == self.key and self._peek() == '[':
+                self._pos += 1
+                self.envelope[name] = None
+                yield from self._elements()
+            else:
+                value = self._value()
+                self.envelope[name] = value
+                if name == self.key and value is not None:
+                    yield value
+            if self._peek() == '}':
+                self._pos += 1
+                return
+            self._expect(',')
+
+    def _elements(self) -> Iterator[Any]:
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == ']':
+                self._pos += 1
+                return
+            self._expect(',')
+
+    def _value(self) -> Any:
+        # A string, list or object does not decode until it is complete, but
+        # a number or literal may continue in the next chunk, eg. '1.' of
+        # '1.5', so it is not decoded until it is followed by a delimiter
+        is_scalar = self._peek() not in '"[{'
+        while True:
+            if not is_scalar or self._eof or SCALAR_END.search(self._buffer, self._pos):
+                try:
+                    value, self._pos = _decoder.raw_decode(self._buffer, self._pos)
+                    return value
+                except json.JSONDecodeError:
+                    if self._eof:
+                        raise
+            self._read()
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._read()
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            self._fail(f"Expecting '{char}'")
+        self._pos += 1
+
+    def _fail(self, message: str):
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _read(self):
+        if self._pos > COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            self._eof = True
+        else:
+            self._buffer += self._text_decoder.decode(chunk)
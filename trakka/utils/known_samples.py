@@ -0,0 +1,117 @@
+"""
+A local record of the samples known to exist on each server, because this
+machine created them or was told they already exist. Later `--create` runs
+skip those samples instead of asking the server to create them again.
+
+Samples are recorded per server and per user, as the lookup cache is, and
+are forgotten after KNOWN_SAMPLE_TTL, or once a user has more than
+MAX_KNOWN_SAMPLES, oldest first. Disabling or purging a sample removes it.
+The record is not used with --no-cache.
+
+The record is a JSON file in the trakka config directory. Its location can
+be overridden with AT_KNOWN_SAMPLES_FILE. Deleting it is always safe. A
+record that cannot be read or written is ignored rather than failing the
+command.
+"""
+import json
+import os
+from datetime import datetime
+from datetime import timedelta
+from typing import Callable
+from typing import Iterable
+from typing import Set
+
+from loguru import logger
+
+from trakka.utils.config import get_config_dir
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+from trakka.utils.fs import atomic_write
+from trakka.utils.fs import read_json_dict
+from trakka.utils.lookup_cache import cache_scope
+
+KNOWN_SAMPLES_FILE_ENV = 'AT_KNOWN_SAMPLES_FILE'
+KNOWN_SAMPLES_FILE_NAME = 'known-samples.json'
+
+KNOWN_SAMPLE_TTL = timedelta(days=30)
+MAX_KNOWN_SAMPLES = 200_000
+
+
+def get_known_samples_file() -> str:
+    return os.getenv(KNOWN_SAMPLES_FILE_ENV) \
+        or os.path.join(get_config_dir(), KNOWN_SAMPLES_FILE_NAME)
+
+
+def load() -> Set[str]:
+    if TrakkaCxt.get_value(CxtKey.NO_CACHE):
+        return set()
+    oldest = (datetime.now() - KNOWN_SAMPLE_TTL).isoformat()
+    return {
+        seq_id for seq_id, recorded in _user_samples(_read_record()).items()
+        if isinstance(recorded, str) and recorded > oldest
+    }
+
+
+def add(seq_ids: Iterable[str]):
+    seq_ids = set(seq_ids)
+    if not seq_ids or TrakkaCxt.get_value(CxtKey.NO_CACHE):
+        return
+    recorded = datetime.now().isoformat()
+
+    def _add(samples: dict):
+        samples.update(dict.fromkeys(seq_ids, recorded))
+        _prune(samples)
+
+    _update(_add)
+
+
+def remove(seq_ids: Iterable[str]):
+    """Forget samples that have been disabled or purged, even with --no-cache"""
+    seq_ids = set(seq_ids)
+    if not seq_ids.intersection(_user_samples(_read_record())):
+        return
+
+    def _remove(samples: dict):
+        for seq_id in seq_ids:
+            samples.pop(seq_id, None)
+
+    _update(_remove)
+
+
+def _prune(samples: dict):
+    """Drop expired samples, then the oldest beyond MAX_KNOWN_SAMPLES"""
+    oldest = (datetime.now() - KNOWN_SAMPLE_TTL).isoformat()
+    by_age = sorted(
+        (recorded, seq_id) for seq_id, recorded in samples.items()
+        if isinstance(recorded, str) and recorded > oldest)
+    kept = {seq_id: recorded for recorded, seq_id in by_age[-MAX_KNOWN_SAMPLES:]}
+    samples.clear()
+    samples.update(kept)
+
+
+def _user_samples(record: dict) -> dict:
+    server, user = cache_scope()
+    users = record.get(server)
+    samples = users.get(user) if isinstance(users, dict) else None
+    return samples if isinstance(samples, dict) else {}
+
+
+def _update(change: Callable[[dict], None]):
+    record = _read_record()
+    server, user = cache_scope()
+    samples = _user_samples(record)
+    change(samples)
+    if not isinstance(record.get(server), dict):
+        record[server] = {}
+    record[server][user] = samples
+    path = get_known_samples_file()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with atomic_write(path) as file:
+            json.dump(record, file)
+    except OSError as ex:
+        logger.debug(f'Could not update known samples record: {ex}')
+
+
+def _read_record() -> dict:
+    return read_json_dict(get_known_samples_file(), 'known samples record')
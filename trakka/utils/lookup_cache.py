@@ -0,0 +1,132 @@
+"""
+A local cache of reference data that rarely changes, eg. the project or tree
+an abbreviation refers to, so that a command which only needs to resolve an
+id does not ask the server for it every time. Entries are kept per server
+and per user, as what a user can see depends on their roles, and expire
+after a time set for each kind of entity. Commands that change an entity
+drop that kind of entity from the cache.
+
+Cached entities may be out of date, so callers that send an entity back to
+the server, eg. to update it, should fetch it with use_cache=False.
+
+The cache is a JSON file in the trakka config directory. Its location can be
+overridden with AT_LOOKUP_CACHE_FILE, and it is bypassed with --no-cache.
+Deleting it is always safe. A cache that cannot be read or written is
+ignored rather than failing the command.
+"""
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+
+from loguru import logger
+
+from trakka.utils.config import get_config_dir
+from trakka.utils.context import CxtKey
+from trakka.utils.context import TrakkaCxt
+from trakka.utils.fs import atomic_write
+from trakka.utils.fs import read_json_dict
+
+LOOKUP_CACHE_FILE_ENV = 'AT_LOOKUP_CACHE_FILE'
+LOOKUP_CACHE_FILE_NAME = 'lookup-cache.json'
+
+PROJECT = 'project'
+TREE = 'tree'
+PLOT = 'plot'
+PROFORMA = 'proforma'
+
+# Ids do not change once created; a pro forma's fields change with each version
+ENTITY_TTLS = {
+    PROJECT: timedelta(days=1),
+    TREE: timedelta(days=1),
+    PLOT: timedelta(days=1),
+    PROFORMA: timedelta(hours=1),
+}
+
+FETCHED_KEY = 'fetched'
+VALUE_KEY = 'value'
+
+
+def get_lookup_cache_file() -> str:
+    return os.getenv(LOOKUP_CACHE_FILE_ENV) \
+        or os.path.join(get_config_dir(), LOOKUP_CACHE_FILE_NAME)
+
+
+def cached_lookup(entity: str, key: str, fetch: Callable[[], Any], use_cache: bool = True):
+    """
+    Return the cached value for the entity's key if it is younger than the
+    entity's TTL, or else fetch() it and cache the result. With use_cache=False,
+    or --no-cache, the value is always fetched.
+    """
+    if not use_cache or TrakkaCxt.get_value(CxtKey.NO_CACHE):
+        return fetch()
+    entry = _user_entries(_read_cache()).get(entity, {}).get(key, {})
+    try:
+        fetched = datetime.fromisoformat(entry[FETCHED_KEY])
+        if datetime.now() - fetched < ENTITY_TTLS[entity]:
+            logger.debug(f'Using cached {entity} {key}')
+            return entry[VALUE_KEY]
+    except (KeyError, TypeError, ValueError):
+        pass
+    value = fetch()
+    _update(lambda entries: entries.setdefault(entity, {}).update({key: {
+        FETCHED_KEY: datetime.now().isoformat(),
+        VALUE_KEY: value,
+    }}))
+    return value
+
+
+def invalidate(entity: str):
+    """Drop every cached entity of this kind, after a command has changed one"""
+    if entity in _user_entries(_read_cache()):
+        _update(lambda entries: entries.pop(entity))
+
+
+def cache_scope():
+    """The server, and the user the token was issued to, that entries belong to"""
+    token = TrakkaCxt.get_value(CxtKey.TOKEN) or ''
+    user = hashlib.sha256(_token_subject(token).encode('utf-8')).hexdigest()
+    return TrakkaCxt.get_value(CxtKey.URI), user
+
+
+def _token_subject(token: str) -> str:
+    """
+    The issuer and subject of a JWT, so that a refreshed token keeps the
+    same cache entries, or else the token itself. The token is not verified;
+    it only picks which entries to use.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        subject = claims.get('oid') or claims.get('sub')
+        if subject:
+            return f"{claims.get('iss', '')}/{subject}"
+    except (IndexError, ValueError, AttributeError):
+        pass
+    return token
+
+
+def _user_entries(cache: dict) -> dict:
+    server, user = cache_scope()
+    return cache.get(server, {}).get(user, {})
+
+
+def _update(change: Callable[[dict], Any]):
+    cache = _read_cache()
+    server, user = cache_scope()
+    change(cache.setdefault(server, {}).setdefault(user, {}))
+    path = get_lookup_cache_file()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with atomic_write(path) as file:
+            json.dump(cache, file)
+    except OSError as ex:
+        logger.debug(f'Could not update lookup cache: {ex}')
+
+
+def _read_cache() -> dict:
+    return read_json_dict(get_lookup_cache_file(), 'lookup cache')
@@ -1,14 +1,17 @@
 import functools
+import importlib
 import sys
+from dataclasses import dataclass
+from typing import Tuple
 
 import click
 from loguru import logger
 
-from trakka.components.auth import auth
 from trakka.utils.context import CxtKey
 
 
 HELP_OPTS = ['-h', '--help']
+AUTH_COMMAND = 'auth'
 
 MISSING_TOKEN_HELP = '''Error: Environment variable AT_TOKEN is not set.
 
@@ -19,14 +22,64 @@ MISSING_URI_HELP = '''Error: Environment variable AT_URI is not set.
 Please contact a Trakka admin if you do not have this value.'''
 
 
+@dataclass(frozen=True)
+class LazyCommand:
+    """
+    A subcommand that is imported only when it is run, so that starting the
+    CLI does not pay for every other command's dependencies. import_path is
+    'module:attribute'; if args are given the attribute is called with them
+    to build the command.
+    """
+    import_path: str
+    short_help: str
+    args: Tuple = ()
+
+    def load(self) -> click.Command:
+        module_name, attribute = self.import_path.split(':')
+        command = getattr(importlib.import_module(module_name), attribute)
+        return command(*self.args) if self.args else command
+
+
 class TrakkaCliTopLevel(click.Group):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = {}
+
+    def add_lazy_command(self, name: str, command: LazyCommand):
+        self.lazy_commands[name] = command
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            self.add_command(self.lazy_commands[cmd_name].load(), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        # Listed from the registry, so that help does not import every command
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            if name in self.commands:
+                if self.commands[name].hidden:
+                    continue
+                rows.append((name, self.commands[name].get_short_help_str(limit)))
+            else:
+                rows.append((name, self.lazy_commands[name].short_help))
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
+
     # pylint: disable=super-with-arguments
     def parse_args(self, ctx, args):
         try:
             return super(TrakkaCliTopLevel, self).parse_args(ctx, args)
         except click.MissingParameter:
             # if getting help or trying to authorise, ignore top level params
-            if not any(i in HELP_OPTS for i in args) and args[0] != auth.name:
+            if not any(i in HELP_OPTS for i in args) and args[0] != AUTH_COMMAND:
                 raise
             # remove the required params so that help can display
             for param in self.params:
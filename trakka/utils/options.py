@@ -548,6 +548,34 @@ def opt_batch_size(**attrs: t.Any):
     )
 
 
+def opt_parallel(**attrs: t.Any):
+    defaults = {
+        'required': False,
+        'default': 1,
+        'help': 'Number of transfers to run concurrently'
+    }
+    return create_option(
+        '--parallel',
+        type=click.IntRange(min=1),
+        **{**defaults, **attrs}
+    )
+
+
+def opt_hash_workers(**attrs: t.Any):
+    defaults = {
+        'required': False,
+        'default': 1,
+        'help': 'Number of files to hash concurrently when comparing local '
+                'files to the server. Values above 1 help most on SSDs and '
+                'network storage.'
+    }
+    return create_option(
+        '--hash-workers',
+        type=click.IntRange(min=1),
+        **{**defaults, **attrs}
+    )
+
+
 def opt_is_active(is_update=False, **attrs: t.Any):
     defaults = {
         'help': 'Determines if the entry is active'
@@ -672,6 +700,37 @@ def opt_blanks_delete(**attrs: t.Any):
     )
 
 
+def opt_local_validation(**attrs: t.Any):
+    defaults = {
+        'help': "Check the file against the pro forma before submitting it, and "
+                "submit nothing if missing required columns or values, invalid "
+                "categorical values, numbers or dates are found. The server "
+                "validates the file either way."
+    }
+    return create_option(
+        '--local-validation/--no-local-validation',
+        type=bool,
+        is_flag=True,
+        default=True,
+        **{**defaults, **attrs}
+    )
+
+
+def opt_resume(**attrs: t.Any):
+    defaults = {
+        'help': "Skip the batches whose rows an earlier run of the same submission "
+                "had uploaded successfully, as recorded in the checkpoint file "
+                "next to the submitted file. Rows that failed can be fixed first."
+    }
+    return create_option(
+        '--resume',
+        type=bool,
+        is_flag=True,
+        default=False,
+        **{**defaults, **attrs}
+    )
+
+
 def opt_country(**attrs: t.Any):
     defaults = {
         'required': True,
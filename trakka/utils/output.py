@@ -1,6 +1,11 @@
+import os
+import sys
+from itertools import islice
 from typing import Callable
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import TextIO
 from typing import Union
 
 import click
@@ -21,10 +26,18 @@ from trakka.utils.enums.api import RESPONSE_MESSAGE
 from trakka.utils.enums.view_type import COMPACT, MORE, FULL
 
 _FORMAT_PREFIX = '_format_'
+_WRITE_PREFIX = '_write_'
 _EXTENSION_PREFIX = '_extension_'
 
 DEFAULT_DATETIME_COLUMNS = ['created', 'lastUpdated', 'eventTime']
 
+DATAFRAME_BATCH_SIZE = 10_000
+
+# Rows formatted at a time when writing a table out
+OUTPUT_CHUNK_ROWS = 1000
+# Rows of a pretty table whose values set the column widths
+PRETTY_WIDTH_WINDOW = 1000
+
 # pylint: disable=too-few-public-methods
 class FORMATS:
     PRETTY = 'pretty'
@@ -87,6 +100,88 @@ def _format_tsv(
     return dataframe.to_csv(index=False, sep='\t')
 
 
+def _write_chunks(dataframe: pd.DataFrame, file: TextIO, format_chunk: Callable):
+    for start in range(0, len(dataframe.index), OUTPUT_CHUNK_ROWS):
+        file.write(format_chunk(dataframe.iloc[start:start + OUTPUT_CHUNK_ROWS], start == 0))
+
+
+def _write_csv(dataframe: pd.DataFrame, file: TextIO):
+    if dataframe.empty:
+        file.write(_format_csv(dataframe))
+        return
+    _write_chunks(dataframe, file, lambda chunk, first: chunk.to_csv(index=False, header=first))
+
+
+def _write_tsv(dataframe: pd.DataFrame, file: TextIO):
+    if dataframe.empty:
+        file.write(_format_tsv(dataframe))
+        return
+    _write_chunks(
+        dataframe, file, lambda chunk, first: chunk.to_csv(index=False, header=first, sep='\t'))
+
+
+def _write_json(dataframe: pd.DataFrame, file: TextIO):
+    def format_chunk(chunk: pd.DataFrame, first: bool) -> str:
+        # Each chunk renders as '[\n  {...},\n  {...}\n]', so drop its brackets
+        records = _format_json(chunk)[len('[\n'):-len('\n]\n')]
+        return records if first else ',\n' + records
+
+    file.write('[\n')
+    _write_chunks(dataframe, file, format_chunk)
+    file.write('\n]\n')
+
+
+def _write_pretty(dataframe: pd.DataFrame, file: TextIO):
+    """
+    A table that fits in one window is laid out by tabulate exactly as
+    before. A longer table takes its column widths and alignment from its
+    first window of rows, so the rest can be written as it is formatted.
+    Later values wider than their column push the rest of their row right.
+    """
+    if len(dataframe.index) <= PRETTY_WIDTH_WINDOW:
+        file.write(_format_pretty(dataframe))
+        return
+    first_window = _format_pretty(dataframe.iloc[:PRETTY_WIDTH_WINDOW])
+    file.write(first_window)
+    widths = [len(dashes) for dashes in first_window.split('\n')[1].split('  ')]
+    align_right = [
+        _is_numeric_column(dataframe[column].iloc[:PRETTY_WIDTH_WINDOW])
+        for column in dataframe.columns
+    ]
+
+    def format_row(row) -> str:
+        cells = [
+            _format_pretty_cell(value).rjust(width) if right
+            else _format_pretty_cell(value).ljust(width)
+            for value, width, right in zip(row, widths, align_right)
+        ]
+        return '  '.join(cells).rstrip()
+
+    rest = dataframe.iloc[PRETTY_WIDTH_WINDOW:]
+    _write_chunks(rest, file, lambda chunk, first: ''.join(
+        format_row(row) + '\n' for row in chunk.itertuples(index=False, name=None)))
+
+
+def _format_pretty_cell(value) -> str:
+    if isinstance(value, float):
+        return format(value, 'g')
+    if value is None or value is pd.NA:
+        return 'nan'
+    return str(value)
+
+
+def _is_numeric_column(values: pd.Series) -> bool:
+    """As tabulate decides, a column is numeric if every value parses as a number"""
+    for value in values:
+        if isinstance(value, bool):
+            return False
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
 def default_table_format():
     return FORMATS.PRETTY
 
@@ -116,10 +211,25 @@ def print_dataframe(
         if col in dataframe.columns:
             dataframe.loc[:,col] = dt_format_and_convert(dataframe[col])
 
-    output = convert_format(dataframe, output_format)
+    # Written as it is formatted, so output starts at once and a reader such
+    # as head can stop early
+    try:
+        write_format(dataframe, sys.stdout, output_format)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        _stop_writing_stdout()
 
-    # pylint: disable=bad-builtin
-    print(output, end='')
+
+def _stop_writing_stdout():
+    """
+    Exit quietly once the reader of stdout has closed it, eg. head. stdout is
+    pointed at devnull first, so that Python's flush at exit does not fail
+    on the closed pipe as well.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+    sys.exit(0)
 
 
 def print_dict(
@@ -136,6 +246,19 @@ def convert_format(
     return globals()[format_func](dataframe)
 
 
+def write_format(
+        dataframe: pd.DataFrame,
+        file: TextIO,
+        output_format: str = default_object_format(),
+):
+    """Write the table to file in output_format, a chunk of rows at a time"""
+    write_func = globals().get(f'{_WRITE_PREFIX}{output_format}')
+    if write_func is None:
+        file.write(convert_format(dataframe, output_format))
+    else:
+        write_func(dataframe, file)
+
+
 def _get_output_extension(output_format: str):
     format_func = f'{_EXTENSION_PREFIX}{output_format}'
     return globals()[format_func]()
@@ -157,11 +280,10 @@ def write_dataframe(
     :param output_format:
     :param base_filepath: Should NOT include an extension.
     """
-    output = convert_format(dataframe, output_format)
     extension = _get_output_extension(output_format)
     filename = base_filepath + "." + extension
     with open(filename, "w", encoding="utf-8") as file:
-        file.write(output)
+        write_format(dataframe, file, output_format)
     logger.info(f"Written file {filename}")
 
 
@@ -293,3 +415,37 @@ def get_viewtype_columns(
 def read_pd(data, out_format: str) -> DataFrame:
     max_level = -1 if out_format in object_format_types() else 9999
     return pd.json_normalize(data, max_level=max_level)
+
+
+def read_pd_columns(records: List[Dict], dtype=None) -> DataFrame:
+    """
+    Build a DataFrame column by column. Unlike building it from records,
+    a column with missing values is not coerced to float first.
+    """
+    columns = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    return pd.DataFrame(
+        {column: [record.get(column) for record in records] for column in columns},
+        dtype=dtype,
+    )
+
+
+def read_pd_in_batches(
+        records: Iterable[Dict],
+        to_frame: Callable[[List[Dict]], DataFrame] = read_pd_columns,
+        batch_size: int = DATAFRAME_BATCH_SIZE,
+) -> DataFrame:
+    """
+    Build a DataFrame from a stream of records a batch at a time, so that
+    only one batch of records is held alongside the frame being built.
+    """
+    records = iter(records)
+    frames = []
+    while batch := list(islice(records, batch_size)):
+        frames.append(to_frame(batch))
+    if not frames:
+        return to_frame([])
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,84 @@
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Tuple
+
+from click import get_current_context
+from click.globals import pop_context
+from click.globals import push_context
+
+DEFAULT_PARALLEL = 1
+
+
+def _in_context(ctx, func: Callable) -> Callable:
+    """
+    Click keeps the current context in a thread local. Worker threads need the
+    invoking command's context pushed so that TrakkaCxt lookups and the shared
+    HTTP session keep working.
+    """
+    def wrapped(*args, **kwargs):
+        if ctx is None:
+            return func(*args, **kwargs)
+        push_context(ctx)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            pop_context()
+    return wrapped
+
+
+def _completed_future(func: Callable, item: Any) -> Future:
+    future = Future()
+    try:
+        future.set_result(func(item))
+    # pylint: disable=broad-exception-caught
+    except Exception as ex:
+        future.set_exception(ex)
+    return future
+
+
+def map_concurrently(
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        workers: int = DEFAULT_PARALLEL,
+) -> Iterator[Tuple[Any, Future]]:
+    """
+    Calls func on each item using at most `workers` threads and yields
+    (item, future) pairs in completion order. Calling future.result() returns
+    the value of func or re-raises its exception.
+
+    Only a bounded window of items is submitted at a time, so items may be a
+    lazy iterable. With a single worker everything runs in the calling thread,
+    in order.
+    """
+    if workers <= 1:
+        for item in items:
+            yield item, _completed_future(func, item)
+        return
+
+    ctx = get_current_context(silent=True)
+    task = _in_context(ctx, func)
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    in_flight = {}
+    try:
+        for item in items:
+            in_flight[executor.submit(task, item)] = item
+            if len(in_flight) < workers * 2:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future
+    finally:
+        # Drop anything not yet started if the caller bailed out early
+        executor.shutdown(wait=not in_flight, cancel_futures=True)
@@ -16,6 +16,7 @@ SEQUENCE_BY_GROUP_PATH = 'by-group'
 SEQUENCE_BY_SAMPLE_PATH = 'by-sample'
 SEQUENCE_TYPE_QUERY = 'seqType'
 SEQUENCE_READ_QUERY = 'read'
+SEQUENCE_CREATED_AFTER_QUERY = 'createdAfter'
 SAMPLE_PATH = 'Sample'
 GROUP_PATH = 'Group'
 PLOT_PATH = "Plots"
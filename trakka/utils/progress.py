@@ -0,0 +1,36 @@
+"""
+Byte-level progress reporting for long transfers. Progress is logged each
+time another tenth of the transfer completes, and only for transfers large
+enough for it to be useful, so uploading many small files stays quiet.
+"""
+from loguru import logger
+
+MIB = 1024 * 1024
+MIN_REPORTED_SIZE = 64 * MIB
+REPORT_STEPS = 10
+
+
+class TransferProgress:
+    """Counts the bytes of one transfer and logs each completed tenth"""
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self._reported_step = 0
+
+    def update(self, n_bytes: int):
+        self.done += n_bytes
+        if not self.total or self.total < MIN_REPORTED_SIZE:
+            return
+        step = min(REPORT_STEPS, self.done * REPORT_STEPS // self.total)
+        if step > self._reported_step:
+            self._reported_step = step
+            logger.info(
+                f'{self.label}: {step * 100 // REPORT_STEPS}% '
+                f'({self.done / MIB:.0f} of {self.total / MIB:.0f} MiB)'
+            )
+
+    def reset(self):
+        """Start counting again, eg. when a retried request resends the body"""
+        self.done = 0
+        self._reported_step = 0
@@ -9,7 +9,8 @@ def retry(func, retries, desc, delay=0):
     tried = 0
     while (tried <= retries) and not succeeded:
         try:
-            sleep(delay)
+            if tried:
+                sleep(delay)
             func()
             succeeded = True
         # pylint: disable=broad-exception-caught
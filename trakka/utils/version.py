@@ -1,32 +1,122 @@
+"""
+Checking PyPI for a newer release of the CLI. The latest version is cached
+in the trakka config directory, and the cache is refreshed at most once a
+day by a background thread. A command that finishes first waits for it for
+at most VERSION_CHECK_EXIT_TIMEOUT seconds as it exits. A command run with
+a fresh cache makes no network request at all, and a host that cannot
+reach PyPI only tries again once the day is up.
+
+The cache location can be overridden with AT_VERSION_CHECK_FILE.
+"""
+import atexit
+import json
+import os
+import threading
+from datetime import datetime
+from datetime import timedelta
 from functools import cmp_to_key
-import requests
+
 from semver import compare, VersionInfo
 from loguru import logger
 from trakka import __prog_name__ as PROG_NAME
+from trakka.utils.config import get_config_dir
+from trakka.utils.fs import atomic_write
+from trakka.utils.fs import read_json_dict
 
 PYPI_PACKAGE_URI = f'https://pypi.org/pypi/{PROG_NAME}/json'
+VERSION_CHECK_FILE_ENV = 'AT_VERSION_CHECK_FILE'
+VERSION_CHECK_FILE_NAME = 'version-check.json'
+VERSION_CHECK_TTL = timedelta(hours=24)
+VERSION_CHECK_EXIT_TIMEOUT = 2.0
+
+LATEST_KEY = 'latest'
+CHECKED_KEY = 'checked'
+
+
+def get_version_check_file() -> str:
+    return os.getenv(VERSION_CHECK_FILE_ENV) \
+        or os.path.join(get_config_dir(), VERSION_CHECK_FILE_NAME)
 
 
 def check_version(current):
+    """
+    Warn if the cached latest release is newer than current, and refresh the
+    cache in the background if it is older than VERSION_CHECK_TTL. A release
+    found by the refresh is reported by the next command.
+    """
+    cache = _read_cache()
+    latest = cache.get(LATEST_KEY)
+    if latest is not None:
+        _warn_if_newer(current, latest)
+    if not _is_fresh(cache):
+        # Recorded before the check, so that an unreachable PyPI, or a
+        # command that exits before the check finishes, is not retried
+        # by every command until the cache expires
+        _write_cache(latest)
+        thread = threading.Thread(target=_refresh_cache, daemon=True)
+        thread.start()
+        # Daemon threads are stopped at exit, which for a quick command
+        # comes before PyPI has replied
+        atexit.register(thread.join, VERSION_CHECK_EXIT_TIMEOUT)
+
+
+def _is_fresh(cache: dict) -> bool:
     try:
-        resp = requests.get(PYPI_PACKAGE_URI, timeout=10)
-        releases = list(resp.json()['releases'].keys())
-        latest = sorted(releases, key=cmp_to_key(compare))[-1]
-        current_parsed = VersionInfo.parse(current)
-        latest_parsed = VersionInfo.parse(latest)
-        if latest_parsed.major > current_parsed.major:
-            logger.critical(
-                f"A new major version of '{PROG_NAME}' is available: "
-                f"{latest} Please update immediately")
-        elif latest_parsed.minor > current_parsed.minor:
-            logger.error(f"A new minor version of '{PROG_NAME}' is available: "
-                         f"{latest} Update to avoid any compatibility issues")
-        elif latest_parsed.patch > current_parsed.patch:
-            logger.warning(f"A new patch version of '{PROG_NAME}' is available: "
-                           f"{latest}")
+        checked = datetime.fromisoformat(cache[CHECKED_KEY])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return datetime.now() - checked < VERSION_CHECK_TTL
+
+
+def _refresh_cache():
+    try:
+        _write_cache(_fetch_latest())
     # pylint: disable=broad-exception-caught
     except Exception as ex:
+        logger.debug(f"Error checking for new version : {ex}")
+
+
+def _fetch_latest() -> str:
+    # Imported here as it is only needed when the cache is refreshed
+    # pylint: disable=import-outside-toplevel
+    import requests
+    resp = requests.get(PYPI_PACKAGE_URI, timeout=10)
+    releases = resp.json()['releases'].keys()
+    return max(releases, key=cmp_to_key(compare))
+
+
+def _warn_if_newer(current, latest):
+    try:
+        current_parsed = VersionInfo.parse(current)
+        latest_parsed = VersionInfo.parse(latest)
+    except (TypeError, ValueError) as ex:
         logger.warning(f"Error checking for new version : {ex}")
+        return
+    if latest_parsed.major > current_parsed.major:
+        logger.critical(
+            f"A new major version of '{PROG_NAME}' is available: "
+            f"{latest} Please update immediately")
+    elif latest_parsed.minor > current_parsed.minor:
+        logger.error(f"A new minor version of '{PROG_NAME}' is available: "
+                     f"{latest} Update to avoid any compatibility issues")
+    elif latest_parsed.patch > current_parsed.patch:
+        logger.warning(f"A new patch version of '{PROG_NAME}' is available: "
+                       f"{latest}")
+
+
+def _read_cache() -> dict:
+    return read_json_dict(get_version_check_file(), 'version check cache')
+
+
+def _write_cache(latest):
+    path = get_version_check_file()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with atomic_write(path) as file:
+            json.dump({LATEST_KEY: latest, CHECKED_KEY: datetime.now().isoformat()}, file)
+    except OSError as ex:
+        logger.debug(f'Could not update version check cache: {ex}')
+
 
 def warn_if_austrakka():
     if PROG_NAME == "austrakka":